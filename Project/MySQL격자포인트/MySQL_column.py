@@ -1,39 +1,26 @@
-import os
-from dotenv import load_dotenv
-import mysql.connector
-import psycopg2
 from mysql.connector import Error as MySQLError
 from psycopg2 import Error as PGError
 
-# .env 파일 로드
-load_dotenv()
+from db import PG_SCHEMA, MYSQL_DBNAME, connect_pg, connect_mysql
+from regions import load_regions, get_sources_by_prefix
 
-# PostgreSQL 연결 정보
-PG_USER = os.getenv("PG_USER")
-PG_PASSWORD = os.getenv("PG_PASSWORD")
-PG_HOST = os.getenv("PG_HOST")
-PG_PORT = os.getenv("PG_PORT")
-PG_DBNAME = os.getenv("PG_DBNAME")
-PG_SCHEMA = os.getenv("PG_SCHEMA")  # 보통 'public' 입니다.
-
-# MySQL 연결 정보
-MYSQL_HOST = os.getenv("MYSQL_HOST")
-MYSQL_USER = os.getenv("MYSQL_USER")
-MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
-MYSQL_DBNAME = os.getenv("MYSQL_DBNAME")
-MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
+# 정수형 타입의 넓이 순서와 TEXT 계열 타입의 최대 길이. 기존 칼럼보다 넓은 타입이 필요한지 비교할 때 사용합니다.
+INTEGER_TYPES = ["TINYINT", "SMALLINT", "MEDIUMINT", "INT", "BIGINT"]
+TEXT_TYPE_LENGTHS = {"TINYTEXT": 2**8 - 1, "TEXT": 2**16 - 1, "MEDIUMTEXT": 2**24 - 1, "LONGTEXT": 2**32 - 1}
 
 def get_pg_columns(pg_conn, pg_table):
     """
-    PostgreSQL public 스키마의 지정 테이블에 대해 칼럼명과 데이터형 정보를 반환합니다.
+    PostgreSQL public 스키마의 지정 테이블에 대해
+    (칼럼명, 데이터형, 최대 문자 길이, 숫자 정밀도, 숫자 소수 자릿수) 목록을 반환합니다.
     """
     columns = []
     try:
         cur = pg_conn.cursor()
         query = """
-            SELECT column_name, data_type
+            SELECT column_name, data_type, character_maximum_length, numeric_precision, numeric_scale
             FROM information_schema.columns
-            WHERE table_schema = %s AND table_name = %s;
+            WHERE table_schema = %s AND table_name = %s
+            ORDER BY ordinal_position;
         """
         cur.execute(query, (PG_SCHEMA, pg_table))
         columns = cur.fetchall()
@@ -42,19 +29,32 @@ def get_pg_columns(pg_conn, pg_table):
         print(f"테이블 {pg_table}의 칼럼 정보를 가져오는 중 오류 발생: {e}")
     return columns
 
-def pg_to_mysql_type(pg_type):
+def pg_to_mysql_type(pg_type, char_max_length=None, numeric_precision=None, numeric_scale=None):
     """
     PostgreSQL 데이터형을 MySQL 데이터형으로 매핑합니다.
+    타입은 원본 테이블에 선언된 데이터형/길이/정밀도로만 정하므로, 이후 원본에 들어오는 값도 모두 담을 수 있습니다.
+      - character(n) → CHAR(n)  (예: '01' 같은 앞자리 0 보존)
+      - character varying(n) → VARCHAR(n), 길이 선언이 없거나 255자를 넘으면 TEXT
+      - 정수 → 선언된 SMALLINT/INT/BIGINT
+      - numeric → 선언된 DECIMAL(p,s), 정밀도 선언이 없으면 DOUBLE
     필요에 따라 추가 혹은 수정하세요.
     """
+    if pg_type in ("character varying", "character", "text"):
+        if char_max_length is not None and char_max_length <= 255:
+            return f"CHAR({char_max_length})" if pg_type == "character" else f"VARCHAR({char_max_length})"
+        return "TEXT"
+
+    if pg_type == "numeric":
+        if numeric_precision:
+            return f"DECIMAL({numeric_precision},{numeric_scale or 0})"
+        return "DOUBLE"
+
     mapping = {
-        "character varying": "VARCHAR(255)",
-        "text": "TEXT",
+        "smallint": "SMALLINT",
         "integer": "INT",
         "bigint": "BIGINT",
-        "smallint": "SMALLINT",
+        "real": "FLOAT",
         "double precision": "DOUBLE",
-        "numeric": "DECIMAL(10,2)",
         "boolean": "BOOLEAN",
         "date": "DATE",
         "timestamp without time zone": "DATETIME",
@@ -62,91 +62,149 @@ def pg_to_mysql_type(pg_type):
     }
     return mapping.get(pg_type, "TEXT")
 
+def type_capacity(mysql_type):
+    """
+    MySQL 타입(예: 'varchar(10)', 'int(11)', 'SMALLINT')의 (종류, 크기)를 반환합니다.
+    종류는 정수('int')와 문자열('str')만 비교하며, 그 밖의 타입은 None입니다.
+    """
+    base, _, rest = mysql_type.upper().partition("(")
+    base = base.split()[0] if base.split() else ""
+    if base in INTEGER_TYPES:
+        return ("int", INTEGER_TYPES.index(base))
+    if base in ("CHAR", "VARCHAR") and rest:
+        return ("str", int(rest.split(")")[0]))
+    if base in TEXT_TYPE_LENGTHS:
+        return ("str", TEXT_TYPE_LENGTHS[base])
+    return None
+
+def is_wider(mysql_type, other_type):
+    """
+    mysql_type이 other_type보다 더 큰 값(더 긴 문자열)을 담을 수 있으면 True.
+    """
+    capacity, other = type_capacity(mysql_type), type_capacity(other_type)
+    return capacity is not None and other is not None and capacity[0] == other[0] and capacity[1] > other[1]
+
 def get_existing_columns_mysql(mysql_conn, table_name, db_name):
     """
-    MySQL의 information_schema를 조회하여 지정 테이블에 이미 존재하는 칼럼명을 집합으로 반환합니다.
+    MySQL의 information_schema를 조회하여 지정 테이블에 이미 존재하는 칼럼을 {칼럼명: 칼럼 타입} dict로 반환합니다.
     """
-    existing_columns = set()
+    existing_columns = {}
     try:
         cursor = mysql_conn.cursor()
         query = """
-            SELECT column_name
+            SELECT column_name, column_type
             FROM information_schema.columns
             WHERE table_schema = %s AND table_name = %s;
         """
         cursor.execute(query, (db_name, table_name))
         for row in cursor.fetchall():
-            existing_columns.add(row[0])
+            existing_columns[row[0]] = row[1]
         cursor.close()
     except MySQLError as e:
         print(f"MySQL에서 {table_name}의 칼럼 정보를 가져오는 중 오류 발생: {e}")
     return existing_columns
 
-def add_column_to_mysql(mysql_conn, table_name, col_name, mysql_type):
+def build_schema_diff(pg_conn, sources, existing_columns):
+    """
+    모든 원본 테이블의 칼럼을 모아 korea_grid의 스키마 변경 목록을 계산합니다.
+    반환값: (새로 추가할 [(칼럼명, MySQL 타입), ...], 넓혀야 할 기존 칼럼 [(칼럼명, MySQL 타입), ...])
+    같은 접두사의 여러 지역 테이블은 그중 가장 넓은 선언 타입으로 정합니다.
+    이미 있는 칼럼은 원본 선언 타입이 더 넓을 때만(예: VARCHAR 길이 증가) 넓히고, 좁히지는 않습니다.
+    'geom' 칼럼은 매핑 대상이 아니므로 추가하지 않습니다.
+    """
+    column_types = {}
+    for prefix, pg_tables in sources.items():
+        for pg_table in pg_tables:
+            for col_name, data_type, char_max_length, precision, scale in get_pg_columns(pg_conn, pg_table):
+                if col_name == "geom":
+                    continue
+                new_col_name = f"{prefix}_{col_name}"
+                mysql_type = pg_to_mysql_type(data_type, char_max_length, precision, scale)
+                prev = column_types.get(new_col_name)
+                if prev is None or is_wider(mysql_type, prev):
+                    column_types[new_col_name] = mysql_type
+
+    new_columns = []
+    widen_columns = []
+    for col_name, mysql_type in column_types.items():
+        if col_name not in existing_columns:
+            new_columns.append((col_name, mysql_type))
+        elif is_wider(mysql_type, existing_columns[col_name]):
+            widen_columns.append((col_name, mysql_type))
+        else:
+            print(f"칼럼 `{col_name}` 은(는) 이미 존재하므로 건너뜁니다.")
+    return new_columns, widen_columns
+
+def add_columns_to_mysql(mysql_conn, table_name, columns):
     """
-    MySQL의 ALTER TABLE 명령으로 지정 테이블에 하나의 칼럼을 추가합니다.
+    계산된 칼럼들을 하나의 ALTER TABLE 문으로 추가합니다.
+    먼저 ALGORITHM=INSTANT(테이블 재구성 없이 메타데이터만 변경)로 시도하고,
+    서버가 지원하지 않으면 알고리즘 지정 없이 한 번 더 실행합니다.
     """
-    alter_query = f"ALTER TABLE {table_name} ADD COLUMN `{col_name}` {mysql_type};"
+    if not columns:
+        print("추가할 칼럼이 없습니다.")
+        return
+    add_clauses = ", ".join(f"ADD COLUMN `{col_name}` {mysql_type}" for col_name, mysql_type in columns)
+    cursor = mysql_conn.cursor()
     try:
-        cursor = mysql_conn.cursor()
-        cursor.execute(alter_query)
+        try:
+            cursor.execute(f"ALTER TABLE {table_name} {add_clauses}, ALGORITHM=INSTANT;")
+            algorithm = "INSTANT"
+        except MySQLError as e:
+            print(f"ALGORITHM=INSTANT 적용 불가 ({e}), 기본 알고리즘으로 다시 시도합니다.")
+            cursor.execute(f"ALTER TABLE {table_name} {add_clauses};")
+            algorithm = "기본"
         mysql_conn.commit()
-        print(f"칼럼 `{col_name}` ({mysql_type}) 이(가) {table_name} 테이블에 추가되었습니다.")
-        cursor.close()
+        for col_name, mysql_type in columns:
+            print(f"칼럼 `{col_name}` ({mysql_type}) 이(가) {table_name} 테이블에 추가되었습니다.")
+        print(f"총 {len(columns)}개 칼럼을 한 번의 ALTER TABLE로 추가했습니다. (알고리즘: {algorithm})")
     except MySQLError as e:
-        print(f"칼럼 `{col_name}` 추가 중 오류 발생: {e}")
+        print(f"칼럼 추가 중 오류 발생: {e}")
         mysql_conn.rollback()
+    finally:
+        cursor.close()
 
-def main():
-    # PostgreSQL 연결
-    try:
-        pg_conn = psycopg2.connect(
-            host=PG_HOST,
-            port=PG_PORT,
-            database=PG_DBNAME,
-            user=PG_USER,
-            password=PG_PASSWORD
-        )
-        print("PostgreSQL에 성공적으로 연결됨")
-    except PGError as e:
-        print(f"PostgreSQL 연결 오류: {e}")
+def widen_columns_in_mysql(mysql_conn, table_name, columns):
+    """
+    원본 선언 타입보다 좁은 기존 칼럼들을 하나의 ALTER TABLE ... MODIFY COLUMN 문으로 넓힙니다.
+    """
+    if not columns:
         return
-
-    # MySQL 연결
+    modify_clauses = ", ".join(f"MODIFY COLUMN `{col_name}` {mysql_type}" for col_name, mysql_type in columns)
+    cursor = mysql_conn.cursor()
     try:
-        mysql_conn = mysql.connector.connect(
-            host=MYSQL_HOST,
-            port=MYSQL_PORT,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD,
-            database=MYSQL_DBNAME,
-            autocommit=False
-        )
-        print("MySQL에 성공적으로 연결됨")
+        cursor.execute(f"ALTER TABLE {table_name} {modify_clauses};")
+        mysql_conn.commit()
+        for col_name, mysql_type in columns:
+            print(f"칼럼 `{col_name}` 을(를) {mysql_type}(으)로 넓혔습니다.")
     except MySQLError as e:
-        print(f"MySQL 연결 오류: {e}")
+        print(f"칼럼 타입 변경 중 오류 발생: {e}")
+        mysql_conn.rollback()
+    finally:
+        cursor.close()
+
+def main():
+    # PostgreSQL / MySQL 연결
+    pg_conn = connect_pg()
+    if pg_conn is None:
+        return
+    mysql_conn = connect_mysql()
+    if mysql_conn is None:
         pg_conn.close()
         return
 
-    # PostgreSQL public 스키마의 대상 테이블 목록과 각각에 적용할 접두사 설정
-    # 전자는 imsangdo, 후자는 soil
-    pg_tables = ["busan_imsangdo", "busan_soil"]  # 실제 PostgreSQL 테이블명으로 수정하세요.
-    prefixes = ["imsangdo", "soil"]
+    # 지역 레지스트리(regions.json)의 모든 지역 테이블을 대상으로 합니다.
+    sources = get_sources_by_prefix(load_regions())
 
     # MySQL korea_grid 테이블에 이미 존재하는 칼럼 확인
     mysql_table = "korea_grid"
     existing_columns = get_existing_columns_mysql(mysql_conn, mysql_table, MYSQL_DBNAME)
 
-    # PostgreSQL 각 테이블의 칼럼 정보를 읽고, 접두사(imsangdo 혹은 soil)를 붙여 MySQL 테이블에 추가
-    for pg_table, prefix in zip(pg_tables, prefixes):
-        cols = get_pg_columns(pg_conn, pg_table)
-        for col_name, data_type in cols:
-            new_col_name = f"{prefix}_{col_name}"
-            if new_col_name in existing_columns:
-                print(f"칼럼 `{new_col_name}` 은(는) 이미 존재하므로 건너뜁니다.")
-                continue
-            mysql_data_type = pg_to_mysql_type(data_type)
-            add_column_to_mysql(mysql_conn, mysql_table, new_col_name, mysql_data_type)
+    # PostgreSQL 각 테이블의 칼럼 정보를 읽어 접두사(imsangdo 혹은 soil)를 붙인 추가/변경 목록을 먼저 계산한 뒤,
+    # 한 번의 ALTER TABLE로 MySQL 테이블에 추가하고, 원본 선언보다 좁은 기존 칼럼은 넓힘
+    new_columns, widen_columns = build_schema_diff(pg_conn, sources, existing_columns)
+    add_columns_to_mysql(mysql_conn, mysql_table, new_columns)
+    widen_columns_in_mysql(mysql_conn, mysql_table, widen_columns)
     
     # 모든 연결 종료
     pg_conn.close()
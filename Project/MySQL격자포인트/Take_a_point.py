@@ -1,38 +1,33 @@
-import mysql.connector
+import argparse
+import os
+import tempfile
+
+import numpy as np
 from mysql.connector import Error
 
-def create_connection(host_name, user_name, user_password, db_name):
-    """
-    MySQL에 연결을 시도하여 connection 객체를 반환합니다.
-    """
-    try:
-        connection = mysql.connector.connect(
-            host=host_name,
-            user=user_name,
-            password=user_password,
-            database=db_name,
-            autocommit=False  # 직접 commit을 관리
-        )
-        print("MySQL에 성공적으로 연결됨")
-        return connection
-    except Error as e:
-        print(f"MySQL 연결 오류: {e}")
-        return None
+from db import connect_mysql
+
+# 기본 격자 범위 (위도 33.0°~39.0°, 경도 124.0°~132.0°) 및 해상도 (도 단위)
+DEFAULT_BBOX = (33.0, 39.0, 124.0, 132.0)  # (start_lat, end_lat, start_lng, end_lng)
+DEFAULT_STEP = 0.01
+# 한 번에 생성/적재하는 격자 포인트 수 (메모리 사용량은 이 값에만 비례)
+DEFAULT_CHUNK_SIZE = 200_000
 
-def create_table(connection):
+def create_table(connection, with_spatial_index=True):
     """
     기존 korea_grid 테이블이 존재하면 삭제하고, SRID 4326(POSITION POINT)를 사용하는 새 테이블을 생성합니다.
+    with_spatial_index=False이면 공간 인덱스 없이 생성하며, 적재 후 create_spatial_index()로 추가합니다.
     """
     cursor = connection.cursor()
     try:
         cursor.execute("DROP TABLE IF EXISTS korea_grid;")
-        create_table_query = """
+        spatial_index = ",\n            SPATIAL INDEX(location)" if with_spatial_index else ""
+        create_table_query = f"""
         CREATE TABLE korea_grid (
             id INT AUTO_INCREMENT PRIMARY KEY,
             lat DOUBLE,
             lng DOUBLE,
-            location POINT NOT NULL SRID 4326,
-            SPATIAL INDEX(location)
+            location POINT NOT NULL SRID 4326{spatial_index}
         ) ENGINE=InnoDB;
         """
         cursor.execute(create_table_query)
@@ -88,17 +83,169 @@ def insert_grid_points(connection):
     finally:
         cursor.close()
 
+def create_spatial_index(connection):
+    """
+    적재가 끝난 korea_grid 테이블에 공간 인덱스를 한 번에 생성합니다.
+    행마다 R-tree를 갱신하는 것보다 적재 후 일괄 생성하는 편이 훨씬 빠릅니다.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("ALTER TABLE korea_grid ADD SPATIAL INDEX location (location);")
+        connection.commit()
+        print("공간 인덱스 생성 완료")
+    except Error as e:
+        print("공간 인덱스 생성 오류:", e)
+        connection.rollback()
+    finally:
+        cursor.close()
+
+def grid_shape(bbox=DEFAULT_BBOX, step=DEFAULT_STEP):
+    """
+    격자 범위와 간격으로부터 (위도 방향 행 수, 경도 방향 열 수)를 계산합니다.
+    끝점을 포함하며, 부동소수 누적 오차 없이 정수 개수로 반올림합니다.
+    """
+    start_lat, end_lat, start_lng, end_lng = bbox
+    n_rows = int(round((end_lat - start_lat) / step)) + 1
+    n_cols = int(round((end_lng - start_lng) / step)) + 1
+    return n_rows, n_cols
+
+def generate_grid_chunks(bbox=DEFAULT_BBOX, step=DEFAULT_STEP, chunk_size=DEFAULT_CHUNK_SIZE, mask=None):
+    """
+    격자 좌표를 NumPy 정수 인덱스로 계산하여 chunk_size 단위의 (ids, lats, lngs) 배열로 yield 합니다.
+
+    좌표는 lat = start_lat + row * step 처럼 정수 인덱스에서 매번 새로 계산하므로
+    `lat += step` 반복에서 생기는 누적 오차가 없습니다.
+    id는 기존 삽입 순서(위도 바깥 루프, 경도 안쪽 루프)와 같은 row * n_cols + col + 1 입니다.
+    mask((n_rows, n_cols) bool 배열)를 주면 True인 격자점만 내보내며, id는 마스크가 없을 때와 같은 값을 유지합니다.
+    """
+    start_lat, _, start_lng, _ = bbox
+    n_rows, n_cols = grid_shape(bbox, step)
+    total = n_rows * n_cols
+    # step의 소수 자릿수보다 넉넉하게 반올림하여 0.30000000000000004 같은 값을 정리
+    decimals = max(0, -int(np.floor(np.log10(step)))) + 6
+    flat_mask = None if mask is None else mask.ravel()
+
+    for offset in range(0, total, chunk_size):
+        index = np.arange(offset, min(offset + chunk_size, total), dtype=np.int64)
+        if flat_mask is not None:
+            index = index[flat_mask[index]]
+            if len(index) == 0:
+                continue
+        rows, cols = np.divmod(index, n_cols)
+        lats = np.round(start_lat + rows * step, decimals)
+        lngs = np.round(start_lng + cols * step, decimals)
+        yield index + 1, lats, lngs
+
+def _write_chunk_csv(path, ids, lats, lngs):
+    """
+    (id, lat, lng) 배열을 LOAD DATA용 CSV 파일로 저장합니다.
+    """
+    np.savetxt(path, np.column_stack((ids, lats, lngs)), fmt=("%d", "%.10g", "%.10g"), delimiter=",")
+
+def build_land_mask(land_path, bbox=DEFAULT_BBOX, step=DEFAULT_STEP, buffer_km=0.0, tile_size=None):
+    """
+    육지/해안선 폴리곤 GeoJSON으로 격자점 육지 마스크를 만듭니다. (land_mask.py 참고)
+    """
+    # shapely는 육지 마스크를 사용할 때만 필요하므로 여기서 불러옵니다.
+    from land_mask import DEFAULT_TILE_SIZE, land_mask, load_land_polygon
+
+    start_lat, _, start_lng, _ = bbox
+    n_rows, n_cols = grid_shape(bbox, step)
+    land = load_land_polygon(land_path, buffer_km)
+    return land_mask(land, start_lat, start_lng, step, n_rows, n_cols, tile_size or DEFAULT_TILE_SIZE)
+
+def load_grid_points_bulk(connection, bbox=DEFAULT_BBOX, step=DEFAULT_STEP,
+                          chunk_size=DEFAULT_CHUNK_SIZE, loader="infile", mask=None):
+    """
+    generate_grid_chunks()가 만든 격자를 청크 단위로 korea_grid 테이블에 적재합니다.
+
+    loader="infile": 청크를 임시 CSV로 쓰고 LOAD DATA LOCAL INFILE로 적재합니다.
+                     (서버의 local_infile 설정이 켜져 있어야 합니다.)
+    loader="insert": 청크마다 다중 행 INSERT(executemany)로 적재합니다.
+    청크마다 commit 하므로 메모리 사용량은 격자 크기와 무관하게 일정합니다. (mask를 주면 격자점당 1바이트 추가)
+    mask를 주면 육지 격자점만 적재합니다.
+    """
+    n_rows, n_cols = grid_shape(bbox, step)
+    count = n_rows * n_cols if mask is None else int(mask.sum())
+    print(f"{count}개의 격자 포인트를 {chunk_size}개 단위로 적재합니다. ({n_rows} x {n_cols}, step={step})")
+
+    # 위치 컬럼은 기존과 동일하게 "POINT(lat lng)" 순서의 WKT로 만듭니다. (insert_grid_points 참고)
+    infile_query = """
+        LOAD DATA LOCAL INFILE %s INTO TABLE korea_grid
+        FIELDS TERMINATED BY ',' LINES TERMINATED BY '\\n'
+        (id, lat, lng)
+        SET location = ST_GeomFromText(CONCAT('POINT(', lat, ' ', lng, ')'), 4326);
+    """
+    insert_query = """
+        INSERT INTO korea_grid (id, lat, lng, location)
+        VALUES (%s, %s, %s, ST_GeomFromText(%s, 4326))
+    """
+
+    cursor = connection.cursor()
+    tmp_dir = tempfile.mkdtemp(prefix="korea_grid_")
+    csv_path = os.path.join(tmp_dir, "chunk.csv")
+    loaded = 0
+    try:
+        for ids, lats, lngs in generate_grid_chunks(bbox, step, chunk_size, mask):
+            if loader == "infile":
+                _write_chunk_csv(csv_path, ids, lats, lngs)
+                cursor.execute(infile_query, (csv_path,))
+            else:
+                values = [(int(i), float(la), float(ln), f"POINT({la} {ln})")
+                          for i, la, ln in zip(ids, lats, lngs)]
+                cursor.executemany(insert_query, values)
+            connection.commit()
+            loaded += len(ids)
+            print(f"  {loaded}개 적재 완료")
+        print("격자 포인트 적재 완료")
+        return True
+    except Error as e:
+        print("격자 포인트 적재 오류:", e)
+        connection.rollback()
+        return False
+    finally:
+        cursor.close()
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+        os.rmdir(tmp_dir)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="korea_grid 격자 포인트 생성")
+    parser.add_argument("--mode", choices=["legacy", "bulk"], default="legacy",
+                        help="legacy: 기존 단일 executemany 삽입, bulk: NumPy 격자 생성 + 청크 단위 대량 적재")
+    parser.add_argument("--bbox", type=float, nargs=4, default=list(DEFAULT_BBOX),
+                        metavar=("START_LAT", "END_LAT", "START_LNG", "END_LNG"),
+                        help="격자 범위 (bulk 모드)")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP, help="격자 해상도, 도 단위 (bulk 모드)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="청크당 포인트 수 (bulk 모드)")
+    parser.add_argument("--loader", choices=["infile", "insert"], default="infile",
+                        help="infile: LOAD DATA LOCAL INFILE, insert: 다중 행 INSERT (bulk 모드)")
+    parser.add_argument("--land-mask", help="육지/해안선 폴리곤 GeoJSON 파일. 지정하면 육지 격자점만 생성 (bulk 모드)")
+    parser.add_argument("--land-buffer-km", type=float, default=0.0,
+                        help="해안선 바깥으로 포함할 거리(km) (--land-mask와 함께 사용)")
+    parser.add_argument("--tile-size", type=int, help="육지 판정 타일 한 변의 격자점 수 (기본 64)")
+    args = parser.parse_args()
+    if args.land_mask and args.mode != "bulk":
+        parser.error("--land-mask는 --mode bulk에서만 사용할 수 있습니다.")
+    return args
+
 def main():
-    # MySQL 접속 정보 (환경에 맞게 수정)
-    host = "localhost"          # 예: "localhost" 또는 MySQL 서버 주소
-    user = "root"      # 본인 MySQL 사용자 이름
-    password = "jonggu2020"  # 본인 MySQL 비밀번호
-    database = "fire"  # 대상 데이터베이스 이름
+    args = parse_args()
 
-    connection = create_connection(host, user, password, database)
+    # MySQL 접속 정보는 .env 파일(MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DBNAME, MYSQL_PORT)에서 읽습니다.
+    connection = connect_mysql()
     if connection is not None:
-        create_table(connection)
-        insert_grid_points(connection)
+        if args.mode == "bulk":
+            mask = None
+            if args.land_mask:
+                mask = build_land_mask(args.land_mask, tuple(args.bbox), args.step, args.land_buffer_km, args.tile_size)
+            # 공간 인덱스는 적재가 끝난 뒤에 한 번에 생성
+            create_table(connection, with_spatial_index=False)
+            if load_grid_points_bulk(connection, tuple(args.bbox), args.step, args.chunk_size, args.loader, mask):
+                create_spatial_index(connection)
+        else:
+            create_table(connection)
+            insert_grid_points(connection)
         connection.close()
         print("MySQL 연결 종료")
 
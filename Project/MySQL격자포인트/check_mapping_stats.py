@@ -1,17 +1,14 @@
-import os
-from dotenv import load_dotenv
-import mysql.connector
+import argparse
+import math
 from mysql.connector import Error as MySQLError
 
-# .env 파일 로드
-load_dotenv()
+from db import connect_mysql, ensure_lat_lng_index
 
-# MySQL 연결 정보 (변수명은 .env 파일과 동일하게 맞추세요)
-MYSQL_HOST = os.getenv("MYSQL_HOST")
-MYSQL_USER = os.getenv("MYSQL_USER")
-MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
-MYSQL_DBNAME = os.getenv("MYSQL_DBNAME")
-MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
+# 타일 단위 커버리지 집계 설정
+COVERAGE_TABLE = "korea_grid_coverage"
+COVERAGE_TILE_SIZE = 0.5  # 타일 한 변의 크기 (도 단위), 타일 번호 = FLOOR(좌표 / 크기)
+TOTAL_KEY = "__total__"    # 타일의 전체 격자 수
+MAPPED_KEY = "__mapped__"  # 매핑 컬럼 중 하나라도 값이 있는 격자 수
 
 def get_mysql_columns(mysql_conn, table_name):
     """
@@ -76,26 +73,200 @@ def get_mapping_stats(mysql_conn):
         print("매핑 통계 조회 오류:", e)
         return None, None, None
 
-def main():
+def build_coverage_query(mapping_columns, tile_size=COVERAGE_TILE_SIZE, where=""):
+    """
+    타일별 (전체 격자 수, 매핑된 격자 수, 컬럼별 NOT NULL 개수)를 한 번의 스캔으로 구하는 집계 쿼리를 만듭니다.
+    """
+    sums = [f"SUM(`{col}` IS NOT NULL)" for col in mapping_columns]
+    any_mapped = " OR ".join(f"`{col}` IS NOT NULL" for col in mapping_columns) or "FALSE"
+    return f"""
+        SELECT FLOOR(lat / {tile_size}) AS tile_row, FLOOR(lng / {tile_size}) AS tile_col,
+               COUNT(*), SUM({any_mapped}){''.join(', ' + expr for expr in sums)}
+        FROM korea_grid {where}
+        GROUP BY tile_row, tile_col;
+    """
+
+def get_coverage_stats(mysql_conn, tile_size=COVERAGE_TILE_SIZE):
+    """
+    korea_grid를 한 번만 스캔하여 타일별 커버리지를 계산합니다.
+    반환값: {(tile_row, tile_col): {TOTAL_KEY: n, MAPPED_KEY: n, 컬럼명: NOT NULL 개수, ...}}
+    """
+    mapping_columns = get_mapping_columns(get_mysql_columns(mysql_conn, "korea_grid"))
     try:
-        mysql_conn = mysql.connector.connect(
-            host=MYSQL_HOST,
-            port=MYSQL_PORT,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD,
-            database=MYSQL_DBNAME,
-            autocommit=True
-        )
-        print("MySQL에 성공적으로 연결됨.")
+        cursor = mysql_conn.cursor()
+        cursor.execute(build_coverage_query(mapping_columns, tile_size))
+        rows = cursor.fetchall()
+        cursor.close()
     except MySQLError as e:
-        print("MySQL 연결 오류:", e)
+        print("커버리지 통계 조회 오류:", e)
+        return None
+    keys = [TOTAL_KEY, MAPPED_KEY] + mapping_columns
+    return {(int(row[0]), int(row[1])): dict(zip(keys, (int(v or 0) for v in row[2:]))) for row in rows}
+
+def summarize_coverage(tiles):
+    """
+    타일별 커버리지를 합쳐 {TOTAL_KEY: n, MAPPED_KEY: n, 컬럼명: NOT NULL 개수, ...} 전체 합계를 만듭니다.
+    """
+    totals = {}
+    for counts in tiles.values():
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+def ensure_coverage_table(mysql_conn):
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {COVERAGE_TABLE} (
+            tile_row INT NOT NULL,
+            tile_col INT NOT NULL,
+            column_name VARCHAR(64) NOT NULL,
+            cell_count INT NOT NULL,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (tile_row, tile_col, column_name)
+        ) ENGINE=InnoDB;
+    """)
+    cursor.close()
+
+def coverage_table_exists(mysql_conn):
+    cursor = mysql_conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s;
+    """, (COVERAGE_TABLE,))
+    exists = cursor.fetchone()[0] > 0
+    cursor.close()
+    return exists
+
+def save_coverage(mysql_conn, tiles):
+    """
+    타일별 커버리지를 요약 테이블에 (tile_row, tile_col, column_name, cell_count) 형태로 저장합니다.
+    """
+    rows = [(tile_row, tile_col, key, value)
+            for (tile_row, tile_col), counts in tiles.items() for key, value in counts.items()]
+    if not rows:
         return
+    cursor = mysql_conn.cursor()
+    cursor.executemany(f"REPLACE INTO {COVERAGE_TABLE} (tile_row, tile_col, column_name, cell_count) "
+                       f"VALUES (%s, %s, %s, %s);", rows)
+    cursor.close()
 
-    total, mapped, empty = get_mapping_stats(mysql_conn)
-    if total is not None:
-        print(f"총 격자 포인트 개수: {total}")
-        print(f"매핑된 포인트 개수: {mapped}")
-        print(f"비어있는(매핑되지 않은) 포인트 개수: {empty}")
+def materialize_coverage(mysql_conn, tile_size=COVERAGE_TILE_SIZE):
+    """
+    전체 격자를 한 번 스캔하여 요약 테이블을 새로 채웁니다.
+    이후 매퍼가 청크마다 하는 타일 범위 재집계(refresh_coverage_for_ids)가 격자 전체를 스캔하지 않도록
+    (lat, lng) 인덱스도 함께 만듭니다.
+    """
+    tiles = get_coverage_stats(mysql_conn, tile_size)
+    if tiles is None:
+        return None
+    ensure_lat_lng_index(mysql_conn)
+    ensure_coverage_table(mysql_conn)
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"DELETE FROM {COVERAGE_TABLE};")
+    cursor.close()
+    save_coverage(mysql_conn, tiles)
+    mysql_conn.commit()
+    return tiles
+
+def refresh_coverage_for_ids(mysql_conn, id_table, tile_size=COVERAGE_TILE_SIZE):
+    """
+    id_table(id 컬럼을 가진 테이블, 예: 매핑 스테이징 테이블)에 있는 격자가 속한 타일만 다시 집계하여
+    요약 테이블을 갱신합니다. 매퍼가 청크를 반영할 때마다 호출하며, commit은 호출한 쪽에서 합니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"""
+        SELECT DISTINCT FLOOR(g.lat / {tile_size}), FLOOR(g.lng / {tile_size})
+        FROM korea_grid g JOIN {id_table} s ON g.id = s.id;
+    """)
+    touched = {(int(r), int(c)) for r, c in cursor.fetchall()}
+    cursor.close()
+
+    if not touched:
+        return
+
+    mapping_columns = get_mapping_columns(get_mysql_columns(mysql_conn, "korea_grid"))
+    keys = [TOTAL_KEY, MAPPED_KEY] + mapping_columns
+    # 타일 범위 조건으로 조회해야 (lat, lng) 인덱스를 사용할 수 있습니다. 바뀐 타일 전체를 한 번의 쿼리로 집계합니다.
+    ranges = " OR ".join(
+        f"(lat >= {tile_row * tile_size} AND lat < {(tile_row + 1) * tile_size} "
+        f"AND lng >= {tile_col * tile_size} AND lng < {(tile_col + 1) * tile_size})"
+        for tile_row, tile_col in touched)
+    cursor = mysql_conn.cursor()
+    cursor.execute(build_coverage_query(mapping_columns, tile_size, f"WHERE {ranges}"))
+    tiles = {}
+    for row in cursor.fetchall():
+        tile = (int(row[0]), int(row[1]))
+        if tile in touched:
+            tiles[tile] = dict(zip(keys, (int(v or 0) for v in row[2:])))
+    cursor.close()
+    save_coverage(mysql_conn, tiles)
+
+def read_coverage_summary(mysql_conn):
+    """
+    격자를 스캔하지 않고 요약 테이블에서 컬럼별 전체 합계를 읽습니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT column_name, SUM(cell_count) FROM {COVERAGE_TABLE} GROUP BY column_name;")
+    totals = {name: int(count) for name, count in cursor.fetchall()}
+    cursor.close()
+    return totals
+
+def print_coverage(totals, tiles=None, tile_size=COVERAGE_TILE_SIZE):
+    total = totals.get(TOTAL_KEY, 0)
+    mapped = totals.get(MAPPED_KEY, 0)
+    print(f"총 격자 포인트 개수: {total}")
+    print(f"매핑된 포인트 개수: {mapped}")
+    print(f"비어있는(매핑되지 않은) 포인트 개수: {total - mapped}")
+    print("\n컬럼별 매핑 개수:")
+    for key in sorted(k for k in totals if k not in (TOTAL_KEY, MAPPED_KEY)):
+        ratio = totals[key] / total * 100 if total else 0
+        print(f"  {key}: {totals[key]} ({ratio:.1f}%)")
+
+    if tiles:
+        # 커버리지 비율을 10% 구간으로 나눈 타일 히스토그램
+        histogram = [0] * 11
+        for counts in tiles.values():
+            if counts[TOTAL_KEY]:
+                histogram[math.floor(counts[MAPPED_KEY] / counts[TOTAL_KEY] * 10)] += 1
+        print(f"\n타일({tile_size}°) 커버리지 히스토그램:")
+        for i, count in enumerate(histogram):
+            label = "100%" if i == 10 else f"{i * 10}~{i * 10 + 9}%"
+            print(f"  {label:>7}: {count}개 타일")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="korea_grid 매핑 통계")
+    parser.add_argument("--mode", choices=["quick", "full", "summary"], default="quick",
+                        help="quick: 전체/매핑 개수만, full: 한 번의 스캔으로 컬럼별/타일별 커버리지, "
+                             "summary: 요약 테이블에서 읽기 (격자 스캔 없음)")
+    parser.add_argument("--materialize", action="store_true",
+                        help="full 모드 결과로 요약 테이블을 새로 채움 (이후 매퍼가 청크마다 갱신)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    mysql_conn = connect_mysql(autocommit=True)
+    if mysql_conn is None:
+        return
+
+    if args.mode == "full":
+        if args.materialize:
+            tiles = materialize_coverage(mysql_conn)
+        else:
+            tiles = get_coverage_stats(mysql_conn)
+        if tiles is not None:
+            print_coverage(summarize_coverage(tiles), tiles)
+    elif args.mode == "summary":
+        try:
+            print_coverage(read_coverage_summary(mysql_conn))
+        except MySQLError as e:
+            print(f"요약 테이블 조회 오류 (--mode full --materialize로 먼저 생성하세요): {e}")
+    else:
+        total, mapped, empty = get_mapping_stats(mysql_conn)
+        if total is not None:
+            print(f"총 격자 포인트 개수: {total}")
+            print(f"매핑된 포인트 개수: {mapped}")
+            print(f"비어있는(매핑되지 않은) 포인트 개수: {empty}")
 
     mysql_conn.close()
 
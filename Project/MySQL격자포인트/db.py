@@ -0,0 +1,136 @@
+import os
+from dotenv import load_dotenv
+import psycopg2
+from mysql.connector import pooling
+from mysql.connector import Error as MySQLError
+from psycopg2 import Error as PGError
+
+# .env 파일 로드
+load_dotenv()
+
+# PostgreSQL 연결 정보
+PG_USER = os.getenv("PG_USER")
+PG_PASSWORD = os.getenv("PG_PASSWORD")
+PG_HOST = os.getenv("PG_HOST")
+PG_PORT = os.getenv("PG_PORT")
+PG_DBNAME = os.getenv("PG_DBNAME")
+PG_SCHEMA = os.getenv("PG_SCHEMA")  # 보통 'public'
+
+# MySQL 연결 정보
+MYSQL_HOST = os.getenv("MYSQL_HOST")
+MYSQL_USER = os.getenv("MYSQL_USER")
+MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
+MYSQL_DBNAME = os.getenv("MYSQL_DBNAME")
+MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 4))
+
+# 격자 전체를 읽을 때 한 번에 가져오는 행 수 (메모리 사용량은 이 값에만 비례)
+DEFAULT_FETCH_SIZE = 20_000
+
+# 프로세스마다 하나의 MySQL 연결 풀 (fork된 워커는 부모의 소켓을 쓰지 않도록 새로 만듭니다)
+_mysql_pool = None
+_mysql_pool_pid = None
+
+def get_mysql_pool():
+    global _mysql_pool, _mysql_pool_pid
+    if _mysql_pool is None or _mysql_pool_pid != os.getpid():
+        _mysql_pool = pooling.MySQLConnectionPool(
+            pool_name=f"korea_grid_{os.getpid()}",
+            pool_size=MYSQL_POOL_SIZE,
+            host=MYSQL_HOST, port=MYSQL_PORT, user=MYSQL_USER,
+            password=MYSQL_PASSWORD, database=MYSQL_DBNAME,
+            allow_local_infile=True  # Take_a_point.py bulk 모드의 LOAD DATA LOCAL INFILE 사용
+        )
+        _mysql_pool_pid = os.getpid()
+    return _mysql_pool
+
+def connect_mysql(autocommit=False):
+    """
+    .env 설정의 MySQL 연결 풀에서 연결을 가져옵니다. 실패하면 None을 반환합니다.
+    close()하면 연결이 끊기지 않고 풀로 돌아갑니다.
+    """
+    try:
+        mysql_conn = get_mysql_pool().get_connection()
+        # 풀로 돌아온 연결은 세션이 초기화되므로 가져올 때마다 autocommit을 지정합니다.
+        cursor = mysql_conn.cursor()
+        cursor.execute(f"SET autocommit = {int(autocommit)};")
+        cursor.close()
+        print("MySQL에 성공적으로 연결됨.")
+        return mysql_conn
+    except MySQLError as e:
+        print("MySQL 연결 오류:", e)
+        return None
+
+def connect_pg():
+    """
+    .env 설정으로 PostgreSQL에 연결합니다. 실패하면 None을 반환합니다.
+    """
+    try:
+        pg_conn = psycopg2.connect(
+            host=PG_HOST, port=PG_PORT, database=PG_DBNAME, user=PG_USER, password=PG_PASSWORD
+        )
+        print("PostgreSQL에 성공적으로 연결됨.")
+        return pg_conn
+    except PGError as e:
+        print("PostgreSQL 연결 오류:", e)
+        return None
+
+def stream_rows(conn, query, params=None, fetch_size=DEFAULT_FETCH_SIZE, name=None):
+    """
+    쿼리 결과를 최대 fetch_size개의 튜플 행 목록으로 나누어 yield 합니다.
+
+    MySQL은 버퍼 없는 커서로 서버에서 행을 읽는 만큼만 받아 오고, PostgreSQL은 name을 주면 서버 측 커서를 사용합니다.
+    MySQL 버퍼 없는 커서는 끝까지 읽기 전에는 같은 연결로 다른 쿼리를 실행할 수 없으므로,
+    읽으면서 같은 연결에 쓰기도 해야 하면 iter_table_chunks()를 사용하세요.
+    """
+    if isinstance(conn, psycopg2.extensions.connection):
+        cursor = conn.cursor(name=name) if name else conn.cursor()
+    else:
+        cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+def iter_table_chunks(mysql_conn, columns, table="korea_grid", where=None, params=(), chunk_size=DEFAULT_FETCH_SIZE):
+    """
+    기본 키 id 순서로 `id > 마지막 id ... LIMIT chunk_size` 쿼리를 반복해 튜플 행 목록을 yield 합니다.
+    (columns의 첫 번째는 id여야 합니다.)
+
+    쿼리마다 결과가 chunk_size개로 끝나므로 사이사이 같은 연결로 매핑 결과를 써도 되고,
+    행마다 처리 시간이 긴 경우에도 서버의 긴 결과 전송 대기(net_write_timeout)에 걸리지 않습니다.
+    """
+    condition = f"({where}) AND id > %s" if where else "id > %s"
+    query = f"SELECT {', '.join(columns)} FROM {table} WHERE {condition} ORDER BY id LIMIT {int(chunk_size)};"
+    last_id = 0
+    cursor = mysql_conn.cursor()
+    try:
+        while True:
+            cursor.execute(query, tuple(params) + (last_id,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            yield rows
+            last_id = rows[-1][0]
+    finally:
+        cursor.close()
+
+def ensure_lat_lng_index(mysql_conn):
+    """
+    위경도 범위 조회(lat/lng BETWEEN)가 korea_grid 전체를 스캔하지 않도록 (lat, lng) 인덱스를 만듭니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'korea_grid' AND index_name = 'idx_lat_lng';
+    """)
+    if cursor.fetchone()[0] == 0:
+        print("korea_grid (lat, lng) 인덱스를 생성합니다...")
+        cursor.execute("CREATE INDEX idx_lat_lng ON korea_grid (lat, lng);")
+        mysql_conn.commit()
+    cursor.close()
@@ -0,0 +1,74 @@
+import argparse
+from mysql.connector import Error as MySQLError
+
+from db import connect_mysql
+
+# 격자 테이블별 데이터 버전. 격자 값을 바꾸는 작업이 같은 트랜잭션에서 버전을 올리고,
+# backend/services/simulationService.js는 이 값을 시뮬레이션 결과 캐시 키에 넣습니다.
+GRID_VERSION_TABLE = "grid_versions"
+
+def ensure_grid_version_table(mysql_conn):
+    """
+    버전 테이블이 없으면 만듭니다. CREATE TABLE은 진행 중인 트랜잭션을 암묵적으로 commit하므로
+    테이블이 이미 있으면 실행하지 않습니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s;
+    """, (GRID_VERSION_TABLE,))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {GRID_VERSION_TABLE} (
+                table_name VARCHAR(64) PRIMARY KEY,
+                version BIGINT UNSIGNED NOT NULL,
+                updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB;
+        """)
+    cursor.close()
+
+def bump_grid_version(mysql_conn, table_name="korea_grid"):
+    """
+    table_name의 버전을 1 올립니다. commit은 호출한 쪽에서 하므로 격자 변경과 함께 반영되거나 함께 롤백됩니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"""
+        INSERT INTO {GRID_VERSION_TABLE} (table_name, version) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1;
+    """, (table_name,))
+    cursor.close()
+
+def get_grid_version(mysql_conn, table_name="korea_grid"):
+    """
+    table_name의 버전을 반환합니다. 한 번도 올린 적 없는 격자는 0입니다. (simulationService.js와 같은 규칙)
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT version FROM {GRID_VERSION_TABLE} WHERE table_name = %s;", (table_name,))
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else 0
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="격자 테이블 데이터 버전 올리기 (시뮬레이션 결과 캐시 무효화)")
+    parser.add_argument("--table", default="imported_fire_data_auto",
+                        help="버전을 올릴 격자 테이블 (korea_grid를 다시 가져온 뒤 시뮬레이션 테이블에 실행)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    mysql_conn = connect_mysql()
+    if mysql_conn is None:
+        return
+    try:
+        ensure_grid_version_table(mysql_conn)
+        bump_grid_version(mysql_conn, args.table)
+        mysql_conn.commit()
+        print(f"{args.table} 격자 버전: {get_grid_version(mysql_conn, args.table)}")
+    except MySQLError as e:
+        print(f"격자 버전 갱신 오류: {e}")
+        mysql_conn.rollback()
+    finally:
+        mysql_conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os
+import sys
+import time
+from mysql.connector import Error as MySQLError
+
+from check_mapping_stats import coverage_table_exists, refresh_coverage_for_ids
+from db import ensure_lat_lng_index
+from grid_version import ensure_grid_version_table, bump_grid_version
+
+# 정적 계수 갱신에 쓰는 fire_sim 패키지 위치와 korea_grid의 정적 계수 테이블 (fire_sim.static_factors)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_FACTOR_TABLE = "korea_grid_static_factors"
+
+def load_static_factor_refresh(mysql_conn):
+    """
+    korea_grid 정적 계수 테이블이 있으면 청크마다 호출할 갱신 함수를, 없으면 None을 반환합니다.
+    fire_sim(NumPy 등)은 테이블이 있을 때만 불러옵니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s;
+    """, (STATIC_FACTOR_TABLE,))
+    exists = cursor.fetchone()[0] > 0
+    cursor.close()
+    if not exists:
+        return None
+
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    from fire_sim.static_factors import static_factor_table_exists, refresh_static_factors_for_ids
+    if not static_factor_table_exists(mysql_conn, "korea_grid"):
+        print(f"{STATIC_FACTOR_TABLE}가 이전 형식이라 갱신하지 않습니다. "
+              f"(python -m fire_sim.static_factors --table korea_grid 로 다시 만드세요)")
+        return None
+    return refresh_static_factors_for_ids
+
+# 스테이징 테이블에 한 번에 적재/반영하는 행 수, commit 간격(행 수)
+DEFAULT_CHUNK_SIZE = 20_000
+DEFAULT_COMMIT_SIZE = 100_000
+
+class StagedGridWriter:
+    """
+    격자 매핑 결과를 모아 두었다가 MySQL 임시 스테이징 테이블에 청크 단위로 적재한 뒤,
+    청크마다 한 번의 UPDATE ... JOIN 으로 korea_grid에 반영합니다.
+
+    사용 예:
+        writer = StagedGridWriter(mysql_conn, {"imsangdo": [...], "soil": [...]})
+        writer.add(grid_id, "imsangdo", values)
+        writer.close()  # 남은 결과 반영 및 commit
+
+    columns_by_prefix: 접두사 → korea_grid 컬럼 목록 (values는 이 순서를 따릅니다)
+    chunk_size: 스테이징 적재 및 UPDATE ... JOIN 한 번에 처리할 행 수
+    commit_size: 이 행 수만큼 반영될 때마다 commit
+
+    커버리지 요약 테이블(check_mapping_stats.py --mode full --materialize)이 있으면
+    청크를 반영할 때마다 해당 격자가 속한 타일의 요약도 함께 갱신합니다.
+    정적 계수 테이블(python -m fire_sim.static_factors --table korea_grid)이 있으면 해당 격자의 정적 계수도 다시 계산합니다.
+    commit할 때마다 grid_versions의 korea_grid 버전을 같은 트랜잭션에서 올립니다.
+    """
+
+    def __init__(self, mysql_conn, columns_by_prefix, chunk_size=DEFAULT_CHUNK_SIZE,
+                 commit_size=DEFAULT_COMMIT_SIZE, verbose=True):
+        self.mysql_conn = mysql_conn
+        self.columns_by_prefix = {prefix: cols for prefix, cols in columns_by_prefix.items() if cols}
+        self.chunk_size = chunk_size
+        self.commit_size = max(commit_size, chunk_size)
+        self.verbose = verbose
+
+        self.buffers = {prefix: {} for prefix in self.columns_by_prefix}
+        self.applied = 0
+        self.uncommitted = 0
+        self.start_time = time.time()
+        self.update_coverage = coverage_table_exists(mysql_conn)
+        if self.update_coverage:
+            # 청크마다 하는 타일 범위 재집계가 격자 전체를 스캔하지 않도록 (lat, lng) 인덱스 확인
+            ensure_lat_lng_index(mysql_conn)
+        self.refresh_static_factors = load_static_factor_refresh(mysql_conn)
+        ensure_grid_version_table(mysql_conn)
+        self._create_stage_tables()
+
+    @staticmethod
+    def stage_table(prefix):
+        return f"korea_grid_stage_{prefix}"
+
+    def _create_stage_tables(self):
+        """
+        접두사마다 korea_grid와 같은 컬럼 타입을 가진 임시 스테이징 테이블을 만듭니다.
+        (TEMPORARY 테이블이므로 현재 세션에서만 보이며 연결 종료 시 삭제됩니다.)
+        """
+        cursor = self.mysql_conn.cursor()
+        for prefix, cols in self.columns_by_prefix.items():
+            col_str = ", ".join(f"`{col}`" for col in cols)
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.stage_table(prefix)};")
+            cursor.execute(f"""
+                CREATE TEMPORARY TABLE {self.stage_table(prefix)} (PRIMARY KEY (id))
+                SELECT id, {col_str} FROM korea_grid LIMIT 0;
+            """)
+        cursor.close()
+
+    def add(self, grid_id, prefix, values):
+        """
+        하나의 매핑 결과를 버퍼에 추가하고, 버퍼가 chunk_size에 도달하면 반영합니다.
+        같은 격자 id가 다시 들어오면 마지막 값으로 덮어씁니다.
+        """
+        buffer = self.buffers.get(prefix)
+        if buffer is None:
+            return
+        buffer[grid_id] = tuple(values)
+        if len(buffer) >= self.chunk_size:
+            self._apply(prefix)
+
+    def _apply(self, prefix):
+        """
+        버퍼 내용을 스테이징 테이블에 다중 행 INSERT로 적재하고 UPDATE ... JOIN 으로 korea_grid에 반영합니다.
+        """
+        buffer = self.buffers[prefix]
+        if not buffer:
+            return
+        cols = self.columns_by_prefix[prefix]
+        stage = self.stage_table(prefix)
+        col_str = ", ".join(f"`{col}`" for col in cols)
+        placeholders = ", ".join(["%s"] * (len(cols) + 1))
+        set_str = ", ".join(f"g.`{col}` = s.`{col}`" for col in cols)
+
+        cursor = self.mysql_conn.cursor()
+        try:
+            cursor.executemany(f"INSERT INTO {stage} (id, {col_str}) VALUES ({placeholders});",
+                               [(grid_id,) + values for grid_id, values in buffer.items()])
+            cursor.execute(f"UPDATE korea_grid g JOIN {stage} s ON g.id = s.id SET {set_str};")
+            if self.update_coverage:
+                refresh_coverage_for_ids(self.mysql_conn, stage)
+            if self.refresh_static_factors:
+                self.refresh_static_factors(self.mysql_conn, stage)
+            cursor.execute(f"DELETE FROM {stage};")
+        finally:
+            cursor.close()
+
+        count = len(buffer)
+        buffer.clear()
+        self.applied += count
+        self.uncommitted += count
+        if self.uncommitted >= self.commit_size:
+            self.commit()
+
+    def commit(self):
+        if self.uncommitted:
+            # 버전 행 잠금을 짧게 잡도록 commit 직전에 올림 (병렬 워커끼리 같은 행을 갱신)
+            bump_grid_version(self.mysql_conn, "korea_grid")
+        self.mysql_conn.commit()
+        self.uncommitted = 0
+        if self.verbose:
+            elapsed = time.time() - self.start_time
+            print(f"  매핑 결과 {self.applied}건 반영 ({self.applied / max(elapsed, 1e-9):.0f} rows/sec)")
+
+    def flush(self):
+        """
+        모든 접두사의 남은 버퍼를 반영하고 commit 합니다.
+        """
+        for prefix in self.buffers:
+            self._apply(prefix)
+        self.commit()
+
+    def discard(self):
+        """
+        롤백한 뒤 같은 writer를 계속 쓸 수 있도록 반영하지 않은 버퍼와 스테이징 테이블을 비웁니다.
+        """
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self.uncommitted = 0
+        cursor = self.mysql_conn.cursor()
+        for prefix in self.columns_by_prefix:
+            cursor.execute(f"DELETE FROM {self.stage_table(prefix)};")
+        cursor.close()
+
+    def close(self):
+        """
+        남은 결과를 반영하고 스테이징 테이블을 삭제합니다. 오류 시 현재 트랜잭션을 롤백합니다.
+        """
+        try:
+            self.flush()
+        except MySQLError:
+            self.mysql_conn.rollback()
+            raise
+        finally:
+            cursor = self.mysql_conn.cursor()
+            for prefix in self.columns_by_prefix:
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.stage_table(prefix)};")
+            cursor.close()
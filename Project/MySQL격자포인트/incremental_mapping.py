@@ -0,0 +1,286 @@
+import argparse
+import time
+
+from mysql.connector import Error as MySQLError
+from psycopg2 import Error as PGError
+
+from db import PG_SCHEMA, connect_pg, connect_mysql, ensure_lat_lng_index, iter_table_chunks
+from grid_writeback import StagedGridWriter, DEFAULT_CHUNK_SIZE, DEFAULT_COMMIT_SIZE
+from point_mapping import PG_SOURCES, prepare_sources, build_point_queries, lookup_point
+
+WATERMARK_TABLE = "korea_grid_source_watermark"
+POLYGON_TABLE = "korea_grid_source_polygons"
+STATE_COLUMN = "mapping_state"
+
+# 접두사별 mapping_state 비트: 비트가 켜져 있으면 해당 원본의 현재 상태로 이미 매핑(조회)된 격자입니다.
+PREFIX_BITS = {prefix: 1 << i for i, prefix in enumerate(PG_SOURCES)}
+
+# 폴리곤 지문에서 제외하는 일련번호 컬럼 (원본을 다시 적재하면 번호만 바뀌므로)
+SURROGATE_KEY_COLUMNS = ("gid", "id", "ogc_fid", "fid")
+
+ID_BATCH_SIZE = 5_000
+FETCH_SIZE = 20_000
+
+def ensure_state_tables(mysql_conn):
+    """
+    korea_grid.mapping_state 컬럼과 워터마크/폴리곤 지문 테이블이 없으면 생성합니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'korea_grid' AND column_name = %s;
+    """, (STATE_COLUMN,))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(f"ALTER TABLE korea_grid ADD COLUMN `{STATE_COLUMN}` TINYINT UNSIGNED NOT NULL DEFAULT 0;")
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            pg_table VARCHAR(128) PRIMARY KEY,
+            row_count BIGINT NOT NULL,
+            checksum BIGINT NOT NULL,
+            max_updated_at DATETIME NULL,
+            refreshed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB;
+    """)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {POLYGON_TABLE} (
+            pg_table VARCHAR(128) NOT NULL,
+            fingerprint CHAR(32) NOT NULL,
+            min_lng DOUBLE NOT NULL,
+            min_lat DOUBLE NOT NULL,
+            max_lng DOUBLE NOT NULL,
+            max_lat DOUBLE NOT NULL,
+            PRIMARY KEY (pg_table, fingerprint)
+        ) ENGINE=InnoDB;
+    """)
+    mysql_conn.commit()
+    cursor.close()
+
+def get_pg_watermark(pg_conn, pg_table):
+    """
+    원본 테이블의 (행 수, 행 내용 체크섬, updated_at 최댓값)을 계산합니다.
+    updated_at 컬럼이 없으면 마지막 값은 None 입니다.
+    """
+    with pg_conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s AND column_name = 'updated_at';
+        """, (PG_SCHEMA, pg_table))
+        has_updated_at = cur.fetchone()[0] > 0
+        updated_expr = "MAX(t.updated_at)" if has_updated_at else "NULL"
+        cur.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(hashtext(t::text)), 0), {updated_expr}
+            FROM {pg_table} t;
+        """)
+        row_count, checksum, max_updated_at = cur.fetchone()
+    # MySQL DATETIME과 비교할 수 있도록 시간대/마이크로초를 제거
+    if max_updated_at is not None:
+        max_updated_at = max_updated_at.replace(tzinfo=None, microsecond=0)
+    return int(row_count), int(checksum), max_updated_at
+
+def get_stored_watermark(mysql_conn, pg_table):
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT row_count, checksum, max_updated_at FROM {WATERMARK_TABLE} WHERE pg_table = %s;",
+                   (pg_table,))
+    row = cursor.fetchone()
+    cursor.close()
+    return row
+
+def watermark_changed(stored, current):
+    return stored is None or tuple(stored) != tuple(current)
+
+def get_pg_fingerprints(pg_conn, pg_table):
+    """
+    원본 폴리곤마다 (geometry와 속성 값의 md5 지문 → 경계 상자)를 반환합니다.
+    일련번호 컬럼(SURROGATE_KEY_COLUMNS)은 지문에서 빼므로 원본을 다시 적재해도 내용이 같으면 지문이 같습니다.
+    같은 내용의 폴리곤은 하나의 지문으로 합쳐집니다.
+    """
+    excluded = "".join(f" - '{col}'" for col in SURROGATE_KEY_COLUMNS + ("geom",))
+    fingerprints = {}
+    with pg_conn.cursor(name=f"fingerprint_{pg_table}") as cur:
+        cur.execute(f"""
+            SELECT md5(encode(ST_AsEWKB(t.geom), 'hex') || (to_jsonb(t){excluded})::text),
+                   ST_XMin(t.geom), ST_YMin(t.geom), ST_XMax(t.geom), ST_YMax(t.geom)
+            FROM {pg_table} t WHERE t.geom IS NOT NULL;
+        """)
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for fingerprint, *bbox in rows:
+                fingerprints[fingerprint] = tuple(bbox)
+    pg_conn.commit()
+    return fingerprints
+
+def get_stored_fingerprints(mysql_conn, pg_table):
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT fingerprint, min_lng, min_lat, max_lng, max_lat FROM {POLYGON_TABLE} WHERE pg_table = %s;",
+                   (pg_table,))
+    fingerprints = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    cursor.close()
+    return fingerprints
+
+def has_mapped_cells(mysql_conn, prefix):
+    """
+    해당 접두사의 mapping_state 비트가 켜진 격자가 하나라도 있는지 확인합니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT 1 FROM korea_grid WHERE `{STATE_COLUMN}` & {PREFIX_BITS[prefix]} != 0 LIMIT 1;")
+    found = cursor.fetchone() is not None
+    cursor.close()
+    return found
+
+def invalidate_cells(mysql_conn, prefix, bboxes):
+    """
+    변경된 폴리곤 경계 상자 안의 격자에서 해당 접두사의 mapping_state 비트를 끕니다.
+    경계 상자는 임시 테이블에 적재한 뒤 (lat, lng) 인덱스를 타는 한 번의 UPDATE ... JOIN으로 처리합니다.
+    """
+    if not bboxes:
+        return 0
+    bit = PREFIX_BITS[prefix]
+    ensure_lat_lng_index(mysql_conn)
+    cursor = mysql_conn.cursor()
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS changed_bboxes;")
+    cursor.execute("""
+        CREATE TEMPORARY TABLE changed_bboxes (
+            min_lng DOUBLE, min_lat DOUBLE, max_lng DOUBLE, max_lat DOUBLE
+        );
+    """)
+    cursor.executemany("INSERT INTO changed_bboxes (min_lng, min_lat, max_lng, max_lat) VALUES (%s, %s, %s, %s);",
+                       list(bboxes))
+    cursor.execute(f"""
+        UPDATE korea_grid g JOIN changed_bboxes b
+            ON g.lat BETWEEN b.min_lat AND b.max_lat AND g.lng BETWEEN b.min_lng AND b.max_lng
+        SET g.`{STATE_COLUMN}` = g.`{STATE_COLUMN}` & ~{bit};
+    """)
+    affected = cursor.rowcount
+    cursor.execute("DROP TEMPORARY TABLE changed_bboxes;")
+    cursor.close()
+    return affected
+
+def save_source_state(mysql_conn, pg_table, watermark, added, removed):
+    """
+    폴리곤 지문 차이와 새 워터마크를 저장합니다.
+    """
+    cursor = mysql_conn.cursor()
+    if removed:
+        cursor.executemany(f"DELETE FROM {POLYGON_TABLE} WHERE pg_table = %s AND fingerprint = %s;",
+                           [(pg_table, fingerprint) for fingerprint in removed])
+    if added:
+        cursor.executemany(
+            f"INSERT IGNORE INTO {POLYGON_TABLE} (pg_table, fingerprint, min_lng, min_lat, max_lng, max_lat) "
+            f"VALUES (%s, %s, %s, %s, %s, %s);",
+            [(pg_table, fingerprint) + bbox for fingerprint, bbox in added.items()]
+        )
+    cursor.execute(f"REPLACE INTO {WATERMARK_TABLE} (pg_table, row_count, checksum, max_updated_at) VALUES (%s, %s, %s, %s);",
+                   (pg_table,) + watermark)
+    cursor.close()
+
+def detect_changes(pg_conn, mysql_conn, prefix, pg_table):
+    """
+    원본 테이블의 워터마크를 비교하고, 바뀌었다면 추가/삭제된 폴리곤의 경계 상자 안 격자를 무효화합니다.
+    무효화(비트 끄기)를 먼저 commit 하므로 이후 재매핑이 중단되어도 다음 실행에서 이어서 처리됩니다.
+
+    처음 실행(저장된 워터마크 없음)이고 아직 이 접두사로 매핑된 격자가 없으면 모든 격자가 이미 재매핑 대상이므로
+    무효화 없이 지문만 저장합니다.
+    """
+    current = get_pg_watermark(pg_conn, pg_table)
+    pg_conn.commit()
+    stored = get_stored_watermark(mysql_conn, pg_table)
+    if not watermark_changed(stored, current):
+        print(f"[{pg_table}] 변경 없음")
+        return
+
+    new_prints = get_pg_fingerprints(pg_conn, pg_table)
+    old_prints = get_stored_fingerprints(mysql_conn, pg_table)
+    added = {fp: bbox for fp, bbox in new_prints.items() if fp not in old_prints}
+    removed = {fp: bbox for fp, bbox in old_prints.items() if fp not in new_prints}
+
+    if stored is None and not has_mapped_cells(mysql_conn, prefix):
+        invalidated = 0
+    else:
+        invalidated = invalidate_cells(mysql_conn, prefix, list(added.values()) + list(removed.values()))
+    save_source_state(mysql_conn, pg_table, current, added, removed)
+    mysql_conn.commit()
+    print(f"[{pg_table}] 폴리곤 {len(added)}개 추가, {len(removed)}개 삭제 → 격자 {invalidated}개 재매핑 대상")
+
+def mark_cells(mysql_conn, prefix, grid_ids):
+    bit = PREFIX_BITS[prefix]
+    cursor = mysql_conn.cursor()
+    for i in range(0, len(grid_ids), ID_BATCH_SIZE):
+        batch = grid_ids[i:i + ID_BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cursor.execute(f"UPDATE korea_grid SET `{STATE_COLUMN}` = `{STATE_COLUMN}` | {bit} WHERE id IN ({placeholders});",
+                       batch)
+    cursor.close()
+
+def remap_pending_cells(pg_conn, mysql_conn, prefix, candidates, ordered_cols, chunk_size, commit_size):
+    """
+    mapping_state 비트가 꺼진 격자만 다시 매핑합니다.
+    포함하는 폴리곤이 없어진 격자는 해당 접두사 컬럼을 NULL로 되돌립니다.
+    대상 격자는 id 순서의 청크 단위로 읽고, 청크마다 결과를 반영한 뒤 비트를 켜서 commit 합니다.
+    """
+    bit = PREFIX_BITS[prefix]
+    empty = (None,) * len(ordered_cols)
+    writer = StagedGridWriter(mysql_conn, {prefix: ordered_cols}, chunk_size, commit_size, verbose=False)
+    checked = 0
+    mapped = 0
+    with pg_conn.cursor() as pg_cur:
+        for grid_rows in iter_table_chunks(mysql_conn, ("id", "lat", "lng"),
+                                           where=f"`{STATE_COLUMN}` & {bit} = 0", chunk_size=FETCH_SIZE):
+            for grid_id, lat, lng in grid_rows:
+                result = lookup_point(pg_cur, candidates, lng, lat)
+                writer.add(grid_id, prefix, result if result else empty)
+                mapped += 1 if result else 0
+            writer.flush()
+            mark_cells(mysql_conn, prefix, [row[0] for row in grid_rows])
+            mysql_conn.commit()
+            checked += len(grid_rows)
+    writer.close()
+    return checked, mapped
+
+def run_incremental_mapping(pg_conn, mysql_conn, chunk_size=DEFAULT_CHUNK_SIZE, commit_size=DEFAULT_COMMIT_SIZE):
+    ensure_state_tables(mysql_conn)
+
+    sources, ordered_cols_map, extents = prepare_sources(pg_conn, mysql_conn)
+    point_queries = build_point_queries(sources, ordered_cols_map, extents)
+
+    for prefix, pg_tables in sources.items():
+        start = time.time()
+        for pg_table in pg_tables:
+            detect_changes(pg_conn, mysql_conn, prefix, pg_table)
+        checked, mapped = remap_pending_cells(pg_conn, mysql_conn, prefix, point_queries[prefix],
+                                              ordered_cols_map[prefix], chunk_size, commit_size)
+        print(f"[{prefix}] 격자 {checked}개 재매핑, {mapped}개 매칭 ({time.time() - start:.1f}초)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="변경된 원본 영역과 미처리 격자만 다시 매핑")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="스테이징 테이블에 적재 후 UPDATE ... JOIN 으로 반영하는 행 수")
+    parser.add_argument("--commit-size", type=int, default=DEFAULT_COMMIT_SIZE,
+                        help="commit 간격 (반영된 행 수)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    pg_conn = connect_pg()
+    if pg_conn is None:
+        return
+    mysql_conn = connect_mysql()
+    if mysql_conn is None:
+        pg_conn.close()
+        return
+
+    try:
+        run_incremental_mapping(pg_conn, mysql_conn, args.chunk_size, args.commit_size)
+    except (PGError, MySQLError) as e:
+        print(f"증분 매핑 오류: {e}")
+        pg_conn.rollback()
+        mysql_conn.rollback()
+
+    pg_conn.close()
+    mysql_conn.close()
+    print("데이터 동기화 작업 완료.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+import time
+
+import numpy as np
+import shapely
+
+# 1도(위도)당 거리. 버퍼(km)를 도 단위로 바꿀 때 사용하는 근사값입니다.
+KM_PER_DEGREE = 111.32
+# 육지 판정 타일 한 변의 격자점 수
+DEFAULT_TILE_SIZE = 64
+
+def _geometries(data):
+    """
+    GeoJSON(FeatureCollection / Feature / Geometry)에서 geometry 객체들을 꺼냅니다.
+    """
+    kind = data.get("type")
+    if kind == "FeatureCollection":
+        for feature in data["features"]:
+            yield from _geometries(feature)
+    elif kind == "Feature":
+        if data.get("geometry"):
+            yield data["geometry"]
+    elif kind == "GeometryCollection":
+        for geometry in data["geometries"]:
+            yield geometry
+    else:
+        yield data
+
+def load_land_polygon(path, buffer_km=0.0):
+    """
+    육지/해안선 폴리곤 GeoJSON 파일(경도, 위도 순서)을 하나의 (Multi)Polygon으로 합칩니다.
+    buffer_km > 0이면 해안선 바깥으로 그만큼 넓힙니다. (위도 1도 = 111.32km로 환산한 근사값)
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    geoms = [shapely.geometry.shape(g) for g in _geometries(data)]
+    polygons = [g for g in geoms if g.geom_type in ("Polygon", "MultiPolygon")]
+    if not polygons:
+        raise ValueError(f"육지 폴리곤이 없습니다: {path}")
+    land = shapely.union_all(polygons)
+    if buffer_km > 0:
+        land = land.buffer(buffer_km / KM_PER_DEGREE)
+    shapely.prepare(land)
+    return land
+
+def land_mask(land, start_lat, start_lng, step, n_rows, n_cols, tile_size=DEFAULT_TILE_SIZE):
+    """
+    (n_rows, n_cols) 격자점 중 육지(또는 버퍼 안)에 있는 점의 bool 배열을 만듭니다.
+
+    격자를 tile_size x tile_size 타일로 나누어, 타일의 격자점 범위 상자가 육지 안에 완전히 들어가면 전체를 육지로,
+    육지와 겹치지 않으면 전체를 바다로 처리하고, 해안선이 지나가는 타일에서만 격자점마다 판정합니다.
+    """
+    mask = np.zeros((n_rows, n_cols), dtype=bool)
+    stats = {"land": 0, "sea": 0, "coast": 0}
+    start = time.time()
+    for row0 in range(0, n_rows, tile_size):
+        row1 = min(row0 + tile_size, n_rows)
+        lats = start_lat + np.arange(row0, row1) * step
+        for col0 in range(0, n_cols, tile_size):
+            col1 = min(col0 + tile_size, n_cols)
+            lngs = start_lng + np.arange(col0, col1) * step
+            tile = shapely.box(lngs[0], lats[0], lngs[-1], lats[-1])
+            if shapely.contains_properly(land, tile):
+                mask[row0:row1, col0:col1] = True
+                stats["land"] += 1
+            elif not shapely.intersects(land, tile):
+                stats["sea"] += 1
+            else:
+                grid_lng, grid_lat = np.meshgrid(lngs, lats)
+                mask[row0:row1, col0:col1] = shapely.intersects_xy(land, grid_lng, grid_lat)
+                stats["coast"] += 1
+    print(f"육지 마스크: 타일 {sum(stats.values())}개 (육지 {stats['land']}, 바다 {stats['sea']}, "
+          f"해안 {stats['coast']}), 격자점 {int(mask.sum())}/{mask.size}개 유지 ({time.time() - start:.1f}초)")
+    return mask
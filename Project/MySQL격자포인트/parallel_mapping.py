@@ -0,0 +1,215 @@
+import argparse
+import math
+import time
+from multiprocessing import Pool
+
+from mysql.connector import Error as MySQLError
+from psycopg2 import Error as PGError
+
+from grid_writeback import StagedGridWriter, DEFAULT_CHUNK_SIZE, DEFAULT_COMMIT_SIZE
+from db import connect_pg, connect_mysql, ensure_lat_lng_index
+from point_mapping import prepare_sources, build_point_queries, map_grid_points
+
+CHECKPOINT_TABLE = "korea_grid_mapping_checkpoint"
+DEFAULT_TILE_SIZE = 0.5  # 타일 한 변의 크기 (도 단위)
+
+# 워커 프로세스마다 하나씩 유지하는 연결, 매핑 설정과 StagedGridWriter (init_worker에서 초기화)
+_worker = {}
+
+def ensure_checkpoint_table(mysql_conn):
+    """
+    완료된 타일을 기록하는 체크포인트 테이블이 없으면 생성합니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            run_name VARCHAR(64) NOT NULL,
+            tile_row INT NOT NULL,
+            tile_col INT NOT NULL,
+            point_count INT NOT NULL,
+            mapped_count INT NOT NULL,
+            completed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_name, tile_row, tile_col)
+        ) ENGINE=InnoDB;
+    """)
+    mysql_conn.commit()
+    cursor.close()
+
+def get_completed_tiles(mysql_conn, run_name):
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT tile_row, tile_col FROM {CHECKPOINT_TABLE} WHERE run_name = %s;", (run_name,))
+    completed = {(row, col) for row, col in cursor.fetchall()}
+    cursor.close()
+    return completed
+
+def reset_checkpoints(mysql_conn, run_name):
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE run_name = %s;", (run_name,))
+    mysql_conn.commit()
+    cursor.close()
+
+def build_tiles(mysql_conn, tile_size):
+    """
+    korea_grid의 좌표 범위를 tile_size 간격의 위도/경도 타일로 나눕니다.
+    각 타일은 (tile_row, tile_col, min_lat, max_lat, min_lng, max_lng)이며 범위는 [min, max) 반열린 구간입니다.
+    마지막 행/열 타일은 최대 좌표가 빠지지 않도록 한 칸 더 넓게 잡습니다.
+    경계는 정수 인덱스로 한 번만 계산해 이웃 타일이 같은 값을 공유하므로, 경계 위의 점이 빠지거나 두 번 매핑되지 않습니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute("SELECT MIN(lat), MAX(lat), MIN(lng), MAX(lng) FROM korea_grid;")
+    min_lat, max_lat, min_lng, max_lng = cursor.fetchone()
+    cursor.close()
+    if min_lat is None:
+        return []
+
+    n_rows = max(1, math.ceil((max_lat - min_lat) / tile_size))
+    n_cols = max(1, math.ceil((max_lng - min_lng) / tile_size))
+    lat_edges = [min_lat + r * tile_size for r in range(n_rows)] + [max_lat + tile_size]
+    lng_edges = [min_lng + c * tile_size for c in range(n_cols)] + [max_lng + tile_size]
+    return [(r, c, lat_edges[r], lat_edges[r + 1], lng_edges[c], lng_edges[c + 1])
+            for r in range(n_rows) for c in range(n_cols)]
+
+def init_worker(chunk_size, commit_size):
+    """
+    워커 프로세스 초기화: 자체 PostgreSQL/MySQL 연결을 열고 매핑 쿼리와 StagedGridWriter를 준비합니다.
+    writer는 타일마다 다시 만들지 않고 재사용하므로 요약/계수 테이블 확인, 인덱스 확인, 스테이징 테이블 생성은 워커당 한 번입니다.
+    연결에 실패해도 예외를 내지 않고(Pool이 워커를 계속 다시 띄우게 됨) 오류를 기록해 두어 타일마다 실패로 반환합니다.
+    """
+    pg_conn = connect_pg()
+    mysql_conn = connect_mysql()
+    if pg_conn is None or mysql_conn is None:
+        _worker.update(error="워커 DB 연결 실패")
+        return
+
+    sources, ordered_cols_map, extents = prepare_sources(pg_conn, mysql_conn)
+    try:
+        writer = StagedGridWriter(mysql_conn, ordered_cols_map, chunk_size, commit_size, verbose=False)
+    except MySQLError as e:
+        _worker.update(error=f"워커 스테이징 테이블 준비 실패: {e}")
+        return
+
+    _worker.update(
+        pg_conn=pg_conn,
+        mysql_conn=mysql_conn,
+        point_queries=build_point_queries(sources, ordered_cols_map, extents),
+        writer=writer,
+    )
+
+def map_tile(task):
+    """
+    하나의 타일에 속한 격자 포인트를 매핑하고, 워커의 writer로 결과를 반영/commit 한 뒤 같은 연결에서 체크포인트를 기록합니다.
+    반환값: (tile_row, tile_col, 포인트 수, 매핑 건수, 오류 메시지 또는 None)
+    """
+    run_name, (tile_row, tile_col, lat0, lat1, lng0, lng1) = task
+    if "error" in _worker:
+        return tile_row, tile_col, 0, 0, _worker["error"]
+    pg_conn = _worker["pg_conn"]
+    mysql_conn = _worker["mysql_conn"]
+    writer = _worker["writer"]
+    try:
+        cursor = mysql_conn.cursor()
+        cursor.execute(
+            "SELECT id, lat, lng FROM korea_grid WHERE lat >= %s AND lat < %s AND lng >= %s AND lng < %s;",
+            (lat0, lat1, lng0, lng1)
+        )
+        grid_rows = cursor.fetchall()
+        cursor.close()
+
+        mapped = map_grid_points(pg_conn, grid_rows, _worker["point_queries"], writer)
+        writer.flush()
+
+        # 매핑 결과가 모두 commit 된 뒤에만 타일을 완료로 기록
+        cursor = mysql_conn.cursor()
+        cursor.execute(
+            f"REPLACE INTO {CHECKPOINT_TABLE} (run_name, tile_row, tile_col, point_count, mapped_count) "
+            f"VALUES (%s, %s, %s, %s, %s);",
+            (run_name, tile_row, tile_col, len(grid_rows), mapped)
+        )
+        mysql_conn.commit()
+        cursor.close()
+        return tile_row, tile_col, len(grid_rows), mapped, None
+    except (PGError, MySQLError) as e:
+        pg_conn.rollback()
+        mysql_conn.rollback()
+        try:
+            # 다음 타일에 이 타일의 남은 결과가 섞이지 않도록 writer를 비움
+            writer.discard()
+        except MySQLError:
+            pass
+        return tile_row, tile_col, 0, 0, str(e)
+
+def run_parallel_mapping(run_name, workers, tile_size, restart=False,
+                         chunk_size=DEFAULT_CHUNK_SIZE, commit_size=DEFAULT_COMMIT_SIZE):
+    """
+    격자를 타일로 나누어 프로세스 풀에서 병렬로 매핑합니다.
+    같은 run_name으로 다시 실행하면 체크포인트에 기록된 타일은 건너뛰고 이어서 진행합니다.
+    """
+    mysql_conn = connect_mysql()
+    if mysql_conn is None:
+        return
+    try:
+        ensure_checkpoint_table(mysql_conn)
+        ensure_lat_lng_index(mysql_conn)
+        if restart:
+            reset_checkpoints(mysql_conn, run_name)
+        tiles = build_tiles(mysql_conn, tile_size)
+        completed = get_completed_tiles(mysql_conn, run_name)
+    except MySQLError as e:
+        print(f"병렬 매핑 준비 오류: {e}")
+        mysql_conn.close()
+        return
+    mysql_conn.close()
+
+    # 워커를 띄우기 전에 PostgreSQL 연결도 확인 (실패하면 워커마다 같은 오류가 반복되므로 바로 종료)
+    pg_conn = connect_pg()
+    if pg_conn is None:
+        return
+    pg_conn.close()
+
+    pending = [tile for tile in tiles if (tile[0], tile[1]) not in completed]
+    print(f"타일 {len(tiles)}개 중 {len(tiles) - len(pending)}개 완료됨, {len(pending)}개를 워커 {workers}개로 처리합니다.")
+    if not pending:
+        return
+
+    start = time.time()
+    done_points = 0
+    done_mapped = 0
+    failed = []
+    with Pool(processes=workers, initializer=init_worker, initargs=(chunk_size, commit_size)) as pool:
+        for i, (tile_row, tile_col, points, mapped, error) in enumerate(
+                pool.imap_unordered(map_tile, [(run_name, tile) for tile in pending]), start=1):
+            if error:
+                failed.append((tile_row, tile_col))
+                print(f"  타일 ({tile_row}, {tile_col}) 실패: {error}")
+                continue
+            done_points += points
+            done_mapped += mapped
+            elapsed = time.time() - start
+            print(f"  [{i}/{len(pending)}] 타일 ({tile_row}, {tile_col}) 완료: {points}개 포인트, {mapped}건 매핑 "
+                  f"(누적 {done_points / max(elapsed, 1e-9):.0f} rows/sec)")
+
+    elapsed = time.time() - start
+    print(f"\n🌟 {done_points}개의 격자 포인트, {done_mapped}건의 매핑 완료 ({elapsed:.1f}초)")
+    if failed:
+        print(f"실패한 타일 {len(failed)}개는 같은 --run-name으로 다시 실행하면 이어서 처리됩니다.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="타일 단위 병렬 격자 매핑 (체크포인트로 재시작 가능)")
+    parser.add_argument("--workers", type=int, default=4, help="워커 프로세스 수")
+    parser.add_argument("--tile-size", type=float, default=DEFAULT_TILE_SIZE, help="타일 크기 (도 단위)")
+    parser.add_argument("--run-name", default="default", help="체크포인트를 구분하는 실행 이름 (이어서 실행할 때는 같은 --tile-size 사용)")
+    parser.add_argument("--restart", action="store_true", help="기존 체크포인트를 지우고 처음부터 실행")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="스테이징 테이블에 적재 후 UPDATE ... JOIN 으로 반영하는 행 수")
+    parser.add_argument("--commit-size", type=int, default=DEFAULT_COMMIT_SIZE,
+                        help="commit 간격 (반영된 행 수)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    run_parallel_mapping(args.run_name, args.workers, args.tile_size, args.restart,
+                         args.chunk_size, args.commit_size)
+    print("데이터 동기화 작업 완료.")
+
+if __name__ == "__main__":
+    main()
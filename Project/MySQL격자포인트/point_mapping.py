@@ -1,27 +1,20 @@
-import os
-from dotenv import load_dotenv
-import mysql.connector
-import psycopg2
+import argparse
+import io
+import itertools
+import time
 from mysql.connector import Error as MySQLError
 from psycopg2 import Error as PGError
 
-# .env 파일 로드
-load_dotenv()
+from db import PG_SCHEMA, connect_pg, connect_mysql, stream_rows, iter_table_chunks
+from grid_writeback import StagedGridWriter, DEFAULT_CHUNK_SIZE, DEFAULT_COMMIT_SIZE
+from regions import load_regions, get_sources_by_prefix, get_source_extents, bbox_contains
 
-# PostgreSQL 연결 정보
-PG_USER = os.getenv("PG_USER")
-PG_PASSWORD = os.getenv("PG_PASSWORD")
-PG_HOST = os.getenv("PG_HOST")
-PG_PORT = os.getenv("PG_PORT")
-PG_DBNAME = os.getenv("PG_DBNAME")
-PG_SCHEMA = os.getenv("PG_SCHEMA")  # 보통 'public'
+# 접두사 → PostgreSQL 원본 테이블 목록 (지역 레지스트리 regions.json에서 구성)
+PG_SOURCES = get_sources_by_prefix(load_regions())
 
-# MySQL 연결 정보
-MYSQL_HOST = os.getenv("MYSQL_HOST")
-MYSQL_USER = os.getenv("MYSQL_USER")
-MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
-MYSQL_DBNAME = os.getenv("MYSQL_DBNAME")
-MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
+# join 모드에서 격자 포인트를 PostgreSQL로 COPY / 결과를 스트리밍할 때의 묶음 크기
+COPY_CHUNK_SIZE = 50_000
+JOIN_FETCH_SIZE = 10_000
 
 def get_mysql_column_order(mysql_conn):
     """
@@ -52,100 +45,249 @@ def get_pg_attributes(pg_conn, pg_table):
         print(f"[{pg_table}] 칼럼 조회 오류: {e}")
         return []
 
-def update_mysql_grid_with_pg_data(pg_conn, mysql_conn):
+def get_ordered_columns(mysql_columns, prefix, attr_cols):
     """
-    MySQL korea_grid 테이블의 격자 좌표를 기준으로 PostgreSQL 공간 데이터를 가져와 업데이트합니다.
+    MySQL 컬럼 순서대로, 지정 접두사가 붙어 있고 PostgreSQL 속성에도 존재하는 컬럼만 반환합니다.
     """
-    mapping = {
-        "imsangdo": "ulsan_imsangdo",
-        "soil": "ulsan_soil"
-    }
+    return [col for col in mysql_columns if col.startswith(f"{prefix}_") and col.replace(f"{prefix}_", "") in attr_cols]
 
-    # MySQL 컬럼 순서 조회
+def prepare_sources(pg_conn, mysql_conn, sources=None):
+    """
+    매핑에 필요한 정보를 한 번에 준비합니다.
+    반환값: (sources, ordered_cols_map, extents)
+      - sources: 매핑할 컬럼이 있는 접두사 → 실제로 존재하는 원본 테이블 목록
+      - ordered_cols_map: 접두사 → MySQL 컬럼 순서로 정렬된 컬럼 (해당 접두사의 모든 지역 테이블에 공통인 속성만)
+      - extents: 원본 테이블 → 경계 상자
+    """
+    sources = PG_SOURCES if sources is None else sources
     mysql_columns = get_mysql_column_order(mysql_conn)
+    extents = get_source_extents(pg_conn, [t for tables in sources.values() for t in tables])
 
-    # PostgreSQL 속성 컬럼 조회
-    pg_attr_map = {prefix: get_pg_attributes(pg_conn, pg_table) for prefix, pg_table in mapping.items()}
+    prepared = {}
+    ordered_cols_map = {}
+    for prefix, tables in sources.items():
+        tables = [t for t in tables if t in extents]
+        common_attrs = None
+        for pg_table in tables:
+            attrs = set(get_pg_attributes(pg_conn, pg_table))
+            common_attrs = attrs if common_attrs is None else common_attrs & attrs
+        ordered_cols = get_ordered_columns(mysql_columns, prefix, common_attrs or set())
+        if tables and ordered_cols:
+            prepared[prefix] = tables
+            ordered_cols_map[prefix] = ordered_cols
+    return prepared, ordered_cols_map, extents
 
-    # MySQL 모든 격자 포인트 조회
-    mysql_cursor = mysql_conn.cursor(dictionary=True)
-    mysql_cursor.execute("SELECT id, lat, lng FROM korea_grid;")
-    grid_rows = mysql_cursor.fetchall()
+def build_point_queries(sources, ordered_cols_map, extents):
+    """
+    접두사마다 [(원본 테이블, 경계 상자, 조회 쿼리), ...]를 만듭니다.
+    조회 쿼리는 한 좌표를 포함하는 첫 번째 폴리곤의 속성을 MySQL 컬럼 순서로 반환합니다.
+    """
+    queries = {}
+    for prefix, tables in sources.items():
+        ordered_cols = ordered_cols_map.get(prefix, [])
+        if not ordered_cols:
+            continue
+        attr_str = ", ".join([col.replace(f"{prefix}_", "") for col in ordered_cols])
+        queries[prefix] = [(pg_table, extents[pg_table], f"""
+            SELECT {attr_str}
+            FROM {pg_table}
+            WHERE ST_Contains(geom, ST_SetSRID(ST_MakePoint(%s, %s), 4326))
+            LIMIT 1;
+        """) for pg_table in tables]
+    return queries
 
+def lookup_point(pg_cur, candidates, lng, lat):
+    """
+    경계 상자가 좌표를 포함하는 원본 테이블만 레지스트리 순서대로 조회하여 첫 번째 결과를 반환합니다.
+    """
+    for pg_table, bbox, pg_query in candidates:
+        if not bbox_contains(bbox, lng, lat):
+            continue
+        pg_cur.execute(pg_query, (lng, lat))
+        result = pg_cur.fetchone()
+        if result:
+            return result
+    return None
+
+def map_grid_points(pg_conn, grid_rows, point_queries, writer):
+    """
+    (id, lat, lng) 격자 포인트마다 PostGIS를 조회하여 매칭된 속성을 writer에 추가하고, 매핑 건수를 반환합니다.
+    모든 지역을 격자 한 번의 순회로 매핑하며, 좌표가 경계 상자 밖인 지역 테이블은 조회하지 않습니다.
+    """
     successful_mappings = 0
+    with pg_conn.cursor() as pg_cur:
+        for grid_id, lat, lng in grid_rows:
+            for prefix, candidates in point_queries.items():
+                # PostGIS에서 해당 좌표가 포함되는지 확인
+                result = lookup_point(pg_cur, candidates, lng, lat)
+                if result:
+                    # MySQL 컬럼 순서대로 정렬된 값을 스테이징 버퍼에 추가
+                    writer.add(grid_id, prefix, result)
+                    successful_mappings += 1
+    return successful_mappings
 
-    # 각 격자 좌표마다 PostGIS 데이터를 매핑
-    for grid in grid_rows:
-        grid_id, lat, lng = grid["id"], grid["lat"], grid["lng"]
+def update_mysql_grid_with_pg_data(pg_conn, mysql_conn, chunk_size=DEFAULT_CHUNK_SIZE, commit_size=DEFAULT_COMMIT_SIZE):
+    """
+    MySQL korea_grid 테이블의 격자 좌표를 기준으로 PostgreSQL 공간 데이터를 가져와 업데이트합니다.
+    매핑 결과는 StagedGridWriter로 모아 청크 단위로 반영합니다.
+    """
+    # 원본 테이블/범위 및 MySQL 컬럼 순서에 맞춘 속성 컬럼 조회
+    sources, ordered_cols_map, extents = prepare_sources(pg_conn, mysql_conn)
 
-        for prefix, pg_table in mapping.items():
-            attr_cols = pg_attr_map.get(prefix, [])
-            if not attr_cols:
-                continue
+    # MySQL 격자 포인트를 id 순서로 청크 단위로 읽어, 각 격자 좌표마다 PostGIS 데이터를 매핑
+    # (격자 전체를 메모리에 올리지 않으며, 같은 연결로 매핑 결과를 반영)
+    grid_rows = itertools.chain.from_iterable(iter_table_chunks(mysql_conn, ("id", "lat", "lng")))
+    writer = StagedGridWriter(mysql_conn, ordered_cols_map, chunk_size, commit_size)
+    try:
+        successful_mappings = map_grid_points(pg_conn, grid_rows, build_point_queries(sources, ordered_cols_map, extents), writer)
+        writer.close()
+    except (PGError, MySQLError) as e:
+        print(f"매핑 오류: {e}")
+        mysql_conn.rollback()
+        return
 
-            # MySQL 컬럼 순서에 맞게 정렬
-            ordered_cols = [col for col in mysql_columns if col.startswith(f"{prefix}_") and col.replace(f"{prefix}_", "") in attr_cols]
+    print(f"\n🌟 최종적으로 {successful_mappings}개의 격자 포인트가 PostGIS 데이터를 매핑하여 업데이트되었습니다!")
 
-            if not ordered_cols:
-                continue
+def copy_grid_to_pg(mysql_conn, pg_conn, chunk_size=COPY_CHUNK_SIZE):
+    """
+    MySQL korea_grid의 (id, lng, lat)를 청크 단위로 읽어 PostgreSQL 임시 테이블 grid_points에 COPY 합니다.
+    임시 테이블은 현재 PostgreSQL 세션에서만 보이며 연결이 끊기면 자동으로 삭제됩니다.
+    """
+    with pg_conn.cursor() as pg_cur:
+        pg_cur.execute("DROP TABLE IF EXISTS pg_temp.grid_points;")
+        pg_cur.execute("CREATE TEMP TABLE grid_points (id integer PRIMARY KEY, lng double precision, lat double precision);")
 
-            attr_str = ", ".join([col.replace(f"{prefix}_", "") for col in ordered_cols])
+        total = 0
+        for rows in stream_rows(mysql_conn, "SELECT id, lng, lat FROM korea_grid;", fetch_size=chunk_size):
+            buf = io.StringIO()
+            buf.writelines(f"{grid_id},{lng},{lat}\n" for grid_id, lng, lat in rows)
+            buf.seek(0)
+            pg_cur.copy_expert("COPY grid_points (id, lng, lat) FROM STDIN WITH (FORMAT csv);", buf)
+            total += len(rows)
 
-            # PostGIS에서 해당 좌표가 포함되는지 확인
-            pg_query = f"""
-                SELECT {attr_str}
-                FROM {pg_table}
-                WHERE ST_Contains(geom, ST_SetSRID(ST_MakePoint(%s, %s), 4326))
-                LIMIT 1;
-            """
-            pg_cur = pg_conn.cursor()
-            pg_cur.execute(pg_query, (lng, lat))
-            result = pg_cur.fetchone()
-            pg_cur.close()
-
-            if result:
-                # MySQL 컬럼 순서대로 데이터 정렬 후 업데이트
-                set_clauses = [f"`{col}` = %s" for col in ordered_cols]
-                update_query = f"UPDATE korea_grid SET {', '.join(set_clauses)} WHERE id = %s;"
-                update_values = list(result) + [grid_id]
-
-                my_cur = mysql_conn.cursor()
-                my_cur.execute(update_query, update_values)
-                mysql_conn.commit()
-                my_cur.close()
-
-                successful_mappings += 1
-                print(f"✅ Grid id {grid_id} 매핑 완료 ({pg_table}, prefix: {prefix}) → {ordered_cols}")
-
-    mysql_cursor.close()
-    print(f"\n🌟 최종적으로 {successful_mappings}개의 격자 포인트가 PostGIS 데이터를 매핑하여 업데이트되었습니다!")
+        pg_cur.execute("ANALYZE grid_points;")
+    return total
 
-def main():
+def build_join_query(sources, ordered_cols_map, extents):
     """
-    PostgreSQL과 MySQL을 연결한 후 데이터 매핑을 수행합니다.
+    grid_points 임시 테이블과 각 접두사의 원본 폴리곤 테이블들을 LEFT JOIN LATERAL로 묶은 단일 공간 조인 쿼리를 만듭니다.
+    접두사마다 매칭 여부 플래그와 속성 컬럼(MySQL 컬럼 순서)을 반환합니다.
+    LATERAL 서브쿼리는 지역 테이블들을 레지스트리 순서로 UNION ALL 하여 첫 번째 폴리곤만 가져오며,
+    좌표가 경계 상자 밖인 테이블은 공간 인덱스 조회 전에 걸러집니다.
+    """
+    select_parts = ["g.id"]
+    join_parts = []
+    for i, (prefix, tables) in enumerate(sources.items()):
+        ordered_cols = ordered_cols_map[prefix]
+        alias = f"t{i}"
+        attr_str = ", ".join(col.replace(f"{prefix}_", "") for col in ordered_cols)
+        select_parts.append(f"{alias}.hit IS NOT NULL")
+        select_parts.extend(f"{alias}.{col.replace(f'{prefix}_', '')}" for col in ordered_cols)
+        branches = []
+        for pg_table in tables:
+            min_lng, min_lat, max_lng, max_lat = extents[pg_table]
+            branches.append(f"""
+                    (SELECT true AS hit, {attr_str}
+                     FROM {pg_table}
+                     WHERE g.lng BETWEEN {min_lng} AND {max_lng} AND g.lat BETWEEN {min_lat} AND {max_lat}
+                       AND ST_Contains(geom, ST_SetSRID(ST_MakePoint(g.lng, g.lat), 4326))
+                     LIMIT 1)""")
+        join_parts.append(f"""
+            LEFT JOIN LATERAL (
+                SELECT * FROM ({" UNION ALL".join(branches)}
+                ) u
+                LIMIT 1
+            ) {alias} ON true""")
+    where = " OR ".join(f"t{i}.hit IS NOT NULL" for i in range(len(sources)))
+    return f"SELECT {', '.join(select_parts)} FROM grid_points g{''.join(join_parts)} WHERE {where};"
+
+def update_mysql_grid_with_pg_join(pg_conn, mysql_conn, fetch_size=JOIN_FETCH_SIZE,
+                                   chunk_size=DEFAULT_CHUNK_SIZE, commit_size=DEFAULT_COMMIT_SIZE):
     """
+    격자 포인트를 PostgreSQL로 일괄 전송한 뒤 한 번의 공간 조인으로 매핑하고,
+    서버 측 커서로 결과를 스트리밍하면서 MySQL korea_grid를 업데이트합니다.
+    포인트마다 PostGIS를 왕복 조회하는 update_mysql_grid_with_pg_data()와 결과는 같습니다.
+    """
+    sources, ordered_cols_map, extents = prepare_sources(pg_conn, mysql_conn)
+    if not sources:
+        print("매핑할 컬럼이 없습니다.")
+        return
+
+    start = time.time()
     try:
-        pg_conn = psycopg2.connect(
-            host=PG_HOST, port=PG_PORT, database=PG_DBNAME, user=PG_USER, password=PG_PASSWORD
-        )
-        print("PostgreSQL에 성공적으로 연결됨.")
-    except PGError as e:
-        print("PostgreSQL 연결 오류:", e)
+        grid_count = copy_grid_to_pg(mysql_conn, pg_conn)
+    except (PGError, MySQLError) as e:
+        print(f"격자 포인트 COPY 오류: {e}")
+        pg_conn.rollback()
         return
+    elapsed = time.time() - start
+    print(f"격자 포인트 {grid_count}개를 PostgreSQL로 전송 ({elapsed:.1f}초, {grid_count / max(elapsed, 1e-9):.0f} rows/sec)")
 
+    start = time.time()
+    joined_rows = 0
+    successful_mappings = 0
     try:
-        mysql_conn = mysql.connector.connect(
-            host=MYSQL_HOST, port=MYSQL_PORT, user=MYSQL_USER,
-            password=MYSQL_PASSWORD, database=MYSQL_DBNAME, autocommit=False
-        )
-        print("MySQL에 성공적으로 연결됨.")
-    except MySQLError as e:
-        print("MySQL 연결 오류:", e)
+        # 이름이 있는 커서 = PostgreSQL 서버 측 커서 (결과 전체를 메모리에 올리지 않음)
+        writer = StagedGridWriter(mysql_conn, ordered_cols_map, chunk_size, commit_size)
+        for rows in stream_rows(pg_conn, build_join_query(sources, ordered_cols_map, extents),
+                                fetch_size=fetch_size, name="grid_join"):
+            for row in rows:
+                grid_id = row[0]
+                pos = 1
+                for prefix in sources:
+                    n_cols = len(ordered_cols_map[prefix])
+                    if row[pos]:
+                        writer.add(grid_id, prefix, row[pos + 1:pos + 1 + n_cols])
+                        successful_mappings += 1
+                    pos += 1 + n_cols
+            joined_rows += len(rows)
+        writer.close()
+        pg_conn.commit()
+    except (PGError, MySQLError) as e:
+        print(f"공간 조인 매핑 오류: {e}")
+        pg_conn.rollback()
+        mysql_conn.rollback()
+        return
+
+    elapsed = time.time() - start
+    print(f"\n🌟 공간 조인으로 {joined_rows}개의 격자 포인트, {successful_mappings}건의 매핑을 업데이트했습니다! "
+          f"({elapsed:.1f}초, {joined_rows / max(elapsed, 1e-9):.0f} rows/sec)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="korea_grid 격자 포인트에 PostGIS 속성 매핑")
+    parser.add_argument("--mode", choices=["point", "join", "strtree"], default="point",
+                        help="point: 포인트마다 PostGIS 조회, join: 일괄 COPY 후 단일 공간 조인, "
+                             "strtree: 폴리곤을 한 번 읽어 로컬 STRtree로 포함 검사")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="스테이징 테이블에 적재 후 UPDATE ... JOIN 으로 반영하는 행 수")
+    parser.add_argument("--commit-size", type=int, default=DEFAULT_COMMIT_SIZE,
+                        help="commit 간격 (반영된 행 수)")
+    return parser.parse_args()
+
+def main():
+    """
+    PostgreSQL과 MySQL을 연결한 후 데이터 매핑을 수행합니다.
+    """
+    args = parse_args()
+
+    pg_conn = connect_pg()
+    if pg_conn is None:
+        return
+
+    mysql_conn = connect_mysql()
+    if mysql_conn is None:
         pg_conn.close()
         return
 
     # MySQL의 korea_grid 테이블에 저장된 격자 좌표를 기준으로 PostGIS 데이터를 업데이트
-    update_mysql_grid_with_pg_data(pg_conn, mysql_conn)
+    if args.mode == "join":
+        update_mysql_grid_with_pg_join(pg_conn, mysql_conn, chunk_size=args.chunk_size, commit_size=args.commit_size)
+    elif args.mode == "strtree":
+        # shapely는 strtree 모드에서만 필요하므로 여기서 불러옵니다.
+        from strtree_mapping import update_mysql_grid_with_strtree
+        update_mysql_grid_with_strtree(pg_conn, mysql_conn, chunk_size=args.chunk_size, commit_size=args.commit_size)
+    else:
+        update_mysql_grid_with_pg_data(pg_conn, mysql_conn, chunk_size=args.chunk_size, commit_size=args.commit_size)
 
     # 연결 종료
     pg_conn.close()
@@ -0,0 +1,54 @@
+import json
+import os
+
+from psycopg2 import Error as PGError
+
+# 지역 레지스트리 파일 경로 (.env의 REGION_REGISTRY로 변경 가능)
+REGION_REGISTRY = os.getenv("REGION_REGISTRY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "regions.json"))
+
+def load_regions(path=REGION_REGISTRY):
+    """
+    지역 레지스트리(JSON)를 읽어 [{"name": ..., "sources": {접두사: PostgreSQL 테이블}}, ...] 목록을 반환합니다.
+    새 지역은 코드 수정 없이 regions.json에 항목을 추가하면 됩니다.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["regions"]
+
+def get_sources_by_prefix(regions):
+    """
+    접두사별 원본 테이블 목록을 레지스트리 순서대로 반환합니다. 예: {"imsangdo": ["ulsan_imsangdo", "busan_imsangdo"]}
+    """
+    sources = {}
+    for region in regions:
+        for prefix, pg_table in region["sources"].items():
+            tables = sources.setdefault(prefix, [])
+            if pg_table not in tables:
+                tables.append(pg_table)
+    return sources
+
+def get_source_extents(pg_conn, tables):
+    """
+    원본 테이블마다 geom 전체의 경계 상자 (min_lng, min_lat, max_lng, max_lat)를 한 번 계산합니다.
+    비어 있거나 조회에 실패한 테이블은 결과에서 빠지므로 매핑 대상에서도 제외됩니다.
+    """
+    extents = {}
+    for pg_table in tables:
+        try:
+            with pg_conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e)
+                    FROM (SELECT ST_Extent(geom) AS e FROM {pg_table}) s;
+                """)
+                row = cur.fetchone()
+            pg_conn.commit()
+        except PGError as e:
+            print(f"[{pg_table}] 범위 조회 오류: {e}")
+            pg_conn.rollback()
+            continue
+        if row and row[0] is not None:
+            extents[pg_table] = tuple(row)
+    return extents
+
+def bbox_contains(bbox, lng, lat):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    return min_lng <= lng <= max_lng and min_lat <= lat <= max_lat
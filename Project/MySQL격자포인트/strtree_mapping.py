@@ -0,0 +1,110 @@
+import time
+
+import numpy as np
+import shapely
+from shapely import STRtree
+from mysql.connector import Error as MySQLError
+from psycopg2 import Error as PGError
+
+from db import iter_table_chunks
+from grid_writeback import StagedGridWriter, DEFAULT_CHUNK_SIZE, DEFAULT_COMMIT_SIZE
+from point_mapping import prepare_sources
+
+# PostgreSQL 폴리곤 / MySQL 격자 포인트를 읽어 오는 묶음 크기
+POLYGON_FETCH_SIZE = 20_000
+GRID_FETCH_SIZE = 100_000
+
+class PolygonIndex:
+    """
+    PostgreSQL 폴리곤 테이블(들)을 WKB로 한 번만 읽어 메모리 STRtree로 만든 점-폴리곤 포함 인덱스입니다.
+    attrs[i]는 i번째 폴리곤의 속성 값(MySQL 컬럼 순서)입니다.
+    """
+
+    def __init__(self, geoms, attrs):
+        self.geoms = geoms
+        self.attrs = attrs
+        self.tree = STRtree(geoms)
+
+    @classmethod
+    def from_pg(cls, pg_conn, pg_tables, attr_names, fetch_size=POLYGON_FETCH_SIZE):
+        """
+        서버 측 커서로 각 테이블의 폴리곤(WKB)과 속성을 순서대로 스트리밍하여 하나의 인덱스를 만듭니다.
+        여러 지역 테이블을 하나의 STRtree에 담으므로 지역별 범위 검사는 트리가 대신합니다.
+        """
+        attr_str = ", ".join(attr_names)
+        geom_chunks = []
+        attrs = []
+        for pg_table in pg_tables:
+            with pg_conn.cursor(name=f"load_{pg_table}") as cur:
+                cur.execute(f"SELECT ST_AsBinary(geom), {attr_str} FROM {pg_table} WHERE geom IS NOT NULL;")
+                while True:
+                    rows = cur.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    geom_chunks.append(shapely.from_wkb([bytes(row[0]) for row in rows]))
+                    attrs.extend(tuple(row[1:]) for row in rows)
+            pg_conn.commit()
+        geoms = np.concatenate(geom_chunks) if geom_chunks else np.empty(0, dtype=object)
+        return cls(geoms, attrs)
+
+    def lookup(self, lngs, lats):
+        """
+        좌표 배열에 대해 포함하는 폴리곤을 찾아 (포인트 인덱스 배열, 폴리곤 인덱스 배열)을 반환합니다.
+        ST_Contains와 같이 경계 위의 점은 포함하지 않으며, 여러 폴리곤에 속하면 먼저 읽은 폴리곤 하나만 사용합니다.
+        """
+        if len(self.geoms) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        points = shapely.points(lngs, lats)
+        point_idx, poly_idx = self.tree.query(points, predicate="within")
+        order = np.lexsort((poly_idx, point_idx))
+        point_idx, poly_idx = point_idx[order], poly_idx[order]
+        point_idx, first = np.unique(point_idx, return_index=True)
+        return point_idx, poly_idx[first]
+
+def update_mysql_grid_with_strtree(pg_conn, mysql_conn, chunk_size=DEFAULT_CHUNK_SIZE, commit_size=DEFAULT_COMMIT_SIZE):
+    """
+    원본 폴리곤을 테이블당 한 번씩 읽어 STRtree를 만든 뒤, korea_grid 전체를 로컬에서 벡터화된
+    점-폴리곤 포함 검사로 매핑합니다. 결과는 update_mysql_grid_with_pg_data()와 같습니다.
+    """
+    sources, ordered_cols_map, _ = prepare_sources(pg_conn, mysql_conn)
+
+    start = time.time()
+    indexes = {}
+    try:
+        for prefix, pg_tables in sources.items():
+            attr_names = [col.replace(f"{prefix}_", "") for col in ordered_cols_map[prefix]]
+            indexes[prefix] = PolygonIndex.from_pg(pg_conn, pg_tables, attr_names)
+            print(f"[{prefix}: {', '.join(pg_tables)}] 폴리곤 {len(indexes[prefix].geoms)}개 로드 "
+                  f"({time.time() - start:.1f}초)")
+    except PGError as e:
+        print(f"폴리곤 로드 오류: {e}")
+        pg_conn.rollback()
+        return
+    if not indexes:
+        print("매핑할 컬럼이 없습니다.")
+        return
+
+    start = time.time()
+    processed = 0
+    successful_mappings = 0
+    try:
+        writer = StagedGridWriter(mysql_conn, ordered_cols_map, chunk_size, commit_size)
+        # 격자 포인트를 id 순서의 청크 단위로 읽으며 바로 매핑합니다. (청크 쿼리 사이에 같은 연결로 결과 반영)
+        for rows in iter_table_chunks(mysql_conn, ("id", "lat", "lng"), chunk_size=GRID_FETCH_SIZE):
+            grid = np.array(rows, dtype=np.float64)
+            ids = grid[:, 0].astype(np.int64)
+            for prefix, index in indexes.items():
+                point_idx, poly_idx = index.lookup(grid[:, 2], grid[:, 1])
+                for p, q in zip(point_idx, poly_idx):
+                    writer.add(int(ids[p]), prefix, index.attrs[q])
+                successful_mappings += len(point_idx)
+            processed += len(ids)
+        writer.close()
+    except MySQLError as e:
+        print(f"매핑 결과 반영 오류: {e}")
+        mysql_conn.rollback()
+        return
+
+    elapsed = time.time() - start
+    print(f"\n🌟 STRtree로 {processed}개의 격자 포인트, {successful_mappings}건의 매핑을 업데이트했습니다! "
+          f"({elapsed:.1f}초, {processed / max(elapsed, 1e-9):.0f} rows/sec)")
@@ -4,7 +4,8 @@ const pool = require('../config/db');
 const { 
     runFireSpreadPrediction, 
     getGridData, 
-    getGridWithFuelInfo 
+    getGridWithFuelInfo,
+    getSimulationCacheStats
 } = require('../services/simulationService');
 
 router.post('/predict-fire-spread', async (req, res) => {
@@ -23,6 +24,10 @@ router.post('/predict-fire-spread', async (req, res) => {
     }
 });
 
+router.get('/simulation-cache-stats', (req, res) => {
+    res.json(getSimulationCacheStats());
+});
+
 router.get('/mapped-grid-data', async (req, res) => {
     try {
         const features = await getGridData(pool);
@@ -0,0 +1,222 @@
+const crypto = require('crypto');
+const fs = require('fs/promises');
+const os = require('os');
+const path = require('path');
+const zlib = require('zlib');
+const { promisify } = require('util');
+
+const gzip = promisify(zlib.gzip);
+const gunzip = promisify(zlib.gunzip);
+
+const MB = 1024 * 1024;
+// 다른 워커 프로세스가 쓴 파일을 반영하도록 디스크 계층 목록을 다시 읽는 간격
+const DISK_RESCAN_MS = 10 * 60 * 1000;
+
+/**
+ * 시뮬레이션 결과 캐시.
+ * 메모리 계층은 바이트 예산 안에서 LRU로 유지하고, 모든 결과는 gzip으로 압축해 디스크 계층에도 저장합니다.
+ * 디스크 계층은 서버 재시작 후에도 남아 있으며, 같은 디렉터리를 쓰는 여러 워커 프로세스가 함께 사용합니다.
+ * 디스크 쓰기와 정리는 응답을 기다리게 하지 않도록 백그라운드에서 순서대로 처리하고, 디스크 파일 목록과 크기는
+ * 메모리에 유지해 정리할 때 디렉터리를 다시 읽지 않습니다. 디스크에서 읽은 파일은 수정 시각을 갱신해 LRU 순서를 지킵니다.
+ */
+class SimulationResultCache {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.maxBytes] - 메모리 계층 예산 (JSON 직렬화 크기 기준)
+     * @param {string|null} [options.diskDir] - 디스크 계층 디렉터리 (null이면 디스크 계층 사용 안 함)
+     * @param {number} [options.diskMaxBytes] - 디스크 계층 예산 (압축 파일 크기 기준)
+     */
+    constructor({ maxBytes = 256 * MB, diskDir = null, diskMaxBytes = 2048 * MB } = {}) {
+        this.maxBytes = maxBytes;
+        this.diskDir = diskDir;
+        this.diskMaxBytes = diskMaxBytes;
+        this.entries = new Map(); // key -> { value, size }, 삽입 순서 = 오래 사용하지 않은 순서
+        this.bytes = 0;
+        this.stats = { memoryHits: 0, diskHits: 0, misses: 0, evictions: 0, diskEvictions: 0, diskErrors: 0 };
+        this.diskFiles = null; // 파일 이름 -> 크기, 삽입 순서 = 오래 사용하지 않은 순서 (처음 쓸 때 디렉터리에서 읽음)
+        this.diskBytes = 0;
+        this.diskScannedAt = 0;
+        this.diskQueue = Promise.resolve(); // 백그라운드 디스크 쓰기/정리 작업 (순서대로 실행)
+    }
+
+    diskName(key) {
+        return `${crypto.createHash('sha1').update(key).digest('hex')}.json.gz`;
+    }
+
+    diskPath(key) {
+        return path.join(this.diskDir, this.diskName(key));
+    }
+
+    /**
+     * 캐시된 결과를 반환합니다. 메모리에 없으면 디스크에서 읽어 메모리 계층으로 올립니다.
+     * @returns {Promise<object|undefined>}
+     */
+    async get(key) {
+        const entry = this.entries.get(key);
+        if (entry) {
+            // 가장 최근에 사용한 항목으로 이동
+            this.entries.delete(key);
+            this.entries.set(key, entry);
+            this.stats.memoryHits++;
+            return entry.value;
+        }
+        if (this.diskDir) {
+            try {
+                const file = this.diskPath(key);
+                const compressed = await fs.readFile(file);
+                const json = (await gunzip(compressed)).toString('utf8');
+                const value = JSON.parse(json);
+                this.remember(key, value, Buffer.byteLength(json));
+                this.stats.diskHits++;
+                // 최근에 사용한 파일로 표시 (다른 프로세스의 정리 순서에도 반영되도록 수정 시각 갱신)
+                this.trackDiskFile(this.diskName(key), compressed.length);
+                const now = new Date();
+                fs.utimes(file, now, now).catch(() => {});
+                return value;
+            } catch (error) {
+                if (error.code !== 'ENOENT') {
+                    this.stats.diskErrors++;
+                    console.error(`[SimulationResultCache] 디스크 캐시 읽기 실패 (${key}):`, error.message);
+                }
+            }
+        }
+        this.stats.misses++;
+        return undefined;
+    }
+
+    /**
+     * 결과를 메모리 계층에 저장하고, 디스크 계층 쓰기는 백그라운드 작업으로 예약합니다.
+     */
+    async set(key, value) {
+        const json = JSON.stringify(value);
+        this.remember(key, value, Buffer.byteLength(json));
+        if (!this.diskDir) return;
+        this.diskQueue = this.diskQueue.then(() => this.writeDisk(key, json));
+    }
+
+    /**
+     * 예약된 디스크 쓰기/정리가 모두 끝날 때까지 기다립니다. (종료 전이나 테스트에서 사용)
+     */
+    flush() {
+        return this.diskQueue;
+    }
+
+    async writeDisk(key, json) {
+        try {
+            await this.loadDiskFiles();
+            const target = this.diskPath(key);
+            // 다른 프로세스가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 이름을 바꿉니다.
+            const temp = `${target}.${process.pid}.tmp`;
+            const compressed = await gzip(json);
+            await fs.writeFile(temp, compressed);
+            await fs.rename(temp, target);
+            this.trackDiskFile(this.diskName(key), compressed.length);
+            await this.pruneDisk();
+        } catch (error) {
+            this.stats.diskErrors++;
+            console.error(`[SimulationResultCache] 디스크 캐시 쓰기 실패 (${key}):`, error.message);
+        }
+    }
+
+    /**
+     * 디스크 계층 파일 목록을 디렉터리에서 읽어 수정 시각 순으로 메모리에 둡니다.
+     * 처음 쓸 때와 DISK_RESCAN_MS마다(다른 프로세스가 쓰거나 지운 파일 반영) 한 번씩만 읽습니다.
+     */
+    async loadDiskFiles() {
+        if (this.diskFiles && Date.now() - this.diskScannedAt < DISK_RESCAN_MS) return;
+        await fs.mkdir(this.diskDir, { recursive: true });
+        const names = (await fs.readdir(this.diskDir)).filter(name => name.endsWith('.json.gz'));
+        const files = [];
+        for (const name of names) {
+            try {
+                const stat = await fs.stat(path.join(this.diskDir, name));
+                files.push({ name, size: stat.size, mtime: stat.mtimeMs });
+            } catch (error) {
+                // 다른 프로세스가 먼저 지운 파일
+            }
+        }
+        files.sort((a, b) => a.mtime - b.mtime);
+        this.diskFiles = new Map(files.map(file => [file.name, file.size]));
+        this.diskBytes = files.reduce((total, file) => total + file.size, 0);
+        this.diskScannedAt = Date.now();
+    }
+
+    /**
+     * 디스크 파일을 가장 최근에 사용한 파일로 기록합니다.
+     */
+    trackDiskFile(name, size) {
+        if (!this.diskFiles) return;
+        if (this.diskFiles.has(name)) {
+            this.diskBytes -= this.diskFiles.get(name);
+            this.diskFiles.delete(name);
+        }
+        this.diskFiles.set(name, size);
+        this.diskBytes += size;
+    }
+
+    remember(key, value, size) {
+        if (this.entries.has(key)) {
+            this.bytes -= this.entries.get(key).size;
+            this.entries.delete(key);
+        }
+        if (size > this.maxBytes) return; // 예산보다 큰 결과는 디스크 계층에만 둡니다.
+        this.entries.set(key, { value, size });
+        this.bytes += size;
+        for (const [oldKey, oldEntry] of this.entries) {
+            if (this.bytes <= this.maxBytes) break;
+            this.entries.delete(oldKey);
+            this.bytes -= oldEntry.size;
+            this.stats.evictions++;
+        }
+    }
+
+    /**
+     * 디스크 계층이 예산을 넘으면 가장 오래 사용하지 않은 파일부터 지웁니다. (메모리의 파일 목록 기준)
+     */
+    async pruneDisk() {
+        for (const [name, size] of this.diskFiles) {
+            if (this.diskBytes <= this.diskMaxBytes) break;
+            this.diskFiles.delete(name);
+            this.diskBytes -= size;
+            await fs.rm(path.join(this.diskDir, name), { force: true });
+            this.stats.diskEvictions++;
+        }
+    }
+
+    /**
+     * 모니터링용 카운터
+     */
+    getStats() {
+        const hits = this.stats.memoryHits + this.stats.diskHits;
+        const lookups = hits + this.stats.misses;
+        return {
+            ...this.stats,
+            hits,
+            hitRate: lookups ? hits / lookups : 0,
+            entries: this.entries.size,
+            bytes: this.bytes,
+            maxBytes: this.maxBytes,
+            diskDir: this.diskDir,
+            diskMaxBytes: this.diskMaxBytes,
+            diskEntries: this.diskFiles ? this.diskFiles.size : null,
+            diskBytes: this.diskFiles ? this.diskBytes : null,
+        };
+    }
+}
+
+/**
+ * .env 설정으로 캐시를 만듭니다.
+ * SIM_CACHE_MAX_MB: 메모리 계층 예산 (기본 256)
+ * SIM_CACHE_DIR: 디스크 계층 디렉터리 (기본 OS 임시 폴더, 'off'이면 사용 안 함)
+ * SIM_CACHE_DISK_MAX_MB: 디스크 계층 예산 (기본 2048)
+ */
+const createSimulationResultCache = () => {
+    const diskDir = process.env.SIM_CACHE_DIR ?? path.join(os.tmpdir(), 'fire-simulation-cache');
+    return new SimulationResultCache({
+        maxBytes: Number(process.env.SIM_CACHE_MAX_MB ?? 256) * MB,
+        diskDir: diskDir === 'off' ? null : diskDir,
+        diskMaxBytes: Number(process.env.SIM_CACHE_DISK_MAX_MB ?? 2048) * MB,
+    });
+};
+
+module.exports = { SimulationResultCache, createSimulationResultCache };
@@ -1,12 +1,19 @@
+const crypto = require('crypto');
 const turf = require('@turf/turf');
 const db = require('../firebaseAdmin');
 const { mountainStationsData } = require('../mountainStations');
+const { createSimulationResultCache } = require('./resultCache');
 
-// 인메모리 캐시 선언
-const simulationCache = new Map();
+// 시뮬레이션 결과 캐시 (메모리 LRU + 디스크 계층)
+const simulationCache = createSimulationResultCache();
+// 격자 테이블별 데이터 버전 (MySQL격자포인트/grid_version.py). 시뮬레이션 테이블을 다시 가져온 뒤
+// python grid_version.py --table imported_fire_data_auto 로 올립니다. (매퍼는 korea_grid 행만 올립니다)
+const GRID_VERSION_TABLE = 'grid_versions';
 
 // 상수 정의
 const KOREA_GRID_TABLE = 'imported_fire_data_auto';
+// 날씨와 무관한 격자별 계수 테이블 (python -m fire_sim.static_factors 로 생성)
+const STATIC_FACTOR_TABLE = `${KOREA_GRID_TABLE}_static_factors`;
 const FIREBREAK_DISTANCE_KM = 1.5; // 이 거리 이상은 '방지턱'으로 간주
 const STRONG_WIND_MS = 10;         // 이 풍속 이상은 방지턱을 넘을 수 있는 '강풍'
 const ONE_GRID_UNIT_KM = 1.2;      // 격자 한 칸의 기준 거리
@@ -34,28 +41,32 @@ const getSlopeFactor = (code1) => {
 }
 
 /**
- * 실시간 습도와 토양 코드를 조합하여 건조도 요인을 계산합니다.
- * 습도가 낮고 토양이 건조할수록 확산 속도가 빨라집니다.
- * @param {string} soilCode - 토양배수등급코드
+ * 습도에 따른 건조도 기본 계수를 반환합니다. (페널티 포함)
  * @param {number} humidity - 현재 습도 (%)
- * @returns {number} 건조도에 따른 확산 계수
+ * @returns {number} 습도 계수
  */
-const getMoistureFactor = (soilCode, humidity) => {
-    let factor = 1.0;
-    // 습도에 따른 기본 계수 설정 (페널티 포함)
-    if (humidity < 35) factor = 1.5;
-    else if (humidity < 50) factor = 1.2;
-    else if (humidity > 80) factor = 0.4;
-    else if (humidity > 70) factor = 0.6;
-    
-    if(!soilCode) return factor;
+const getHumidityFactor = (humidity) => {
+    if (humidity < 35) return 1.5;
+    if (humidity < 50) return 1.2;
+    if (humidity > 80) return 0.4;
+    if (humidity > 70) return 0.6;
+    return 1.0;
+}
+
+/**
+ * 토양배수등급코드에 따른 건조도 가중치를 반환합니다. 날씨와 무관하므로 격자마다 한 번만 계산합니다.
+ * @param {string} soilCode - 토양배수등급코드
+ * @returns {number} 습도 계수에 곱할 가중치
+ */
+const getSoilMultiplier = (soilCode) => {
+    if(!soilCode) return 1.0;
 
     // 토양 배수 등급(건조도)에 따른 가중치 적용
-    if (['01','02','05','06','07','08','09','10','11','13','14','15','16','17','18','19','23','24'].includes(soilCode)) return factor * 1.2;
-    if (['03','12','20'].includes(soilCode)) return factor * 0.8;
+    if (['01','02','05','06','07','08','09','10','11','13','14','15','16','17','18','19','23','24'].includes(soilCode)) return 1.2;
+    if (['03','12','20'].includes(soilCode)) return 0.8;
     // 물, 시가지 등 비가연성 지역에서는 확산 계수를 0으로 만듦
     if (['82','91','92','93','94','95','97','99','27','28','29'].includes(soilCode)) return 0;
-    return factor;
+    return 1.0;
 }
 
 /**
@@ -132,6 +143,71 @@ const findNeighbors = (currentPoint, allPoints) => {
 }
 
 
+/**
+ * 시뮬레이션에 필요한 격자점과 날씨와 무관한 계수(연료 점수, 경사 계수, 토양 건조도 가중치)를 불러옵니다.
+ * 계수는 정적 계수 테이블에서 읽고, 테이블이 없거나 계산에 쓴 코드가 현재 격자와 다른 격자만 코드에서 계산합니다.
+ * @param {object} connection - DB 커넥션
+ * @returns {Promise<Array<object>>} 격자점 배열 (coordinates, fuelScore, slopeFactor, soilMultiplier 포함)
+ */
+const loadGridPoints = async (connection) => {
+    let rows;
+    try {
+        [rows] = await connection.query(
+            `SELECT g.id, g.lat, g.lng, g.imsangdo_frtp_cd, g.soil_tpgrp_tpcd, g.soil_sltp_cd,
+                    f.fuel_score AS fuelScore, f.slope_factor AS slopeFactor, f.soil_multiplier AS soilMultiplier
+             FROM ${KOREA_GRID_TABLE} g
+             LEFT JOIN ${STATIC_FACTOR_TABLE} f ON f.grid_id = g.id
+                AND f.imsangdo_frtp_cd <=> g.imsangdo_frtp_cd AND f.soil_tpgrp_tpcd <=> g.soil_tpgrp_tpcd AND f.soil_sltp_cd <=> g.soil_sltp_cd`
+        );
+    } catch (error) {
+        // 정적 계수 테이블이 없거나 이전 형식이면 코드에서 계산
+        if (error.code !== 'ER_NO_SUCH_TABLE' && error.code !== 'ER_BAD_FIELD_ERROR') throw error;
+        [rows] = await connection.query(`SELECT id, lat, lng, imsangdo_frtp_cd, soil_tpgrp_tpcd, soil_sltp_cd FROM ${KOREA_GRID_TABLE}`);
+    }
+    return rows.map(row => ({
+        ...row,
+        coordinates: [parseFloat(row.lng), parseFloat(row.lat)],
+        fuelScore: row.fuelScore ?? getFuelScore(row.imsangdo_frtp_cd),
+        slopeFactor: row.slopeFactor ?? getSlopeFactor(row.soil_tpgrp_tpcd),
+        soilMultiplier: row.soilMultiplier ?? getSoilMultiplier(row.soil_sltp_cd),
+    }));
+};
+
+/**
+ * 격자 데이터의 버전을 반환합니다. GRID_VERSION 환경 변수(예: 격자 스냅샷 지문)가 있으면 그 값을,
+ * 없으면 grid_versions 테이블에서 격자 값을 바꿀 때마다 올리는 버전 번호를 읽습니다. (기본 키 한 행 조회)
+ * 버전이 한 번도 기록되지 않은 격자(테이블이나 행이 없음)는 버전 0으로 봅니다.
+ * @param {object} connection - DB 커넥션
+ * @returns {Promise<string>} 격자 버전 문자열
+ */
+const getGridVersion = async (connection) => {
+    if (process.env.GRID_VERSION) return process.env.GRID_VERSION;
+    try {
+        const [rows] = await connection.query(`SELECT version FROM ${GRID_VERSION_TABLE} WHERE table_name = ?`, [KOREA_GRID_TABLE]);
+        return rows.length > 0 ? String(rows[0].version) : '0';
+    } catch (error) {
+        if (error.code === 'ER_NO_SUCH_TABLE') return '0';
+        throw error;
+    }
+};
+
+/**
+ * 시뮬레이션 캐시 키를 만듭니다. 기상 버전은 관측 시각과 실제 사용한 기상 값의 해시입니다.
+ * @returns {string} 캐시 키
+ */
+const buildCacheKey = (ignitionId, obsid, weatherData, weather, gridVersion) => {
+    const weatherVersion = crypto.createHash('sha1')
+        .update(JSON.stringify([obsid, weatherData.tm ?? null, weather.humidity, weather.windSpeed, weather.windDirection]))
+        .digest('hex')
+        .slice(0, 12);
+    return `prediction-${ignitionId}-w${weatherVersion}-g${gridVersion}`;
+};
+
+/**
+ * 시뮬레이션 캐시의 적중/실패/제거 카운터를 반환합니다.
+ */
+const getSimulationCacheStats = () => simulationCache.getStats();
+
 /**
  * 산불 확산 시뮬레이션의 메인 로직을 수행합니다.
  * @param {object} pool - DB 커넥션 풀
@@ -139,36 +215,43 @@ const findNeighbors = (currentPoint, allPoints) => {
  * @returns {Promise<Array<object>>} 시뮬레이션 결과가 포함된 GeoJSON Feature 배열
  */
 const runFireSpreadPrediction = async (pool, ignition_id) => {
-    // 1. 캐시 확인
-    const cacheKey = `prediction-${ignition_id}`; // 캐시 키 명확화
-    if (simulationCache.has(cacheKey)) {
-        console.log(`Cache hit for ${cacheKey}. Returning cached result.`);
-        return simulationCache.get(cacheKey);
-    }
-    console.log(`Cache miss for ${cacheKey}. Running simulation.`);
-
     const startTime = Date.now();
     let connection;
     try {
-        // 1. DB에서 모든 격자점 데이터를 불러옵니다.
         connection = await pool.getConnection();
-        const [rows] = await connection.query(`SELECT id, lat, lng, imsangdo_frtp_cd, soil_tpgrp_tpcd, soil_sltp_cd FROM ${KOREA_GRID_TABLE}`);
-        const allPoints = rows.map(row => ({...row, coordinates: [parseFloat(row.lng), parseFloat(row.lat)]}));
-        const pointMap = new Map(allPoints.map(p => [p.id, p]));
-        const ignitionPoint = pointMap.get(ignition_id);
 
-        if (!ignitionPoint) {
+        // 1. 발화점 좌표로 가장 가까운 관측소를 찾아 실시간 기상 데이터를 불러옵니다.
+        const [ignitionRows] = await connection.query(`SELECT id, lat, lng FROM ${KOREA_GRID_TABLE} WHERE id = ?`, [ignition_id]);
+        if (ignitionRows.length === 0) {
             throw new Error('발화점 데이터를 찾을 수 없습니다.');
         }
-
-        // 2. 가장 가까운 관측소를 찾아 실시간 기상 데이터를 불러옵니다.
-        const nearestStation = mountainStationsData.reduce((p, c) => (turf.distance(ignitionPoint.coordinates, [c.longitude, c.latitude]) < turf.distance(ignitionPoint.coordinates, [p.longitude, p.latitude]) ? c : p));
+        const ignitionCoordinates = [parseFloat(ignitionRows[0].lng), parseFloat(ignitionRows[0].lat)];
+        const nearestStation = mountainStationsData.reduce((p, c) => (turf.distance(ignitionCoordinates, [c.longitude, c.latitude]) < turf.distance(ignitionCoordinates, [p.longitude, p.latitude]) ? c : p));
         const weatherRef = db.ref(`weatherdata/${nearestStation.obsid}`);
         const snapshot = await weatherRef.once('value');
         const weatherData = snapshot.val() || {};
         const humidity = weatherData.hm2m ?? 50, windSpeed = weatherData.ws2m ?? 3, windDirection = weatherData.wd2m ?? 0;
         
         console.log(` -> 날씨 정보 로드 완료 (관측소: ${nearestStation.name}, 습도: ${humidity}%, 풍속: ${windSpeed}m/s, 풍향: ${windDirection}°)`);
+
+        // 2. 캐시 확인 (발화점 + 기상 버전 + 격자 버전)
+        const gridVersion = await getGridVersion(connection);
+        const cacheKey = buildCacheKey(ignition_id, nearestStation.obsid, weatherData, { humidity, windSpeed, windDirection }, gridVersion);
+        const cached = await simulationCache.get(cacheKey);
+        if (cached) {
+            console.log(`Cache hit for ${cacheKey}. Returning cached result.`);
+            return cached;
+        }
+        console.log(`Cache miss for ${cacheKey}. Running simulation.`);
+
+        // DB에서 모든 격자점 데이터와 정적 계수를 불러옵니다.
+        const allPoints = await loadGridPoints(connection);
+        const pointMap = new Map(allPoints.map(p => [p.id, p]));
+        const ignitionPoint = pointMap.get(ignition_id);
+
+        if (!ignitionPoint) {
+            throw new Error('발화점 데이터를 찾을 수 없습니다.');
+        }
         
         // 3. 시뮬레이션 초기 설정 (모든 지점 초기화, 최초 발화점 설정)
         const simResults = new Map();
@@ -176,7 +259,8 @@ const runFireSpreadPrediction = async (pool, ignition_id) => {
         const eventQueue = new PriorityQueue(); // 이벤트 큐 생성
         const initialIgnitionResult = simResults.get(ignition_id);
         initialIgnitionResult.ignitionTime = 0;
-        initialIgnitionResult.burnoutTime = getBurnoutDuration(getFuelScore(ignitionPoint.imsangdo_frtp_cd), humidity);
+        initialIgnitionResult.burnoutTime = getBurnoutDuration(ignitionPoint.fuelScore, humidity);
+        const humidityFactor = getHumidityFactor(humidity); // 건조도 요인 = 습도 계수 × 격자별 토양 가중치
         eventQueue.enqueue(ignition_id, 0); // 최초 발화 이벤트를 큐에 추가
         
         // 4. 시뮬레이션 루프 실행 (이벤트 큐가 빌 때까지)
@@ -205,7 +289,7 @@ const runFireSpreadPrediction = async (pool, ignition_id) => {
                 }
 
                 // 4-1. 이웃 지점의 물리적 특성 계산
-                const fuelScore = getFuelScore(neighbor.imsangdo_frtp_cd);
+                const fuelScore = neighbor.fuelScore;
                 if (fuelScore === 0) {
                     console.log(`Neighbor ${neighborId} has no fuel (fuelScore: 0). Skipping.`); // Added log
                     continue; 
@@ -220,8 +304,8 @@ const runFireSpreadPrediction = async (pool, ignition_id) => {
                 }
 
                 const bearing = turf.bearing(currentPoint.coordinates, neighbor.coordinates);
-                let slopeFactor = getSlopeFactor(neighbor.soil_tpgrp_tpcd);
-                let moistureFactor = getMoistureFactor(neighbor.soil_sltp_cd, humidity);
+                let slopeFactor = neighbor.slopeFactor;
+                let moistureFactor = humidityFactor * neighbor.soilMultiplier;
                 const windFactor = getWindFactor(windSpeed, windDirection, bearing);
 
                 // 비화 시 페널티 적용
@@ -313,7 +397,7 @@ const runFireSpreadPrediction = async (pool, ignition_id) => {
         console.log(`Generated ${timeBoundaries.length} time-series boundaries.`);
 
         const result = { features: ignitedFeatures, timeBoundaries: timeBoundaries };
-        simulationCache.set(cacheKey, result);
+        await simulationCache.set(cacheKey, result);
         return result;
     } finally {
         if (connection) connection.release();
@@ -368,4 +452,4 @@ const getGridWithFuelInfo = async (pool) => {
     }
 };
 
-module.exports = { runFireSpreadPrediction, getGridData, getFuelScore, getGridWithFuelInfo };
\ No newline at end of file
+module.exports = { runFireSpreadPrediction, getGridData, getFuelScore, getGridWithFuelInfo, getSimulationCacheStats };
\ No newline at end of file
@@ -1,7 +1,9 @@
 import time
 import json
+import hashlib
 import sqlite3
 import os
+import sys
 from datetime import datetime
 from dataclasses import dataclass
 from typing import List, Dict, Optional
@@ -14,7 +16,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
 # 기존 import 구문들 아래에 추가하세요.
@@ -25,27 +27,229 @@ import atexit
 import io
 
 import math
+from contextlib import closing
 
 from selenium.webdriver.support import expected_conditions
 
+import numpy as np
+from scipy import ndimage
+
+# 마커 색상 정의: 색상 이름 → (RGB, 채널별 허용 오차). 여러 색에 해당하면 먼저 정의된 색을 사용합니다.
+MARKER_COLOR_DEFINITIONS = {
+    'red': ((12, 88, 191), 20),
+    'green': ((16, 140, 0), 5),
+    'gray': ((195, 195, 195), 5)
+}
+
+# 캡처한 지도 영역의 위경도 범위
+MAP_GEO_BOUNDS = {
+    'top_left': {'lat': 38.7, 'lon': 124.5},
+    'bottom_right': {'lat': 33.0, 'lon': 131.0}
+}
+
+# 드라이버/스케줄 설정 (환경 변수로 변경 가능)
+# CHROMEDRIVER_PATH가 없으면 webdriver-manager로 현재 OS에 맞는 드라이버를 내려받습니다.
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+CHROME_BINARY = os.getenv("CHROME_BINARY")
+CRAWLER_HEADLESS = os.getenv("CRAWLER_HEADLESS", "1") != "0"
+CRAWL_INTERVAL_MINUTES = float(os.getenv("CRAWL_INTERVAL_MINUTES", "1"))
+PAGE_READY_TIMEOUT = 20       # 지도 캔버스/네트워크 대기 최대 시간(초)
+NETWORK_IDLE_SECONDS = 0.5    # 이 시간 동안 새 리소스 요청이 없으면 네트워크 유휴로 판단
+
+MARKER_MIN_PIXELS = 10        # 이보다 작은 색상 덩어리는 노이즈로 판단
+MARKER_MIN_DISTANCE_PX = 50   # 같은 마커를 중복해서 찾지 않기 위한 최소 거리(픽셀)
+# 격자 스냅샷(python -m fire_sim.snapshot)이 있으면 마커마다 가장 가까운 격자 id와 연료/토양 속성을 붙입니다.
+GRID_SNAPSHOT_PATH = os.getenv("GRID_SNAPSHOT_PATH")
+
+MARKER_MATCH_TOLERANCE_DEG = 0.02  # 이전 실행의 마커와 같은 마커로 볼 위경도 차이 (픽셀 중심 흔들림 허용)
+
+def color_masks(rgb, color_definitions=MARKER_COLOR_DEFINITIONS):
+    """
+    (높이, 너비, 3) 이미지 배열에서 색상별 허용 오차 마스크를 만듭니다. 한 픽셀은 하나의 색에만 속합니다.
+    """
+    channels = [np.ascontiguousarray(rgb[..., c]) for c in range(3)]
+    taken = np.zeros(rgb.shape[:2], dtype=bool)
+    masks = {}
+    for color_name, (target_rgb, tolerance) in color_definitions.items():
+        # |채널 - 목표값| < 허용 오차를 uint8 그대로 범위 비교로 계산
+        mask = ~taken
+        for channel, value in zip(channels, target_rgb):
+            mask &= (channel > value - tolerance) & (channel < value + tolerance)
+        taken |= mask
+        masks[color_name] = mask
+    return masks
+
+def find_blobs(mask, min_pixels=MARKER_MIN_PIXELS):
+    """
+    마스크의 8방향 연결 요소를 찾아 min_pixels 이상인 덩어리의 (중심 x, 중심 y, 픽셀 수) 배열을 반환합니다.
+    """
+    if not mask.any():
+        return np.empty((0, 3))
+    labels, count = ndimage.label(mask, structure=np.ones((3, 3), dtype=bool))
+    ys, xs = np.nonzero(mask)
+    ids = labels[ys, xs]
+    sizes = np.bincount(ids, minlength=count + 1)[1:]
+    cx = np.bincount(ids, weights=xs, minlength=count + 1)[1:] / np.maximum(sizes, 1)
+    cy = np.bincount(ids, weights=ys, minlength=count + 1)[1:] / np.maximum(sizes, 1)
+    keep = sizes >= min_pixels
+    return np.column_stack([cx[keep], cy[keep], sizes[keep]])
+
+def pixel_to_latlon(x, y, width, height, bounds=MAP_GEO_BOUNDS):
+    lon_range = bounds['bottom_right']['lon'] - bounds['top_left']['lon']
+    lat_range = bounds['top_left']['lat'] - bounds['bottom_right']['lat']
+    lon = bounds['top_left']['lon'] + (x / width) * lon_range
+    lat = bounds['top_left']['lat'] - (y / height) * lat_range
+    return lat, lon
+
+def extract_markers_from_array(rgb, min_pixels=MARKER_MIN_PIXELS, min_distance_px=MARKER_MIN_DISTANCE_PX):
+    """
+    이미지 배열 전체 해상도에서 색상 덩어리를 찾아 마커 목록을 만듭니다.
+    큰 덩어리부터 채택하고, 이미 채택한 마커와 min_distance_px 안에 있는 덩어리는 같은 마커로 보고 버립니다.
+    """
+    height, width = rgb.shape[:2]
+    blobs = []
+    for color_name, mask in color_masks(rgb).items():
+        for cx, cy, size in find_blobs(mask, min_pixels):
+            blobs.append((size, cx, cy, color_name))
+    blobs.sort(key=lambda blob: -blob[0])
+
+    accepted = np.empty((0, 2))
+    markers = []
+    for size, cx, cy, color_name in blobs:
+        if len(accepted) and (((accepted - (cx, cy)) ** 2).sum(axis=1) < min_distance_px ** 2).any():
+            continue
+        accepted = np.vstack([accepted, (cx, cy)])
+        lat, lon = pixel_to_latlon(float(cx), float(cy), width, height)
+        markers.append({'lat': round(lat, 6), 'lon': round(lon, 6), 'color': color_name})
+    return markers
+
+
+def diff_markers(previous, current, tolerance=MARKER_MATCH_TOLERANCE_DEG):
+    """
+    이전 마커 목록과 새 마커 목록을 비교해 변경 이벤트 목록을 만듭니다.
+    위경도 차이가 tolerance 이내인 가장 가까운 마커끼리 짝을 짓고,
+    짝이 없으면 appeared/disappeared, 짝의 색이 다르면 color_changed 이벤트입니다.
+    """
+    events = []
+    matched = set()
+    prev_coords = np.array([[m['lat'], m['lon']] for m in previous], dtype=np.float64).reshape(-1, 2)
+    for marker in current:
+        match = None
+        if len(prev_coords):
+            dist = np.abs(prev_coords - (marker['lat'], marker['lon'])).max(axis=1)
+            for j in np.argsort(dist, kind='stable'):
+                if dist[j] > tolerance:
+                    break
+                if j not in matched:
+                    match = int(j)
+                    break
+        if match is None:
+            events.append({'event': 'appeared', 'lat': marker['lat'], 'lon': marker['lon'],
+                           'color': marker['color'], 'previous_color': None})
+            continue
+        matched.add(match)
+        old = previous[match]
+        if old['color'] != marker['color']:
+            events.append({'event': 'color_changed', 'lat': marker['lat'], 'lon': marker['lon'],
+                           'color': marker['color'], 'previous_color': old['color']})
+    for j, old in enumerate(previous):
+        if j not in matched:
+            events.append({'event': 'disappeared', 'lat': old['lat'], 'lon': old['lon'],
+                           'color': None, 'previous_color': old['color']})
+    return events
+
+def write_json_atomic(path, data):
+    """임시 파일에 쓴 뒤 이름을 바꿔, 읽는 쪽이 쓰다 만 파일을 보지 않도록 저장합니다."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+class MarkerHistory:
+    """
+    마커 변경 이벤트 기록 (SQLite marker_events 테이블).
+    스케줄러 스레드에서도 사용하므로 호출마다 연결을 새로 엽니다.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS marker_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    observed_at TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    lat REAL,
+                    lon REAL,
+                    color TEXT,
+                    previous_color TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_marker_events_observed_at ON marker_events (observed_at)")
+
+    def append(self, events, observed_at):
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.executemany(
+                "INSERT INTO marker_events (observed_at, event, lat, lon, color, previous_color) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(observed_at, e['event'], e['lat'], e['lon'], e['color'], e['previous_color']) for e in events])
+
+    def last_changed_at(self):
+        """가장 최근 변경 시각 (기록이 없으면 None). 인덱스만 읽으므로 자주 확인해도 부담이 적습니다."""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return conn.execute("SELECT MAX(observed_at) FROM marker_events").fetchone()[0]
+
+    def changed_since(self, since):
+        """since(ISO 형식 문자열 또는 datetime) 이후의 변경 이벤트 목록 (오래된 순)"""
+        if isinstance(since, datetime):
+            since = since.isoformat(timespec='seconds')
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT id, observed_at, event, lat, lon, color, previous_color FROM marker_events "
+                "WHERE observed_at > ? ORDER BY id", (since,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def load_cell_index(project_root, snapshot_path=GRID_SNAPSHOT_PATH):
+    """격자 스냅샷으로 최근접 격자 색인을 만듭니다. 스냅샷을 지정하지 않았으면 None."""
+    if not snapshot_path:
+        return None
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)  # Project/fire_sim 패키지
+    from fire_sim.snapshot import GridSnapshot
+    from fire_sim.snapping import CellIndex
+    return CellIndex(GridSnapshot.open(snapshot_path))
+
 
 
 class SeleniumFireCrawler:
+    """
+    산불 정보 사이트 지도에서 마커를 추출하는 크롤러.
+    브라우저(헤드리스 Chrome)는 한 번 띄운 뒤 스케줄된 실행마다 재사용하고, 응답이 없으면 다시 띄웁니다.
+    """
 
-    # 기존 __init__ 함수를 아래 코드로 교체
     def __init__(self, project_root):
         self.base_url = "https://fd.forest.go.kr/ffas/"
         self.project_root = project_root
         self.crawl_dir = os.path.join(self.project_root, "crawl_map")
         self.shared_data_dir = os.path.join(self.project_root, "shared_data")
+        self.markers_path = os.path.join(self.shared_data_dir, "fire_markers.json")
         
         self.driver = None
+        # 지도 이미지가 바뀌지 않았으면 분석을 건너뛰기 위한 마지막 스크린샷 해시
+        self.last_screenshot_hash = None
+        self.history = MarkerHistory(os.getenv("MARKER_DB_PATH", os.path.join(self.crawl_dir, "forest_fire_data.db")))
+        self.previous_markers = self.load_marker_data()
+        self.cell_index = load_cell_index(self.project_root)
     
 
     def setup_driver(self):
         """Chrome 드라이버 설정"""
         chrome_options = Options()
-        # chrome_options.add_argument('--headless')
+        if CRAWLER_HEADLESS:
+            chrome_options.add_argument('--headless=new')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
@@ -53,42 +257,106 @@ class SeleniumFireCrawler:
         chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
         chrome_options.add_argument('--enable-logging')
         chrome_options.add_argument('--log-level=0')
-        
-        driver_path = r"C:\Users\User\Desktop\chromedriver-win64\chromedriver.exe" 
+        if CHROME_BINARY:
+            chrome_options.binary_location = CHROME_BINARY
+
+        driver_path = CHROMEDRIVER_PATH or ChromeDriverManager().install()
         service = Service(executable_path=driver_path)
         
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.implicitly_wait(10)
+        # 고정 대기 대신 명시적 대기(WebDriverWait)만 사용
+        self.driver.implicitly_wait(0)
+        print(f"Chrome 드라이버 시작 ({driver_path}, headless={CRAWLER_HEADLESS})")
         
         return self.driver
-    
 
-        
-    # 기존 run_crawler 함수를 아래 코드로 교체하세요.
-    def run_crawler(self):
-        """메인 크롤링 실행"""
+    def is_driver_alive(self):
+        """드라이버와 브라우저가 응답하는지 확인"""
+        if self.driver is None:
+            return False
         try:
+            self.driver.execute_script("return 1;")
+            return True
+        except WebDriverException:
+            return False
+
+    def ensure_driver(self):
+        """응답하는 드라이버를 반환하고, 없거나 죽었으면 다시 시작합니다."""
+        if not self.is_driver_alive():
+            if self.driver is not None:
+                print("브라우저가 응답하지 않아 다시 시작합니다.")
+            self.close()
             self.setup_driver()
+        return self.driver
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+
+    def wait_for_map_ready(self, timeout=PAGE_READY_TIMEOUT):
+        """
+        문서 로드 완료와 OpenLayers 지도 캔버스가 나타난 뒤, 새 리소스 요청이 NETWORK_IDLE_SECONDS 동안
+        없을 때까지(타일/마커 로드 완료) 기다립니다.
+        """
+        wait = WebDriverWait(self.driver, timeout)
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        wait.until(expected_conditions.presence_of_element_located((By.CSS_SELECTOR, "canvas.ol-unselectable")))
+
+        deadline = time.time() + timeout
+        last_count = -1
+        idle_since = time.time()
+        while time.time() < deadline:
+            count = self.driver.execute_script("return performance.getEntriesByType('resource').length;")
+            if count != last_count:
+                last_count = count
+                idle_since = time.time()
+            elif time.time() - idle_since >= NETWORK_IDLE_SECONDS:
+                return
+            time.sleep(0.1)
+        print("네트워크 유휴 대기 시간 초과, 현재 화면으로 진행합니다.")
+
+    def run_crawler(self):
+        """메인 크롤링 실행 (브라우저는 종료하지 않고 다음 실행에 재사용)"""
+        try:
+            self.ensure_driver()
             print("산불 정보 사이트 접속 중...")
             self.driver.get(self.base_url)
-            
-            time.sleep(10)
+            try:
+                self.wait_for_map_ready()
+            except TimeoutException:
+                # 느린 로드는 브라우저 문제가 아니므로 재시작하지 않고 지금 화면을 분석합니다.
+                print("지도 로드 대기 시간 초과, 현재 화면으로 진행합니다.")
             
             # 파일 경로 대신 이미지 데이터를 직접 받습니다.
             map_screenshot_data = self.get_map_screenshot_data()
             
             if map_screenshot_data:
+                screenshot_hash = hashlib.sha1(map_screenshot_data).hexdigest()
+                if screenshot_hash == self.last_screenshot_hash:
+                    print("지도 이미지가 이전과 같아 분석을 건너뜁니다.")
+                    return
                 # 이미지 데이터를 분석 함수에 전달합니다.
                 markers = self.extract_map_markers(map_screenshot_data)
-                self.save_marker_data(markers)
-                
-                # 더 이상 파일 삭제 로직이 필요 없습니다.
-                
+                if self.cell_index is not None:
+                    from fire_sim.snapping import snap_markers
+                    markers = snap_markers(self.cell_index, markers)
+                # 저장에 실패하면 해시를 남기지 않아 다음 실행에서 같은 화면을 다시 분석/저장합니다.
+                if self.save_marker_data(markers):
+                    self.last_screenshot_hash = screenshot_hash
+
+        except WebDriverException as e:
+            # 브라우저가 실제로 응답하지 않을 때만 정리해 다음 실행에서 다시 시작 (페이지 로드 시간 초과 등은 재사용)
+            if self.is_driver_alive():
+                print(f"브라우저 오류 발생, 드라이버는 응답하므로 다음 실행에 재사용합니다: {e}")
+            else:
+                print(f"브라우저가 응답하지 않아 드라이버를 재시작합니다: {e}")
+                self.close()
         except Exception as e:
             print(f"크롤링 중 오류 발생: {e}")
-        finally:
-            if self.driver:
-                self.driver.quit()
 
 
     # 기존 capture_screenshot 함수를 아래 코드로 교체하세요.
@@ -111,84 +379,17 @@ class SeleniumFireCrawler:
         
 
     def extract_map_markers(self, map_screenshot_data):
-        """지도 이미지에서 마커의 위치와 색상을 추출 (클러스터링 필터 적용)"""
+        """지도 이미지에서 마커의 위치와 색상을 추출 (색상 마스크 + 연결 요소 분석)"""
         print("지도 이미지에서 마커 정보 추출 중...")
         if not map_screenshot_data:
             print("지도 스크린샷 데이터가 없어 마커 추출을 건너뜁니다.")
             return []
 
         try:
-            img = Image.open(io.BytesIO(map_screenshot_data))
-            pixels = img.load()
-            width, height = img.size
-            
-            # 허용 오차는 약간 넉넉하게 다시 설정합니다.
-            color_definitions = {
-                'red': ((12, 88, 191), 20),
-                'green': ((16, 140, 0), 5),
-                'gray': ((195, 195, 195), 5)
-            }
-
-            map_geo_bounds = {
-                'top_left': {'lat': 38.7, 'lon': 124.5},
-                'bottom_right': {'lat': 33.0, 'lon': 131.0}
-            }
-            
-            found_markers = []
-            min_dist_sq = 50**2  # 같은 마커를 중복해서 찾지 않기 위한 최소 거리(픽셀)
-
-            # 이미 검증한 픽셀은 건너뛰기 위한 집합
-            verified_pixels = set()
-
-            for x in range(0, width, 5):
-                for y in range(0, height, 5):
-                    if (x, y) in verified_pixels:
-                        continue
-
-                    r, g, b = pixels[x, y][:3]
-                    for color_name, (target_rgb, tolerance) in color_definitions.items():
-                        if abs(r - target_rgb[0]) < tolerance and abs(g - target_rgb[1]) < tolerance and abs(b - target_rgb[2]) < tolerance:
-                            
-                            # --- [새로운 클러스터 검증 로직] ---
-                            cluster_size = 9  # 주변 9x9 픽셀 영역을 확인
-                            cluster_threshold = 10 # 그 중 최소 10개 이상이 비슷한 색이어야 함
-                            match_count = 0
-                            
-                            for i in range(-cluster_size // 2, cluster_size // 2 + 1):
-                                for j in range(-cluster_size // 2, cluster_size // 2 + 1):
-                                    check_x, check_y = x + i, y + j
-                                    if 0 <= check_x < width and 0 <= check_y < height:
-                                        cr, cg, cb = pixels[check_x, check_y][:3]
-                                        if abs(cr - target_rgb[0]) < tolerance and abs(cg - target_rgb[1]) < tolerance and abs(cb - target_rgb[2]) < tolerance:
-                                            match_count += 1
-                            
-                            # 클러스터를 형성하지 못하면 노이즈로 판단하고 건너뜀
-                            if match_count < cluster_threshold:
-                                continue
-                            # --- [검증 로직 끝] ---
-
-                            is_too_close = any(((fm['px'] - x)**2 + (fm['py'] - y)**2) < min_dist_sq for fm in found_markers)
-                            if is_too_close:
-                                continue
-                            
-                            lon_range = map_geo_bounds['bottom_right']['lon'] - map_geo_bounds['top_left']['lon']
-                            lat_range = map_geo_bounds['top_left']['lat'] - map_geo_bounds['bottom_right']['lat']
-                            lon = map_geo_bounds['top_left']['lon'] + (x / width) * lon_range
-                            lat = map_geo_bounds['top_left']['lat'] - (y / height) * lat_range
-
-                            found_markers.append({'lat': round(lat, 6), 'lon': round(lon, 6), 'color': color_name, 'px': x, 'py': y})
-                            
-                            # 찾은 클러스터 주변은 더 이상 탐색하지 않도록 기록
-                            for i in range(-cluster_size // 2, cluster_size // 2 + 1):
-                                for j in range(-cluster_size // 2, cluster_size // 2 + 1):
-                                    verified_pixels.add((x + i, y + j))
-
-                            break
-            
-            for marker in found_markers:
-                del marker['px'], marker['py']
-            
-            print(f"마커 {len(found_markers)}개 추출 완료.")
+            start = time.time()
+            img = Image.open(io.BytesIO(map_screenshot_data)).convert('RGB')
+            found_markers = extract_markers_from_array(np.asarray(img))
+            print(f"마커 {len(found_markers)}개 추출 완료. ({(time.time() - start) * 1000:.0f}ms)")
             return found_markers
 
         except Exception as e:
@@ -199,47 +400,77 @@ class SeleniumFireCrawler:
 
 
 
+    def load_marker_data(self):
+        """마지막으로 저장한 마커 목록 (파일이 없거나 읽을 수 없으면 빈 목록)"""
+        try:
+            with open(self.markers_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
     def save_marker_data(self, markers):
-        """추출된 마커 데이터를 JSON 파일로 저장"""
+        """
+        이전 마커 목록과 비교해 변경 이벤트를 기록하고, 변경이 있을 때만 JSON 파일을 원자적으로 다시 씁니다.
+        저장했거나 변경이 없으면 True, 저장에 실패하면 False를 반환합니다. (실패하면 이전 마커 목록을 그대로 두어
+        다음 실행에서 같은 변경을 다시 기록합니다.)
+        """
         try:
-            json_path = os.path.join(self.shared_data_dir, "fire_markers.json")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(markers, f, ensure_ascii=False, indent=2)
-            print(f"마커 데이터 저장 완료: {json_path}")
+            events = diff_markers(self.previous_markers, markers)
+            if not events:
+                print("마커 변경 없음, 저장을 건너뜁니다.")
+                return True
+            observed_at = datetime.now().isoformat(timespec='seconds')
+            # 이벤트 이력은 마지막에 기록: JSON 쓰기가 실패해 다시 시도할 때 같은 이벤트가 중복 기록되지 않도록
+            write_json_atomic(self.markers_path, markers)
+            self.history.append(events, observed_at)
+            self.previous_markers = markers
+            counts = {name: sum(e['event'] == name for e in events) for name in ('appeared', 'disappeared', 'color_changed')}
+            print(f"마커 데이터 저장 완료: {self.markers_path} "
+                  f"(신규 {counts['appeared']}, 소멸 {counts['disappeared']}, 색상 변경 {counts['color_changed']})")
+            return True
         except Exception as e:
             print(f"마커 데이터 저장 실패: {e}")
+            return False
+
 
 
 
 
+# 스케줄된 실행 사이에 브라우저를 유지하기 위한 크롤러 인스턴스
+_crawler = None
 
+def get_crawler():
+    global _crawler
+    if _crawler is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        _crawler = SeleniumFireCrawler(project_root)
+    return _crawler
 
-# 기존 def main(): 부분을 아래와 같이 이름만 변경합니다.
 def run_crawl_job():
     """메인 크롤링 실행 함수 (스케줄러에 의해 호출됨)"""
     print(f"\n[{datetime.now()}] === 크롤링 작업 시작 ===")
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    crawler = SeleniumFireCrawler(project_root)
-    crawler.run_crawler()
-    print(f"[{datetime.now()}] === 크롤링 작업 종료 ===")
+    start = time.time()
+    get_crawler().run_crawler()
+    print(f"[{datetime.now()}] === 크롤링 작업 종료 ({time.time() - start:.1f}초) ===")
 
 
-# 기존 if __name__ == "__main__": 부분을 아래 코드로 교체하세요.
 if __name__ == "__main__":
     # 1. 백그라운드 스케줄러 생성
     scheduler = BackgroundScheduler()
 
-    # 2. 스케줄러에 작업 추가: 10분마다 run_crawl_job 함수를 실행
-    #    처음에는 즉시 한 번 실행하고, 그 후 30분 간격으로 실행합니다.
-    scheduler.add_job(run_crawl_job, 'interval', minutes=30, id="fire_crawl_job")
+    # 2. 스케줄러에 작업 추가: CRAWL_INTERVAL_MINUTES 간격으로 run_crawl_job 실행
+    #    이전 실행이 끝나지 않았으면 겹쳐 실행하지 않고 건너뜁니다.
+    scheduler.add_job(run_crawl_job, 'interval', minutes=CRAWL_INTERVAL_MINUTES, id="fire_crawl_job",
+                      max_instances=1, coalesce=True)
     
-    # 3. 프로그램이 종료될 때 스케줄러가 안전하게 종료되도록 등록
+    # 3. 프로그램이 종료될 때 스케줄러와 브라우저가 안전하게 종료되도록 등록
+    atexit.register(lambda: get_crawler().close())
     atexit.register(lambda: scheduler.shutdown())
 
     # 4. 스케줄러 시작
     scheduler.start()
 
-    print("=== 실시간 산불 마커 크롤러가 시작되었습니다. (30분 간격 자동 실행) ===")
+    print(f"=== 실시간 산불 마커 크롤러가 시작되었습니다. ({CRAWL_INTERVAL_MINUTES:g}분 간격 자동 실행) ===")
     print("이 창을 닫지 마세요. 닫으면 자동 실행이 멈춥니다.")
     print("Ctrl+C를 눌러 프로그램을 종료할 수 있습니다.")
 
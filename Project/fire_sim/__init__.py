@@ -0,0 +1,32 @@
+"""
+격자 기반 산불 확산 시뮬레이션 (backend/services/simulationService.js 모델의 Python 구현)
+
+사용 예:
+    from fire_sim import Grid, Weather, run_spread
+    grid = Grid.from_mysql(connect_mysql())
+    result = run_spread(grid, ignition_id, Weather(humidity=40, wind_speed=5, wind_direction=270))
+"""
+from .grid import Grid, connect_mysql, load_grid, DEFAULT_GRID_TABLE
+from .engine import Weather, CellWeather, SpreadResult, NeighborFinder, iter_spread, run_spread
+from .snapshot import GridSnapshot, write_snapshot, export_snapshot
+from .neighbor_graph import NeighborGraph, build_neighbor_graph, load_neighbor_graph
+from .isochrones import build_isochrones
+from .stream import stream_spread, write_ndjson
+from .batch import Scenario, BatchResult, point_scenarios, ensemble_scenarios, run_batch
+from .snapping import CellIndex, snap_markers
+from .static_factors import compute_static_factors, read_grid_with_static_factors
+from .weather_field import WeatherField, load_stations, load_observations
+from .raster_engine import RasterLattice, run_raster_spread
+
+__all__ = [
+    "Grid", "connect_mysql", "load_grid", "DEFAULT_GRID_TABLE",
+    "Weather", "CellWeather", "SpreadResult", "NeighborFinder", "iter_spread", "run_spread",
+    "GridSnapshot", "write_snapshot", "export_snapshot",
+    "NeighborGraph", "build_neighbor_graph", "load_neighbor_graph",
+    "build_isochrones", "stream_spread", "write_ndjson",
+    "Scenario", "BatchResult", "point_scenarios", "ensemble_scenarios", "run_batch",
+    "CellIndex", "snap_markers",
+    "compute_static_factors", "read_grid_with_static_factors",
+    "WeatherField", "load_stations", "load_observations",
+    "RasterLattice", "run_raster_spread",
+]
@@ -0,0 +1,118 @@
+"""
+명령행 실행: python -m fire_sim <발화 지점 ID> [옵션]
+
+발화 지점에서의 확산을 시뮬레이션하고 발화한 격자의 발화/연소 종료 시각(초)을 JSON으로 출력합니다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from .engine import Weather, run_spread
+from .grid import DEFAULT_GRID_TABLE, load_grid
+from .isochrones import BOUNDARY_MODES, build_isochrones
+from .neighbor_graph import load_neighbor_graph
+from .raster_engine import ENGINES, run_raster_spread
+from .stream import stream_spread, write_ndjson
+from .weather_field import DEFAULT_STATIONS_PATH, WeatherField, load_observations, load_stations
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="fire_sim", description="격자 기반 산불 확산 시뮬레이션")
+    parser.add_argument("ignition_id", type=int, help="최초 발화 지점 격자 ID")
+    parser.add_argument("--grid-json", help="격자 행 목록 JSON 파일 (지정하지 않으면 MySQL에서 불러옴)")
+    parser.add_argument("--table", default=DEFAULT_GRID_TABLE, help="MySQL 격자 테이블 이름")
+    parser.add_argument("--snapshot", help="격자 스냅샷 파일 (python -m fire_sim.snapshot으로 생성)")
+    parser.add_argument("--neighbor-graph", help="미리 만들어 둔 이웃 그래프 디렉터리 (python -m fire_sim.neighbor_graph)")
+    parser.add_argument("--engine", choices=ENGINES, default="queue",
+                        help="확산 엔진 (queue: 이벤트 큐, raster: 큰 산불에 빠른 셀룰러 오토마타)")
+    parser.add_argument("--humidity", type=float, default=Weather.humidity, help="상대습도 (%%)")
+    parser.add_argument("--wind-speed", type=float, default=Weather.wind_speed, help="풍속 (m/s)")
+    parser.add_argument("--wind-direction", type=float, default=Weather.wind_direction, help="풍향 (도)")
+    parser.add_argument("--weather-json",
+                        help="관측소별 기상 JSON (Firebase weatherdata 형식). 지정하면 격자별로 보간한 기상을 사용하고, "
+                             "--humidity/--wind-speed/--wind-direction은 주변에 관측 값이 없는 격자에만 사용")
+    parser.add_argument("--stations", default=DEFAULT_STATIONS_PATH, help="관측소 목록 (mountainStations.js)")
+    parser.add_argument("--boundaries", choices=("none",) + BOUNDARY_MODES, default="none",
+                        help="시간대별(10분) 확산 경계 생성 방식")
+    parser.add_argument("--stream", action="store_true",
+                        help="10분 구간마다 발화 지점/경계를 NDJSON 한 줄씩 바로 출력 (--boundaries는 none 또는 convex)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (지정하지 않으면 표준 출력)")
+    args = parser.parse_args(argv)
+    if args.stream and args.boundaries not in ("none", "convex"):
+        parser.error("--stream은 --boundaries none 또는 convex만 지원합니다.")
+    if args.engine == "raster" and (args.stream or args.neighbor_graph):
+        parser.error("--stream과 --neighbor-graph는 --engine queue에서만 사용합니다.")
+    return args
+
+def stream_output(args, grid, weather, neighbors):
+    events = stream_spread(grid, args.ignition_id, weather, neighbors, boundaries=args.boundaries == "convex")
+    try:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                write_ndjson(events, f)
+        else:
+            write_ndjson(events, sys.stdout)
+    except BrokenPipeError:
+        # 소비자가 출력을 닫으면 시뮬레이션을 중단
+        events.close()
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    return 0
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    start = time.time()
+    grid = load_grid(args.grid_json, args.table, args.snapshot)
+    print(f"격자 {len(grid)}개 로드 ({time.time() - start:.1f}초)", file=sys.stderr)
+
+    weather = Weather(args.humidity, args.wind_speed, args.wind_direction)
+    ignition_index = grid.index_of(args.ignition_id)
+    if ignition_index is None:
+        print(f"발화 지점 ID {args.ignition_id}를 찾을 수 없습니다.", file=sys.stderr)
+        return 1
+    ignition_weather = weather
+    if args.weather_json:
+        start = time.time()
+        field = WeatherField(grid, *load_stations(args.stations))
+        weather = field.refresh(load_observations(args.weather_json), default=weather)
+        ignition_weather = weather.at(ignition_index)
+        print(f"격자별 기상 보간 완료 (관측소 {len(field.obsid)}개, {time.time() - start:.2f}초)", file=sys.stderr)
+    try:
+        neighbors = load_neighbor_graph(args.neighbor_graph, grid) if args.neighbor_graph else None
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.stream:
+        return stream_output(args, grid, weather, neighbors)
+
+    start = time.time()
+    if args.engine == "raster":
+        result = run_raster_spread(grid, args.ignition_id, weather)
+    else:
+        result = run_spread(grid, args.ignition_id, weather, neighbors)
+    records = result.to_records()
+    print(f"시뮬레이션 완료: {len(records)}개 지점 발화 ({time.time() - start:.2f}초)", file=sys.stderr)
+
+    output = {
+        "ignition_id": result.ignition_id,
+        "weather": {"humidity": ignition_weather.humidity, "windSpeed": ignition_weather.wind_speed,
+                    "windDirection": ignition_weather.wind_direction},
+        "cells": records,
+    }
+    if args.boundaries != "none":
+        start = time.time()
+        output["timeBoundaries"] = build_isochrones(result, args.boundaries)
+        print(f"시간대별 경계 {len(output['timeBoundaries'])}개 생성 ({time.time() - start:.2f}초)", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False)
+    else:
+        json.dump(output, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+여러 시나리오를 한 번에 실행하는 배치/앙상블 시뮬레이션.
+
+하나의 격자와 이웃 구조를 모든 시나리오가 공유하며, 시나리오는 프로세스 풀에서 병렬로 실행됩니다.
+결과는 GeoJSON 여러 개 대신 격자별 연소 확률과 도달 시간 백분위 배열을 담은 .npz 파일 하나로 저장합니다.
+
+예:
+    # 후보 발화 지점 여러 곳
+    python -m fire_sim.batch out.npz --snapshot grid.fgs --ignition-ids 1001 1002 1003
+    # 한 지점, 바람/습도를 흔든 앙상블 200개
+    python -m fire_sim.batch out.npz --snapshot grid.fgs --ignition-id 1001 --ensemble 200 --wind-speed 5
+"""
+import argparse
+import math
+import time
+from dataclasses import dataclass
+from multiprocessing import Pool
+
+import numpy as np
+
+from .engine import Weather, NeighborFinder, run_spread
+from .grid import DEFAULT_GRID_TABLE, load_grid
+from .neighbor_graph import load_neighbor_graph
+from .raster_engine import ENGINES, RasterLattice, run_raster_spread
+
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+# 워커 프로세스마다 하나씩 유지하는 격자와 이웃 구조 (init_worker에서 초기화)
+_worker = {}
+
+@dataclass
+class Scenario:
+    ignition_id: int
+    weather: Weather
+
+def point_scenarios(ignition_ids, weather=None):
+    """
+    같은 기상 조건에서 여러 발화 지점을 시뮬레이션하는 시나리오 목록
+    """
+    weather = weather or Weather()
+    return [Scenario(int(ignition_id), weather) for ignition_id in ignition_ids]
+
+def ensemble_scenarios(ignition_id, weather, count, wind_speed_sd=1.0, wind_direction_sd=20.0,
+                       humidity_sd=5.0, seed=None):
+    """
+    기상 조건을 정규분포로 흔든 앙상블 시나리오 목록. 풍속은 0 이상, 습도는 0~100, 풍향은 0~360으로 맞춥니다.
+    """
+    rng = np.random.default_rng(seed)
+    wind_speed = np.clip(rng.normal(weather.wind_speed, wind_speed_sd, count), 0, None)
+    wind_direction = np.mod(rng.normal(weather.wind_direction, wind_direction_sd, count), 360)
+    humidity = np.clip(rng.normal(weather.humidity, humidity_sd, count), 0, 100)
+    return [Scenario(int(ignition_id), Weather(float(h), float(ws), float(wd)))
+            for h, ws, wd in zip(humidity, wind_speed, wind_direction)]
+
+def init_worker(grid, neighbors, engine="queue"):
+    """
+    워커 프로세스 초기화. fork 방식에서는 부모의 격자 배열(스냅샷/그래프는 메모리 매핑)을 복사 없이 공유합니다.
+    """
+    _worker.update(grid=grid, neighbors=neighbors, engine=engine)
+
+def run_scenario(task):
+    """
+    시나리오 하나를 실행하고 (시나리오 번호, 발화한 격자 인덱스, 발화 시각)을 반환합니다.
+    """
+    number, scenario = task
+    run = run_raster_spread if _worker["engine"] == "raster" else run_spread
+    result = run(_worker["grid"], scenario.ignition_id, scenario.weather, _worker["neighbors"])
+    ignited = result.ignited_indices()
+    return number, ignited.astype(np.int32), result.ignition_time[ignited].astype(np.float32)
+
+def arrival_percentiles(n_cells, n_scenarios, cells, times, percentiles):
+    """
+    격자별 도달 시간 백분위. q 백분위는 시나리오의 q%에서 그 격자가 발화한 시각이며,
+    발화한 시나리오가 그보다 적으면 inf입니다. (발화하지 않은 시나리오를 무한대 시간으로 취급)
+    """
+    order = np.lexsort((times, cells))
+    cells, times = cells[order], times[order]
+    starts = np.searchsorted(cells, np.arange(n_cells))
+    counts = np.bincount(cells, minlength=n_cells)
+
+    result = {}
+    for q in percentiles:
+        rank = max(1, math.ceil(q / 100 * n_scenarios))
+        values = np.full(n_cells, np.inf, dtype=np.float32)
+        reached = counts >= rank
+        values[reached] = times[starts[reached] + rank - 1]
+        result[q] = values
+    return result
+
+@dataclass
+class BatchResult:
+    """
+    burn_probability: 격자별 발화한 시나리오 비율
+    arrival: 백분위 → 격자별 도달 시간(초) 배열
+    """
+    grid: object
+    scenarios: list
+    burn_probability: np.ndarray
+    arrival: dict
+
+    def save(self, path):
+        arrays = {
+            "ids": self.grid.ids,
+            "lat": self.grid.lat.astype(np.float32),
+            "lng": self.grid.lng.astype(np.float32),
+            "burn_probability": self.burn_probability,
+            "scenario_ignition_id": np.array([s.ignition_id for s in self.scenarios], dtype=np.int64),
+            "scenario_humidity": np.array([s.weather.humidity for s in self.scenarios], dtype=np.float32),
+            "scenario_wind_speed": np.array([s.weather.wind_speed for s in self.scenarios], dtype=np.float32),
+            "scenario_wind_direction": np.array([s.weather.wind_direction for s in self.scenarios], dtype=np.float32),
+        }
+        for q, values in self.arrival.items():
+            arrays[f"arrival_p{q:g}"] = values
+        np.savez_compressed(path, **arrays)
+
+def run_batch(grid, scenarios, workers=1, neighbors=None, percentiles=DEFAULT_PERCENTILES, verbose=True,
+              engine="queue"):
+    """
+    시나리오 목록을 실행하고 격자별 연소 확률과 도달 시간 백분위를 집계합니다.
+    workers가 1이면 현재 프로세스에서, 아니면 프로세스 풀에서 실행합니다.
+    engine이 "raster"이면 neighbors 대신 RasterLattice를 만들어 셀룰러 오토마타 엔진으로 실행합니다.
+    """
+    if engine == "raster":
+        neighbors = RasterLattice(grid)
+    elif neighbors is None:
+        neighbors = NeighborFinder(grid)
+    tasks = list(enumerate(scenarios))
+    n_cells = len(grid)
+
+    burn_count = np.zeros(n_cells, dtype=np.int32)
+    cell_chunks = []
+    time_chunks = []
+
+    pool = None
+    if workers <= 1:
+        init_worker(grid, neighbors, engine)
+        results = map(run_scenario, tasks)
+    else:
+        pool = Pool(processes=workers, initializer=init_worker, initargs=(grid, neighbors, engine))
+        results = pool.imap_unordered(run_scenario, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+    try:
+        start = time.time()
+        for done, (_, cells, times) in enumerate(results, start=1):
+            burn_count[cells] += 1
+            cell_chunks.append(cells)
+            time_chunks.append(times)
+            if verbose and (done % 10 == 0 or done == len(tasks)):
+                elapsed = time.time() - start
+                print(f"  [{done}/{len(tasks)}] 시나리오 완료 ({done / max(elapsed, 1e-9):.1f} 시나리오/초)")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    cells = np.concatenate(cell_chunks) if cell_chunks else np.empty(0, dtype=np.int32)
+    times = np.concatenate(time_chunks) if time_chunks else np.empty(0, dtype=np.float32)
+    return BatchResult(
+        grid=grid,
+        scenarios=list(scenarios),
+        burn_probability=(burn_count / max(len(tasks), 1)).astype(np.float32),
+        arrival=arrival_percentiles(n_cells, len(tasks), cells, times, percentiles),
+    )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="fire_sim.batch", description="배치/앙상블 산불 확산 시뮬레이션")
+    parser.add_argument("output", help="결과 .npz 파일 경로")
+    parser.add_argument("--grid-json", help="격자 행 목록 JSON 파일")
+    parser.add_argument("--table", default=DEFAULT_GRID_TABLE, help="MySQL 격자 테이블 이름")
+    parser.add_argument("--snapshot", help="격자 스냅샷 파일 (python -m fire_sim.snapshot으로 생성)")
+    parser.add_argument("--neighbor-graph", help="미리 만들어 둔 이웃 그래프 디렉터리")
+    parser.add_argument("--engine", choices=ENGINES, default="queue",
+                        help="확산 엔진 (queue: 이벤트 큐, raster: 큰 산불에 빠른 셀룰러 오토마타)")
+    parser.add_argument("--ignition-ids", type=int, nargs="+", help="발화 지점 ID 목록 (지점별 시나리오)")
+    parser.add_argument("--ignition-id", type=int, help="앙상블 발화 지점 ID")
+    parser.add_argument("--ensemble", type=int, default=0, help="앙상블 시나리오 수")
+    parser.add_argument("--humidity", type=float, default=Weather.humidity, help="상대습도 (%%)")
+    parser.add_argument("--wind-speed", type=float, default=Weather.wind_speed, help="풍속 (m/s)")
+    parser.add_argument("--wind-direction", type=float, default=Weather.wind_direction, help="풍향 (도)")
+    parser.add_argument("--humidity-sd", type=float, default=5.0, help="앙상블 습도 표준편차")
+    parser.add_argument("--wind-speed-sd", type=float, default=1.0, help="앙상블 풍속 표준편차")
+    parser.add_argument("--wind-direction-sd", type=float, default=20.0, help="앙상블 풍향 표준편차 (도)")
+    parser.add_argument("--seed", type=int, help="앙상블 난수 시드")
+    parser.add_argument("--workers", type=int, default=4, help="워커 프로세스 수")
+    parser.add_argument("--percentiles", type=float, nargs="+", default=list(DEFAULT_PERCENTILES),
+                        help="도달 시간 백분위")
+    args = parser.parse_args(argv)
+    if bool(args.ignition_ids) == bool(args.ensemble):
+        parser.error("--ignition-ids 또는 --ignition-id와 --ensemble 중 하나를 지정하세요.")
+    if args.ensemble and args.ignition_id is None:
+        parser.error("--ensemble에는 --ignition-id가 필요합니다.")
+    if args.engine == "raster" and args.neighbor_graph:
+        parser.error("--neighbor-graph는 --engine queue에서만 사용합니다.")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.time()
+    grid = load_grid(args.grid_json, args.table, args.snapshot)
+    neighbors = load_neighbor_graph(args.neighbor_graph, grid) if args.neighbor_graph else None
+    print(f"격자 {len(grid)}개 로드 ({time.time() - start:.1f}초)")
+
+    weather = Weather(args.humidity, args.wind_speed, args.wind_direction)
+    if args.ensemble:
+        scenarios = ensemble_scenarios(args.ignition_id, weather, args.ensemble, args.wind_speed_sd,
+                                       args.wind_direction_sd, args.humidity_sd, args.seed)
+    else:
+        scenarios = point_scenarios(args.ignition_ids, weather)
+    missing = sorted({s.ignition_id for s in scenarios if grid.index_of(s.ignition_id) is None})
+    if missing:
+        print(f"발화 지점 ID를 찾을 수 없습니다: {missing}")
+        return
+
+    start = time.time()
+    result = run_batch(grid, scenarios, args.workers, neighbors, args.percentiles, engine=args.engine)
+    result.save(args.output)
+    print(f"🌟 시나리오 {len(scenarios)}개 완료: {args.output} ({time.time() - start:.1f}초)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+격자 기반 산불 확산 시뮬레이션 엔진.
+
+simulationService.js의 runFireSpreadPrediction과 같은 규칙(방지턱, 비화, 7시간 제한)으로 동작하지만,
+우선순위 큐는 heapq로, 이웃 탐색은 0.03° 버킷 인덱스로 처리하여 전체 격자에서도 빠르게 실행됩니다.
+"""
+import heapq
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .model import (
+    FIREBREAK_DISTANCE_KM, STRONG_WIND_MS, MAX_SIMULATION_TIME, MIN_ROS,
+    NEIGHBOR_SEARCH_RADIUS, NEIGHBOR_MAX_DISTANCE_KM, NEIGHBOR_COUNT,
+    get_burnout_duration, get_wind_factor, haversine_km, bearing_deg,
+)
+
+@dataclass
+class Weather:
+    """
+    시뮬레이션에 사용할 기상 조건. 기본값은 JS에서 기상 데이터가 없을 때 쓰는 값과 같습니다.
+    """
+    humidity: float = 50.0
+    wind_speed: float = 3.0
+    wind_direction: float = 0.0
+
+@dataclass
+class CellWeather:
+    """
+    격자별 기상 조건. 각 값은 격자 순서의 배열입니다. (fire_sim.weather_field.WeatherField.refresh로 생성)
+    시뮬레이션에서 습도는 불이 옮겨 붙는 격자의 값을, 풍속/풍향은 불타고 있는 격자의 값을 사용합니다.
+    """
+    humidity: np.ndarray
+    wind_speed: np.ndarray
+    wind_direction: np.ndarray
+
+    def at(self, index):
+        """
+        index번째 격자의 기상 조건
+        """
+        return Weather(float(self.humidity[index]), float(self.wind_speed[index]), float(self.wind_direction[index]))
+
+@dataclass
+class SpreadResult:
+    """
+    시뮬레이션 결과. ignition_time/burnout_time은 격자 순서의 배열(초)이며 발화하지 않은 지점은 NaN입니다.
+    """
+    grid: object
+    ignition_id: int
+    weather: Weather
+    ignition_time: np.ndarray
+    burnout_time: np.ndarray
+
+    def ignited_indices(self):
+        return np.flatnonzero(~np.isnan(self.ignition_time))
+
+    def to_records(self):
+        """
+        발화한 지점을 격자 순서대로 {id, ignitionTime, burnoutTime} 목록으로 반환합니다. (JS features와 같은 순서)
+        """
+        idx = self.ignited_indices()
+        return [
+            {"id": grid_id, "ignitionTime": ign, "burnoutTime": burn}
+            for grid_id, ign, burn in zip(self.grid.ids[idx].tolist(),
+                                          self.ignition_time[idx].tolist(),
+                                          self.burnout_time[idx].tolist())
+        ]
+
+class NeighborFinder:
+    """
+    findNeighbors와 같은 규칙(±0.03° 상자, 0 < 거리 < 5km, 가까운 순 8개)으로 이웃을 찾습니다.
+    격자를 상자 크기보다 조금 큰 버킷으로 나눠 두고 주변 3x3 버킷만 검사하므로 전체 스캔이 필요 없습니다.
+    """
+
+    def __init__(self, grid, radius=NEIGHBOR_SEARCH_RADIUS):
+        self.grid = grid
+        self.radius = radius
+        # 버킷을 반경보다 약간 크게 잡아 부동소수 오차로 상자 안의 점이 3x3 밖으로 빠지지 않도록 함
+        self.bucket_size = radius * 1.01
+        rows = np.floor(grid.lat / self.bucket_size).astype(np.int64)
+        cols = np.floor(grid.lng / self.bucket_size).astype(np.int64)
+        self.cell_rows = rows
+        self.cell_cols = cols
+
+        order = np.lexsort((np.arange(len(grid)), cols, rows))
+        keys = np.stack([rows[order], cols[order]], axis=1)
+        self.buckets = {}
+        if len(order):
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk in np.split(order, starts):
+                self.buckets[(int(rows[chunk[0]]), int(cols[chunk[0]]))] = chunk
+
+    def candidates(self, i):
+        r, c = int(self.cell_rows[i]), int(self.cell_cols[i])
+        chunks = [self.buckets[key] for key in ((r + dr, c + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+                  if key in self.buckets]
+        # 원본 격자 순서를 유지해야 거리가 같은 이웃의 순서가 JS와 같아짐
+        return np.sort(np.concatenate(chunks))
+
+    def find(self, i):
+        """
+        i번째 지점의 이웃을 가까운 순으로 (인덱스 배열, 거리 배열, 방위각 배열)로 반환합니다.
+        """
+        grid = self.grid
+        lat, lng = grid.lat[i], grid.lng[i]
+        cand = self.candidates(i)
+        c_lat, c_lng = grid.lat[cand], grid.lng[cand]
+        in_box = ((c_lat > lat - self.radius) & (c_lat < lat + self.radius) &
+                  (c_lng > lng - self.radius) & (c_lng < lng + self.radius) &
+                  (grid.ids[cand] != grid.ids[i]))
+        cand = cand[in_box]
+        dist = haversine_km(lng, lat, grid.lng[cand], grid.lat[cand])
+        keep = (dist > 0) & (dist < NEIGHBOR_MAX_DISTANCE_KM)
+        cand, dist = cand[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")[:NEIGHBOR_COUNT]
+        cand, dist = cand[order], dist[order]
+        return cand, dist, bearing_deg(lng, lat, grid.lng[cand], grid.lat[cand])
+
+def get_humidity_factors(humidity):
+    """
+    습도(스칼라 또는 배열)별 기본 건조도 계수 (get_humidity_factor의 벡터화)
+    """
+    humidity = np.asarray(humidity, dtype=np.float64)
+    return np.select([humidity < 35, humidity < 50, humidity > 80, humidity > 70], [1.5, 1.2, 0.4, 0.6], 1.0)
+
+def get_moisture_factors(grid, humidity):
+    """
+    습도 계수에 격자별 토양 건조도 가중치를 곱한 건조도 요인 배열 (get_moisture_factor의 벡터화)
+    humidity는 스칼라 또는 격자 순서의 배열입니다.
+    """
+    return get_humidity_factors(humidity) * grid.soil_multiplier
+
+def cell_weather_lists(grid, weather):
+    """
+    Weather(격자 전체에 같은 값) 또는 CellWeather를 격자 순서의 (습도, 풍속, 풍향) 리스트로 펼칩니다.
+    """
+    return tuple(np.broadcast_to(np.asarray(values, dtype=np.float64), len(grid)).tolist()
+                 for values in (weather.humidity, weather.wind_speed, weather.wind_direction))
+
+def iter_spread(grid, ignition_id, weather=None, neighbors=None, max_time=MAX_SIMULATION_TIME):
+    """
+    ignition_id 지점에서 시작하는 산불 확산을 시뮬레이션하며, 발화한 지점을 이벤트 큐에서 꺼내는 순서대로
+    (격자 인덱스, 발화 시각, 연소 종료 시각)으로 yield 합니다. 발화 시각은 감소하지 않으며,
+    어떤 지점을 yield 한 뒤에는 그보다 이른 시각에 발화하는 지점이 더 나오지 않습니다.
+
+    grid: Grid
+    weather: Weather 또는 격자별 기상 CellWeather (없으면 기본값)
+    neighbors: find(i) -> (이웃 인덱스, 거리, 방위각)을 제공하는 객체
+               (NeighborGraph 또는 NeighborFinder, 없으면 NeighborFinder 생성)
+    max_time: 이 시간(초)보다 늦게 발화한 지점은 더 이상 확산시키지 않음
+    """
+    weather = weather or Weather()
+    start = grid.index_of(ignition_id)
+    if start is None:
+        raise ValueError(f"발화 지점 ID {ignition_id}를 찾을 수 없습니다.")
+    if neighbors is None:
+        neighbors = NeighborFinder(grid)
+
+    # 반복문 안에서는 스칼라 접근이 빠른 리스트를 사용
+    humidity, wind_speeds, wind_directions = cell_weather_lists(grid, weather)
+    fuel = grid.fuel_score.tolist()
+    slope = grid.slope_factor.tolist()
+    moisture = get_moisture_factors(grid, weather.humidity).tolist()
+    ignition = [None] * len(grid)
+    burnout = [None] * len(grid)
+
+    ignition[start] = 0.0
+    burnout[start] = get_burnout_duration(fuel[start], humidity[start])
+    queue = [(0.0, 0, start)]
+    seq = 1
+
+    while queue:
+        current_time, _, current = heapq.heappop(queue)
+        yield current, current_time, burnout[current]
+        if current_time > max_time:
+            continue
+
+        wind_speed = wind_speeds[current]
+        wind_direction = wind_directions[current]
+        strong_wind = wind_speed >= STRONG_WIND_MS
+
+        nbr_idx, nbr_dist, nbr_bearing = neighbors.find(current)
+        for neighbor, distance, bearing in zip(nbr_idx.tolist(), nbr_dist.tolist(), nbr_bearing.tolist()):
+            if ignition[neighbor] is not None:
+                continue
+
+            fuel_score = fuel[neighbor]
+            if fuel_score == 0:
+                continue
+
+            # 방지턱: 먼 거리는 강풍일 때만 넘어감
+            if distance > FIREBREAK_DISTANCE_KM and not strong_wind:
+                continue
+
+            slope_factor = slope[neighbor]
+            moisture_factor = moisture[neighbor]
+            wind_factor = get_wind_factor(wind_speed, wind_direction, bearing)
+
+            # 비화: 먼 거리로 날아간 불씨는 지형/건조도 영향을 덜 받음
+            if distance > FIREBREAK_DISTANCE_KM:
+                slope_factor = slope_factor ** 0.5
+                moisture_factor = moisture_factor ** 0.5
+
+            ros = fuel_score * slope_factor * moisture_factor * wind_factor
+            if ros < MIN_ROS:
+                continue
+
+            new_time = current_time + distance * 3600 / ros
+            ignition[neighbor] = new_time
+            burnout[neighbor] = new_time + get_burnout_duration(fuel_score, humidity[neighbor], distance)
+            heapq.heappush(queue, (new_time, seq, neighbor))
+            seq += 1
+
+def run_spread(grid, ignition_id, weather=None, neighbors=None, max_time=MAX_SIMULATION_TIME):
+    """
+    ignition_id 지점에서 시작하는 산불 확산을 끝까지 시뮬레이션하고 SpreadResult를 반환합니다.
+    인자는 iter_spread와 같습니다.
+    """
+    weather = weather or Weather()
+    ignition_time = np.full(len(grid), np.nan)
+    burnout_time = np.full(len(grid), np.nan)
+    for index, ignited_at, burnout_at in iter_spread(grid, ignition_id, weather, neighbors, max_time):
+        ignition_time[index] = ignited_at
+        burnout_time[index] = burnout_at
+    return SpreadResult(
+        grid=grid,
+        ignition_id=int(ignition_id),
+        weather=weather,
+        ignition_time=ignition_time,
+        burnout_time=burnout_time,
+    )
@@ -0,0 +1,164 @@
+"""
+시뮬레이션용 격자 데이터.
+
+격자 지점을 객체 목록 대신 NumPy 배열(id, 위도, 경도, 코드별 정적 계수)로 보관하며,
+MySQL 격자 테이블이나 같은 형식의 JSON 행 목록(테스트용 고정 데이터)에서 불러올 수 있습니다.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .model import get_fuel_score, get_slope_factor, get_soil_moisture_class, get_soil_multiplier
+
+# backend/services/simulationService.js의 KOREA_GRID_TABLE과 동일
+DEFAULT_GRID_TABLE = "imported_fire_data_auto"
+GRID_COLUMNS = ("id", "lat", "lng", "imsangdo_frtp_cd", "soil_tpgrp_tpcd", "soil_sltp_cd")
+CODE_COLUMNS = GRID_COLUMNS[3:]
+
+def encode_codes(values):
+    """
+    코드 값 목록을 (사전 인덱스 배열, 사전)으로 부호화합니다. 사전의 0번은 항상 None입니다.
+    """
+    lookup = {None: 0}
+    codes = [lookup.setdefault(value, len(lookup)) for value in values]
+    dtype = np.uint8 if len(lookup) <= 256 else np.uint16
+    return np.array(codes, dtype=dtype), list(lookup)
+
+def decode_factors(encoded, func, dtype):
+    """
+    사전의 코드마다 한 번만 func를 계산하고 인덱스 배열로 펼칩니다.
+    """
+    codes, dictionary = encoded
+    return np.array([func(value) for value in dictionary], dtype=dtype)[codes]
+
+def grid_fingerprint(ids, lat, lng):
+    digest = hashlib.sha1()
+    for array, dtype in ((ids, np.int64), (lat, np.float64), (lng, np.float64)):
+        digest.update(np.ascontiguousarray(array, dtype=dtype).tobytes())
+    return digest.hexdigest()
+
+class Grid:
+    """
+    격자 지점 배열 묶음. 배열의 i번째 원소가 하나의 격자 지점이며, 순서는 원본 행 순서를 따릅니다.
+
+    ids, lat, lng: 격자 id와 좌표
+    codes: 코드 컬럼(임상도 임종, 토양 지형그룹, 토양 배수등급) → (사전 인덱스 배열, 사전)
+    fuel_score, slope_factor, soil_class, soil_multiplier: 코드에서 미리 계산한 날씨와 무관한 계수
+    """
+
+    def __init__(self, ids, lat, lng, frtp_cd, tpgrp_cd, sltp_cd):
+        encoded = {name: encode_codes(values) for name, values in zip(CODE_COLUMNS, (frtp_cd, tpgrp_cd, sltp_cd))}
+        self._init_arrays(ids, lat, lng, encoded)
+
+    def _init_arrays(self, ids, lat, lng, codes):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.codes = codes
+
+        self.fuel_score = decode_factors(codes["imsangdo_frtp_cd"], get_fuel_score, np.float64)
+        self.slope_factor = decode_factors(codes["soil_tpgrp_tpcd"], get_slope_factor, np.float64)
+        self.soil_class = decode_factors(codes["soil_sltp_cd"], get_soil_moisture_class, np.uint8)
+        self.soil_multiplier = decode_factors(codes["soil_sltp_cd"], get_soil_multiplier, np.float64)
+        self._index = None
+
+    @classmethod
+    def from_encoded(cls, ids, lat, lng, codes):
+        """
+        이미 사전 부호화된 코드 컬럼({컬럼: (인덱스 배열, 사전)})으로 만듭니다. (스냅샷 파일 등)
+        """
+        grid = cls.__new__(cls)
+        grid._init_arrays(ids, lat, lng, codes)
+        return grid
+
+    def __len__(self):
+        return len(self.ids)
+
+    def code_values(self, name):
+        """
+        코드 컬럼의 원래 값 목록
+        """
+        codes, dictionary = self.codes[name]
+        return [dictionary[c] for c in codes.tolist()]
+
+    def index_of(self, grid_id):
+        """
+        격자 id의 배열 위치를 반환합니다. 없으면 None.
+        """
+        if self._index is None:
+            self._index = {grid_id: i for i, grid_id in enumerate(self.ids.tolist())}
+        return self._index.get(int(grid_id))
+
+    def fingerprint(self):
+        """
+        격자 id와 좌표로 만든 해시. 격자를 다시 생성하면(Take_a_point.py) 값이 바뀌므로
+        미리 계산해 둔 이웃 그래프 등이 현재 격자와 맞는지 확인하는 데 사용합니다.
+        """
+        return grid_fingerprint(self.ids, self.lat, self.lng)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        (id, lat, lng, imsangdo_frtp_cd, soil_tpgrp_tpcd, soil_sltp_cd) 튜플 또는 같은 키의 dict 목록으로 만듭니다.
+        """
+        rows = [tuple(row[col] for col in GRID_COLUMNS) if isinstance(row, dict) else tuple(row) for row in rows]
+        if not rows:
+            return cls([], [], [], [], [], [])
+        ids, lat, lng, frtp, tpgrp, sltp = zip(*rows)
+        return cls(ids, [float(v) for v in lat], [float(v) for v in lng], frtp, tpgrp, sltp)
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        SELECT 결과와 같은 형식의 JSON 행 목록 파일에서 불러옵니다.
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls.from_rows(json.load(f))
+
+    @classmethod
+    def from_mysql(cls, mysql_conn, table=DEFAULT_GRID_TABLE):
+        """
+        MySQL 격자 테이블에서 시뮬레이션에 필요한 컬럼을 불러옵니다.
+        정적 계수 테이블(python -m fire_sim.static_factors)이 있으면 계수도 그 테이블에서 읽습니다.
+        """
+        from .static_factors import static_factor_table_exists, read_grid_with_static_factors
+        if static_factor_table_exists(mysql_conn, table):
+            return read_grid_with_static_factors(mysql_conn, table)
+        cursor = mysql_conn.cursor()
+        cursor.execute(f"SELECT {', '.join(GRID_COLUMNS)} FROM {table};")
+        rows = cursor.fetchall()
+        cursor.close()
+        return cls.from_rows(rows)
+
+def load_grid(grid_json=None, table=DEFAULT_GRID_TABLE, snapshot=None):
+    """
+    스냅샷 파일(fire_sim.snapshot) 또는 JSON 파일이 있으면 그 파일에서, 없으면 MySQL 격자 테이블에서 격자를 불러옵니다.
+    """
+    if snapshot:
+        from .snapshot import GridSnapshot
+        return GridSnapshot.open(snapshot).to_grid()
+    if grid_json:
+        return Grid.from_json(grid_json)
+    mysql_conn = connect_mysql()
+    try:
+        return Grid.from_mysql(mysql_conn, table)
+    finally:
+        mysql_conn.close()
+
+def connect_mysql():
+    """
+    .env의 MYSQL_* 설정으로 MySQL에 연결합니다. (MySQL 격자 포인트 스크립트들과 같은 설정)
+    """
+    import mysql.connector
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST"),
+        port=int(os.getenv("MYSQL_PORT", 3306)),
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD"),
+        database=os.getenv("MYSQL_DBNAME"),
+    )
@@ -0,0 +1,190 @@
+"""
+시간대별 확산 경계(등시선) 생성.
+
+simulationService.js는 10분마다 발화한 지점 전체를 다시 걸러 볼록 껍질을 처음부터 계산합니다.
+여기서는 발화 지점을 발화 시각 순으로 한 번만 정렬한 뒤, 구간마다 새로 발화한 지점만 이전 껍질 꼭짓점과
+합쳐 껍질을 갱신합니다. 오목 껍질(concave)과 격자 셀 합집합(raster) 경계는 shapely가 있을 때 사용할 수 있습니다.
+"""
+import math
+
+import numpy as np
+
+from .model import MAX_SIMULATION_TIME, EARTH_RADIUS_KM
+
+DEFAULT_TIME_STEP = 600       # 10분 간격 (초)
+SMALL_FIRE_BUFFER_KM = 0.01   # 점이 1~2개일 때의 버퍼 반경 (10m)
+BUFFER_SEGMENTS = 32
+DEFAULT_CONCAVE_RATIO = 0.3
+DEFAULT_CELL_SIZE = 0.01      # raster 경계의 셀 크기 (도, 격자 간격)
+BOUNDARY_MODES = ("convex", "concave", "raster")
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+def convex_hull(points):
+    """
+    Andrew monotone chain 볼록 껍질. points: (n, 2) 배열 → 반시계 방향 꼭짓점 (m, 2) 배열
+    """
+    points = np.unique(np.asarray(points, dtype=np.float64), axis=0)  # x, y 순 정렬 + 중복 제거
+    if len(points) <= 2:
+        return points
+    pts = points.tolist()
+    lower = []
+    for p in pts:
+        while len(lower) >= 2 and _cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(pts):
+        while len(upper) >= 2 and _cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return np.array(lower[:-1] + upper[:-1])
+
+def circle_ring(lng, lat, radius_km=SMALL_FIRE_BUFFER_KM, segments=BUFFER_SEGMENTS):
+    """
+    중심점에서 radius_km 떨어진 점들로 만든 닫힌 원형 링 ([lng, lat] 목록, 반시계 방향)
+    """
+    lat1 = math.radians(lat)
+    lng1 = math.radians(lng)
+    angular = radius_km / EARTH_RADIUS_KM
+    ring = []
+    for i in range(segments):
+        bearing = -2 * math.pi * i / segments
+        lat2 = math.asin(math.sin(lat1) * math.cos(angular) +
+                         math.cos(lat1) * math.sin(angular) * math.cos(bearing))
+        lng2 = lng1 + math.atan2(math.sin(bearing) * math.sin(angular) * math.cos(lat1),
+                                 math.cos(angular) - math.sin(lat1) * math.sin(lat2))
+        ring.append([math.degrees(lng2), math.degrees(lat2)])
+    ring.append(ring[0])
+    return ring
+
+def small_fire_polygon(points):
+    """
+    점이 1~2개일 때 JS와 같이 10m 버퍼로 표현합니다. (두 점은 서로 떨어져 있으므로 MultiPolygon)
+    """
+    rings = [[circle_ring(lng, lat)] for lng, lat in points.tolist()]
+    if len(rings) == 1:
+        return {"type": "Polygon", "coordinates": rings[0]}
+    return {"type": "MultiPolygon", "coordinates": rings}
+
+def hull_polygon(hull):
+    ring = hull.tolist()
+    return {"type": "Polygon", "coordinates": [ring + [ring[0]]]}
+
+def _time_steps(ignition_times, time_step, min_time):
+    max_time = max(float(ignition_times.max()) if len(ignition_times) else 0.0, min_time)
+    return np.arange(0, math.floor(max_time / time_step) + 1) * time_step
+
+def _ignited_by_step(result, time_step, min_time):
+    """
+    (시각 t, 이번 구간에 새로 발화한 지점 좌표 (k, 2) 배열, t까지 발화한 전체 지점 좌표)를 구간 순서대로 yield 합니다.
+    """
+    idx = result.ignited_indices()
+    times = result.ignition_time[idx]
+    order = np.argsort(times, kind="stable")
+    idx, times = idx[order], times[order]
+    coords = np.column_stack([result.grid.lng[idx], result.grid.lat[idx]])
+
+    start = 0
+    for t in _time_steps(times, time_step, min_time):
+        end = int(np.searchsorted(times, t, side="right"))
+        yield int(t), coords[start:end], coords[:end]
+        start = end
+
+class IncrementalConvexBoundary:
+    """
+    점을 추가할 때마다 볼록 껍질 경계를 갱신합니다. 지금까지의 모든 점 대신 껍질 꼭짓점만 보관하므로
+    메모리 사용량이 발화 지점 수와 무관합니다.
+    """
+
+    def __init__(self):
+        self.hull = np.empty((0, 2))
+        self.count = 0
+        self.polygon = None
+
+    def add(self, points):
+        """
+        (k, 2) 좌표 배열을 추가하고 현재 경계(GeoJSON geometry)를 반환합니다. 점이 없으면 이전 경계를 그대로 반환합니다.
+        """
+        if len(points) == 0:
+            return self.polygon
+        self.count += len(points)
+        candidates = np.concatenate([self.hull, points]) if len(self.hull) else np.asarray(points, dtype=np.float64)
+        if self.count >= 3:
+            self.hull = convex_hull(candidates)
+            self.polygon = hull_polygon(self.hull) if len(self.hull) >= 3 else None
+        else:
+            self.hull = candidates
+            self.polygon = small_fire_polygon(candidates)
+        return self.polygon
+
+def convex_isochrones(result, time_step=DEFAULT_TIME_STEP, min_time=MAX_SIMULATION_TIME):
+    """
+    볼록 껍질 경계를 점진적으로 갱신합니다. 새 지점이 없으면 이전 경계를 그대로 사용합니다.
+    """
+    boundaries = []
+    boundary = IncrementalConvexBoundary()
+    for t, new_points, _ in _ignited_by_step(result, time_step, min_time):
+        polygon = boundary.add(new_points)
+        if polygon is not None:
+            boundaries.append({"time": t, "polygon": polygon})
+    return boundaries
+
+def _require_shapely():
+    try:
+        import shapely
+    except ImportError as e:
+        raise RuntimeError("concave/raster 경계에는 shapely가 필요합니다. (pip install shapely)") from e
+    return shapely
+
+def concave_isochrones(result, time_step=DEFAULT_TIME_STEP, min_time=MAX_SIMULATION_TIME,
+                       ratio=DEFAULT_CONCAVE_RATIO):
+    """
+    오목 껍질 경계. 새로 발화한 지점이 있는 구간에서만 다시 계산합니다.
+    """
+    shapely = _require_shapely()
+    boundaries = []
+    polygon = None
+    for t, new_points, all_points in _ignited_by_step(result, time_step, min_time):
+        if len(new_points):
+            if len(all_points) >= 3:
+                hull = shapely.concave_hull(shapely.multipoints(all_points), ratio=ratio)
+                polygon = shapely.geometry.mapping(hull) if hull.geom_type in ("Polygon", "MultiPolygon") else None
+            else:
+                polygon = small_fire_polygon(all_points)
+        if polygon is not None:
+            boundaries.append({"time": t, "polygon": polygon})
+    return boundaries
+
+def raster_isochrones(result, time_step=DEFAULT_TIME_STEP, min_time=MAX_SIMULATION_TIME,
+                      cell_size=DEFAULT_CELL_SIZE):
+    """
+    발화한 격자 셀(격자점 중심, cell_size 정사각형)의 합집합 경계. 이전 구간의 합집합에 새 셀만 더합니다.
+    """
+    shapely = _require_shapely()
+    half = cell_size / 2
+    boundaries = []
+    area = None
+    for t, new_points, _ in _ignited_by_step(result, time_step, min_time):
+        if len(new_points):
+            cells = shapely.box(new_points[:, 0] - half, new_points[:, 1] - half,
+                                new_points[:, 0] + half, new_points[:, 1] + half)
+            merged = shapely.union_all(cells)
+            area = merged if area is None else shapely.union(area, merged)
+        if area is not None:
+            boundaries.append({"time": t, "polygon": shapely.geometry.mapping(area)})
+    return boundaries
+
+def build_isochrones(result, mode="convex", time_step=DEFAULT_TIME_STEP, min_time=MAX_SIMULATION_TIME, **options):
+    """
+    SpreadResult로부터 시간대별 경계 목록 [{time, polygon(GeoJSON geometry)}]을 만듭니다.
+    시간은 0초부터 time_step 간격으로, 최대 발화 시각과 min_time 중 큰 값까지입니다. (JS timeBoundaries와 같은 구간)
+    """
+    if mode == "convex":
+        return convex_isochrones(result, time_step, min_time)
+    if mode == "concave":
+        return concave_isochrones(result, time_step, min_time, **options)
+    if mode == "raster":
+        return raster_isochrones(result, time_step, min_time, **options)
+    raise ValueError(f"지원하지 않는 경계 방식입니다: {mode} (가능: {', '.join(BOUNDARY_MODES)})")
@@ -0,0 +1,169 @@
+"""
+산불 확산 모델의 계산 함수들.
+
+backend/services/simulationService.js의 모델 함수(연료량, 경사도, 건조도, 바람, 연소 시간)와
+turf의 거리/방위각 계산을 같은 부동소수 연산 순서로 옮겨 JS 결과와 일치하도록 했습니다.
+"""
+import math
+
+import numpy as np
+
+# 상수 정의 (simulationService.js와 동일)
+FIREBREAK_DISTANCE_KM = 1.5  # 이 거리 이상은 '방지턱'으로 간주
+STRONG_WIND_MS = 10          # 이 풍속 이상은 방지턱을 넘을 수 있는 '강풍'
+ONE_GRID_UNIT_KM = 1.2       # 격자 한 칸의 기준 거리
+MAX_SIMULATION_TIME = 7 * 3600  # 이 시간(초) 이후에 발화한 지점은 더 이상 확산시키지 않음
+MIN_ROS = 1                  # 이 값보다 확산 속도 점수가 낮으면 확산하지 않음
+
+# 이웃 탐색 설정 (findNeighbors와 동일)
+NEIGHBOR_SEARCH_RADIUS = 0.03  # 도 단위 상자 크기
+NEIGHBOR_MAX_DISTANCE_KM = 5.0
+NEIGHBOR_COUNT = 8
+
+# turf의 지구 반지름 (turf와 같은 연산으로 km 환산)
+EARTH_RADIUS_KM = 6371008.8 / 1000
+
+FUEL_SCORES = {'1': 5, '3': 4, '2': 3, '4': 2}
+SLOPE_FACTORS = {
+    '01': 1.5, '02': 1.5, '03': 1.5, '08': 1.5, '12': 1.5,
+    '04': 0.8, '05': 0.8, '06': 0.8, '07': 0.8, '11': 0.8,
+    '10': 0.5,
+}
+DRY_SOIL_CODES = {'01', '02', '05', '06', '07', '08', '09', '10', '11', '13', '14', '15', '16', '17', '18', '19', '23', '24'}
+WET_SOIL_CODES = {'03', '12', '20'}
+NON_BURNABLE_SOIL_CODES = {'82', '91', '92', '93', '94', '95', '97', '99', '27', '28', '29'}
+
+# 토양 배수 등급 분류 (get_soil_moisture_class 반환값)
+SOIL_NONE, SOIL_DRY, SOIL_WET, SOIL_NON_BURNABLE, SOIL_OTHER = 0, 1, 2, 3, 4
+# 토양 분류별 건조도 가중치 (습도 계수에 곱함, 비가연성 지역은 0)
+SOIL_MULTIPLIERS = {SOIL_DRY: 1.2, SOIL_WET: 0.8, SOIL_NON_BURNABLE: 0.0}
+
+def js_key(value):
+    """
+    JS 객체 키 조회처럼 값을 문자열 키로 바꿉니다. (숫자 1 → '1', 1.0 → '1')
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def js_truthy(value):
+    return value is not None and value != '' and value != 0
+
+def get_fuel_score(imsangdo_code):
+    """
+    임상도 코드를 기반으로 연료량 점수를 반환합니다. (높을수록 가연성이 높음)
+    """
+    return FUEL_SCORES.get(js_key(imsangdo_code), 0) if js_truthy(imsangdo_code) else 0
+
+def get_slope_factor(code1):
+    """
+    토양지형그룹코드를 기반으로 경사도 요인을 반환합니다.
+    """
+    if not js_truthy(code1):
+        return 1.0
+    return SLOPE_FACTORS.get(js_key(code1), 1.0)
+
+def get_soil_moisture_class(soil_code):
+    """
+    토양배수등급코드를 건조/습윤/비가연/기타 분류로 바꿉니다.
+    JS의 Array.includes처럼 문자열 코드만 일치로 봅니다.
+    """
+    if not js_truthy(soil_code):
+        return SOIL_NONE
+    if soil_code in DRY_SOIL_CODES:
+        return SOIL_DRY
+    if soil_code in WET_SOIL_CODES:
+        return SOIL_WET
+    if soil_code in NON_BURNABLE_SOIL_CODES:
+        return SOIL_NON_BURNABLE
+    return SOIL_OTHER
+
+def get_soil_multiplier(soil_code):
+    """
+    토양배수등급코드의 건조도 가중치. 건조도 요인 = 습도 계수 × 이 값 (get_moisture_factor와 같음)
+    """
+    return SOIL_MULTIPLIERS.get(get_soil_moisture_class(soil_code), 1.0)
+
+def get_humidity_factor(humidity):
+    """
+    습도에 따른 기본 건조도 계수 (simulationService.js의 getHumidityFactor)
+    """
+    if humidity < 35:
+        return 1.5
+    if humidity < 50:
+        return 1.2
+    if humidity > 80:
+        return 0.4
+    if humidity > 70:
+        return 0.6
+    return 1.0
+
+def get_moisture_factor(soil_code, humidity):
+    """
+    실시간 습도와 토양 코드를 조합하여 건조도 요인을 계산합니다.
+    """
+    factor = get_humidity_factor(humidity)
+    soil_class = get_soil_moisture_class(soil_code)
+    # 토양 배수 등급(건조도)에 따른 가중치 적용, 물/시가지 등 비가연성 지역은 0
+    if soil_class == SOIL_DRY:
+        return factor * 1.2
+    if soil_class == SOIL_WET:
+        return factor * 0.8
+    if soil_class == SOIL_NON_BURNABLE:
+        return 0
+    return factor
+
+def get_burnout_duration(fuel_score, humidity, distance=0):
+    """
+    피해도(연소 시간, 초)를 계산합니다. 습도가 높거나 먼 거리를 건너뛴 불씨는 연소 시간이 짧아집니다.
+    """
+    base_duration = fuel_score * 1200
+
+    if humidity > 80:
+        base_duration *= 0.5
+    elif humidity > 70:
+        base_duration *= 0.7
+
+    jump_units = distance / ONE_GRID_UNIT_KM
+    if jump_units >= 2:
+        base_duration /= max(1, jump_units - 1)
+
+    return base_duration
+
+def get_wind_factor(wind_speed, wind_direction, bearing):
+    """
+    풍향/풍속과 산불 진행 방향의 관계로 바람 요인을 반환합니다. 순풍일 때 가장 큽니다.
+    """
+    angle_diff = abs(math.fmod(wind_direction - bearing + 180, 360) - 180)
+    factor = 1.0
+    if angle_diff < 45:
+        factor += wind_speed / 4
+    elif angle_diff < 90:
+        factor += wind_speed / 8
+    return max(0.5, factor)
+
+def degrees_to_radians(degrees):
+    return np.fmod(degrees, 360) * math.pi / 180
+
+def haversine_km(lng1, lat1, lng2, lat2):
+    """
+    turf.distance와 같은 방식의 대원 거리(km). 인자는 스칼라 또는 NumPy 배열입니다.
+    """
+    d_lat = degrees_to_radians(lat2 - lat1)
+    d_lon = degrees_to_radians(lng2 - lng1)
+    lat1 = degrees_to_radians(lat1)
+    lat2 = degrees_to_radians(lat2)
+    a = np.sin(d_lat / 2) ** 2 + np.sin(d_lon / 2) ** 2 * np.cos(lat1) * np.cos(lat2)
+    return 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)) * EARTH_RADIUS_KM
+
+def bearing_deg(lng1, lat1, lng2, lat2):
+    """
+    turf.bearing과 같은 방식의 방위각(-180~180도). 인자는 스칼라 또는 NumPy 배열입니다.
+    """
+    lon1 = degrees_to_radians(lng1)
+    lon2 = degrees_to_radians(lng2)
+    lat1 = degrees_to_radians(lat1)
+    lat2 = degrees_to_radians(lat2)
+    a = np.sin(lon2 - lon1) * np.cos(lat2)
+    b = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(lon2 - lon1)
+    return np.fmod(np.arctan2(a, b), 2 * math.pi) * 180 / math.pi
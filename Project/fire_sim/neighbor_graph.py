@@ -0,0 +1,171 @@
+"""
+격자 이웃 그래프 (CSR 인접 리스트).
+
+findNeighbors 규칙으로 찾은 이웃(가까운 순 최대 8개)을 격자 버전마다 한 번만 계산해
+indptr/indices/distance/bearing 배열로 저장합니다. 저장된 .npy 파일은 메모리 매핑으로 열기 때문에
+시뮬레이션을 시작할 때 불러오는 비용이 거의 없습니다.
+
+격자를 다시 생성했을 때(Take_a_point.py)만 다시 만들면 됩니다:
+    python -m fire_sim.neighbor_graph <출력 디렉터리> [--grid-json 경로 | --table 테이블]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from .engine import NeighborFinder
+from .grid import DEFAULT_GRID_TABLE, load_grid
+from .model import NEIGHBOR_MAX_DISTANCE_KM, NEIGHBOR_COUNT, haversine_km, bearing_deg
+
+GRAPH_ARRAYS = ("indptr", "indices", "distance", "bearing", "ids")
+META_FILE = "meta.json"
+
+class NeighborGraph:
+    """
+    i번째 격자의 이웃은 indices[indptr[i]:indptr[i + 1]]이며 가까운 순으로 정렬되어 있습니다.
+    distance(km)와 bearing(도)은 같은 위치의 간선 값입니다. ids는 그래프를 만들 때의 격자 id 순서입니다.
+    """
+
+    def __init__(self, indptr, indices, distance, bearing, ids, fingerprint=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.distance = distance
+        self.bearing = bearing
+        self.ids = ids
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def edge_count(self):
+        return int(self.indptr[-1])
+
+    def find(self, i):
+        """
+        NeighborFinder.find와 같은 (이웃 인덱스, 거리, 방위각) 배열을 반환합니다.
+        """
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.distance[start:end], self.bearing[start:end]
+
+    def neighbor_ids(self, grid_id):
+        """
+        격자 id의 이웃 id 목록 (그래프의 ids 기준)
+        """
+        matches = np.flatnonzero(self.ids == grid_id)
+        if len(matches) == 0:
+            return []
+        return self.ids[self.find(int(matches[0]))[0]].tolist()
+
+    def matches(self, grid):
+        """
+        그래프가 주어진 격자로 만들어졌는지 확인합니다.
+        """
+        if self.fingerprint is not None:
+            return self.fingerprint == grid.fingerprint()
+        return len(self.ids) == len(grid) and np.array_equal(self.ids, grid.ids)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in GRAPH_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        meta = {
+            "fingerprint": self.fingerprint,
+            "points": len(self),
+            "edges": self.edge_count,
+            "max_neighbors": NEIGHBOR_COUNT,
+            "max_distance_km": NEIGHBOR_MAX_DISTANCE_KM,
+        }
+        with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """
+        저장된 그래프를 엽니다. 기본값은 읽기 전용 메모리 매핑이므로 실제 접근하는 부분만 디스크에서 읽습니다.
+        """
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in GRAPH_ARRAYS}
+        meta_path = os.path.join(directory, META_FILE)
+        fingerprint = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                fingerprint = json.load(f).get("fingerprint")
+        return cls(fingerprint=fingerprint, **arrays)
+
+def build_neighbor_graph(grid):
+    """
+    격자 전체의 이웃 그래프를 만듭니다. 결과는 NeighborFinder.find를 모든 지점에 적용한 것과 같으며,
+    버킷(약 0.03°) 단위로 버킷 안의 지점들과 주변 3x3 버킷의 후보를 한 번에 행렬로 계산합니다.
+    """
+    finder = NeighborFinder(grid)
+    n = len(grid)
+    counts = np.zeros(n, dtype=np.int64)
+    nbr_idx = np.full((n, NEIGHBOR_COUNT), -1, dtype=np.int64)
+    nbr_dist = np.zeros((n, NEIGHBOR_COUNT), dtype=np.float64)
+
+    for members in finder.buckets.values():
+        cand = finder.candidates(members[0])
+        lat = grid.lat[members][:, None]
+        lng = grid.lng[members][:, None]
+        c_lat = grid.lat[cand][None, :]
+        c_lng = grid.lng[cand][None, :]
+        valid = ((c_lat > lat - finder.radius) & (c_lat < lat + finder.radius) &
+                 (c_lng > lng - finder.radius) & (c_lng < lng + finder.radius) &
+                 (grid.ids[cand][None, :] != grid.ids[members][:, None]))
+        dist = haversine_km(lng, lat, c_lng, c_lat)
+        valid &= (dist > 0) & (dist < NEIGHBOR_MAX_DISTANCE_KM)
+        dist = np.where(valid, dist, np.inf)
+
+        # 후보가 격자 순서이므로 안정 정렬하면 거리가 같을 때의 순서가 findNeighbors와 같음
+        order = np.argsort(dist, axis=1, kind="stable")[:, :NEIGHBOR_COUNT]
+        top_dist = np.take_along_axis(dist, order, axis=1)
+        k = order.shape[1]
+        nbr_idx[members, :k] = np.where(np.isfinite(top_dist), cand[order], -1)
+        nbr_dist[members, :k] = np.where(np.isfinite(top_dist), top_dist, 0.0)
+        counts[members] = np.isfinite(top_dist).sum(axis=1)
+
+    mask = nbr_idx >= 0
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = nbr_idx[mask]
+    distance = nbr_dist[mask]
+    source = np.repeat(np.arange(n), counts)
+    bearing = bearing_deg(grid.lng[source], grid.lat[source], grid.lng[indices], grid.lat[indices])
+
+    return NeighborGraph(indptr, indices.astype(np.int32), distance, bearing,
+                         grid.ids.copy(), grid.fingerprint())
+
+def load_neighbor_graph(directory, grid):
+    """
+    저장된 그래프를 열고 현재 격자와 맞는지 확인합니다. 맞지 않으면 ValueError.
+    """
+    graph = NeighborGraph.load(directory)
+    if not graph.matches(grid):
+        raise ValueError(f"이웃 그래프({directory})가 현재 격자와 다릅니다. 그래프를 다시 생성하세요.")
+    return graph
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="fire_sim.neighbor_graph", description="격자 이웃 그래프(CSR) 생성")
+    parser.add_argument("output", help="그래프 배열을 저장할 디렉터리")
+    parser.add_argument("--grid-json", help="격자 행 목록 JSON 파일 (지정하지 않으면 MySQL에서 불러옴)")
+    parser.add_argument("--table", default=DEFAULT_GRID_TABLE, help="MySQL 격자 테이블 이름")
+    parser.add_argument("--snapshot", help="격자 스냅샷 파일 (python -m fire_sim.snapshot으로 생성)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.time()
+    grid = load_grid(args.grid_json, args.table, args.snapshot)
+    print(f"격자 {len(grid)}개 로드 ({time.time() - start:.1f}초)")
+
+    start = time.time()
+    graph = build_neighbor_graph(grid)
+    graph.save(args.output)
+    print(f"🌟 이웃 그래프 저장 완료: {args.output} "
+          f"(간선 {graph.edge_count}개, {time.time() - start:.1f}초)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+규칙 격자(korea_grid) 위의 시간 단계 셀룰러 오토마타 확산 엔진.
+
+engine.iter_spread는 이벤트 큐에서 발화 지점을 하나씩 꺼내 이웃을 확장하므로, 화선에 활성 격자가 수만 개인 큰 산불에서는
+파이썬 반복이 그만큼 늘어납니다. 여기서는 격자를 (행, 열) 조밀한 배열로 펼치고, 고정된 시간 구간(time_step)마다
+그 구간 안에 발화하는 격자들의 8방향 이웃 도달 시각을 배열 이동(slice) 8번으로 한꺼번에 갱신합니다.
+연산은 불이 닿은 범위의 사각형 창 안에서만 하므로 실행 시간은 (시간 구간 수 x 창 크기)로 정해집니다.
+
+이벤트 큐 엔진과 같은 연료/경사/건조도/바람 계수와 방지턱/비화/최소 확산 속도/7시간 규칙을 쓰지만 다음이 다릅니다.
+    - 이웃은 바로 옆 8개 격자점입니다. (격자가 빠진 곳을 건너뛰는 먼 이웃은 없음)
+    - 도달 시각은 먼저 발견한 값이 아니라 모든 이웃 경로 중 가장 이른 값입니다.
+
+격자 배열 준비(이동별 확산 시간 계산)에 고정 비용이 있으므로 작은 산불은 이벤트 큐가, 발화 격자가 수천 개를
+넘는 큰 산불은 이 엔진이 빠릅니다. python -m fire_sim --engine raster, python -m fire_sim.batch --engine raster로 선택합니다.
+"""
+import math
+
+import numpy as np
+
+from .engine import Weather, SpreadResult, get_moisture_factors
+from .isochrones import DEFAULT_TIME_STEP
+from .model import (
+    FIREBREAK_DISTANCE_KM, STRONG_WIND_MS, MAX_SIMULATION_TIME, MIN_ROS, ONE_GRID_UNIT_KM,
+    haversine_km, bearing_deg,
+)
+from .snapshot import DEFAULT_STEP
+
+# 시뮬레이션 엔진 선택지: 이벤트 큐(engine.run_spread) / 셀룰러 오토마타(run_raster_spread)
+ENGINES = ("queue", "raster")
+
+# 8방향 이웃 (행, 열) 이동
+SHIFTS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+def get_wind_factors(wind_speed, wind_direction, bearing):
+    """
+    get_wind_factor의 벡터화
+    """
+    angle_diff = np.abs(np.fmod(wind_direction - bearing + 180, 360) - 180)
+    factor = 1.0 + np.where(angle_diff < 45, wind_speed / 4, np.where(angle_diff < 90, wind_speed / 8, 0.0))
+    return np.maximum(0.5, factor)
+
+def get_burnout_durations(fuel_score, humidity, distance):
+    """
+    get_burnout_duration의 벡터화
+    """
+    duration = fuel_score * 1200 * np.where(humidity > 80, 0.5, np.where(humidity > 70, 0.7, 1.0))
+    jump_units = distance / ONE_GRID_UNIT_KM
+    return np.where(jump_units >= 2, duration / np.maximum(1, jump_units - 1), duration)
+
+class RasterLattice:
+    """
+    Grid를 (n_rows, n_cols) 격자점 배열로 펼친 구조. 격자마다 한 번 만들어 여러 시뮬레이션에서 재사용합니다.
+    배열은 가장자리에 빈 격자점 한 줄씩을 더한 (n_rows + 2, n_cols + 2) 크기라서 이웃 이동이 범위를 벗어나지 않습니다.
+    """
+
+    def __init__(self, grid, step=DEFAULT_STEP):
+        if len(grid) == 0:
+            raise ValueError("격자가 비어 있습니다.")
+        self.grid = grid
+        self.step = step
+        self.start_lat = float(grid.lat.min())
+        self.start_lng = float(grid.lng.min())
+        rows = np.rint((grid.lat - self.start_lat) / step).astype(np.int64)
+        cols = np.rint((grid.lng - self.start_lng) / step).astype(np.int64)
+        if (np.abs(grid.lat - (self.start_lat + rows * step)) > step / 10).any() or \
+                (np.abs(grid.lng - (self.start_lng + cols * step)) > step / 10).any():
+            raise ValueError(f"격자 좌표가 간격 {step}의 격자점 위에 있지 않습니다.")
+        self.n_rows = int(rows.max()) + 1
+        self.n_cols = int(cols.max()) + 1
+        self.rows = rows + 1
+        self.cols = cols + 1
+        self.shape = (self.n_rows + 2, self.n_cols + 2)
+
+        cell = np.full(self.shape, -1, dtype=np.int64)
+        cell[self.rows, self.cols] = np.arange(len(grid))
+        if (cell >= 0).sum() != len(grid):
+            raise ValueError("같은 격자점에 여러 격자가 있습니다.")
+        self.fuel = self.to_lattice(grid.fuel_score.astype(np.float64))
+        self.slope = self.to_lattice(grid.slope_factor)
+
+        # 이동별 (거리, 방위각). 경도 간격이 일정하므로 출발 격자점의 위도(행)에만 따라 달라집니다.
+        row_lat = self.start_lat + (np.arange(self.shape[0]) - 1) * step
+        self.distance = []
+        self.bearing = []
+        for dr, dc in SHIFTS:
+            self.distance.append(haversine_km(0.0, row_lat, dc * step, row_lat + dr * step)[:, None])
+            self.bearing.append(bearing_deg(0.0, row_lat, dc * step, row_lat + dr * step)[:, None])
+
+    def to_lattice(self, values, fill=0.0):
+        """
+        격자 순서의 배열을 격자점 배열로 펼칩니다. 격자가 없는 격자점은 fill입니다.
+        """
+        lattice = np.full(self.shape, fill, dtype=np.float64)
+        lattice[self.rows, self.cols] = values
+        return lattice
+
+    def travel_times(self, weather):
+        """
+        이동별 격자점 배열: 출발 격자점에서 그 방향 이웃까지 불이 옮겨 가는 시간(초). 옮겨 가지 않으면 inf.
+        """
+        n = len(self.grid)
+        humidity = np.broadcast_to(np.asarray(weather.humidity, dtype=np.float64), n)
+        wind_speed = self.to_lattice(np.broadcast_to(np.asarray(weather.wind_speed, dtype=np.float64), n))
+        wind_direction = self.to_lattice(np.broadcast_to(np.asarray(weather.wind_direction, dtype=np.float64), n))
+        moisture = self.to_lattice(get_moisture_factors(self.grid, humidity))
+        strong_wind = wind_speed >= STRONG_WIND_MS
+
+        ros = self.fuel * self.slope * moisture
+        # 비화: 먼 거리로 날아간 불씨는 지형/건조도 영향을 덜 받음
+        jump_ros = self.fuel * np.sqrt(self.slope) * np.sqrt(moisture)
+
+        inner = (slice(1, -1), slice(1, -1))
+        travel = []
+        for k, (dr, dc) in enumerate(SHIFTS):
+            target = (slice(1 + dr, self.shape[0] - 1 + dr), slice(1 + dc, self.shape[1] - 1 + dc))
+            distance = self.distance[k][1:-1]
+            jump = distance > FIREBREAK_DISTANCE_KM
+            wind_factor = get_wind_factors(wind_speed[inner], wind_direction[inner], self.bearing[k][1:-1])
+            shift_ros = np.where(jump, jump_ros[target], ros[target]) * wind_factor
+            # 연료 없는 이웃, 강풍이 아닐 때의 방지턱, 최소 확산 속도 미만은 옮겨 가지 않음
+            blocked = (self.fuel[target] == 0) | (jump & ~strong_wind[inner]) | (shift_ros < MIN_ROS)
+            times = np.full(self.shape, np.inf)
+            with np.errstate(divide="ignore"):
+                times[inner] = np.where(blocked, np.inf, distance * 3600 / shift_ros)
+            travel.append(times)
+        return travel
+
+def run_raster_spread(grid, ignition_id, weather=None, lattice=None, max_time=MAX_SIMULATION_TIME,
+                      time_step=DEFAULT_TIME_STEP):
+    """
+    ignition_id 지점에서 시작하는 산불 확산을 셀룰러 오토마타로 시뮬레이션하고 SpreadResult를 반환합니다.
+
+    weather: Weather 또는 격자별 기상 CellWeather (없으면 기본값)
+    lattice: RasterLattice (없으면 생성)
+    max_time: 이 시간(초)보다 늦게 발화한 지점은 더 이상 확산시키지 않음
+    time_step: 한 번에 처리하는 시간 구간(초). 결과에는 영향이 없고 구간당 배열 연산 횟수만 달라집니다.
+    """
+    weather = weather or Weather()
+    start = grid.index_of(ignition_id)
+    if start is None:
+        raise ValueError(f"발화 지점 ID {ignition_id}를 찾을 수 없습니다.")
+    lattice = lattice or RasterLattice(grid)
+    travel = lattice.travel_times(weather)
+
+    arrival = np.full(lattice.shape, np.inf)
+    hop_distance = np.zeros(lattice.shape)
+    # 격자점을 마지막으로 확산시켰을 때의 도달 시각 (더 이른 도달 시각이 생기면 다시 확산)
+    expanded = np.full(lattice.shape, np.inf)
+    row, col = int(lattice.rows[start]), int(lattice.cols[start])
+    arrival[row, col] = 0.0
+
+    # 도달 시각이 있는 격자점을 모두 포함하는 창 [r0, r1) x [c0, c1)
+    r0, r1, c0, c1 = row, row + 1, col, col + 1
+    step_end = 0.0
+    while True:
+        window = (slice(r0, r1), slice(c0, c1))
+        times = arrival[window]
+        pending = (times < expanded[window]) & (times <= max_time)
+        frontier = pending & (times <= step_end)
+        if not frontier.any():
+            if not pending.any():
+                break
+            # 다음으로 발화하는 격자점이 있는 시간 구간으로 건너뜀
+            step_end = (math.floor(times[pending].min() / time_step) + 1) * time_step
+            continue
+
+        source_time = np.where(frontier, times, np.inf)
+        expanded[window][frontier] = times[frontier]
+        for k, (dr, dc) in enumerate(SHIFTS):
+            target = (slice(r0 + dr, r1 + dr), slice(c0 + dc, c1 + dc))
+            candidate = source_time + travel[k][window]
+            better = candidate < arrival[target]
+            arrival[target][better] = candidate[better]
+            hop_distance[target][better] = np.broadcast_to(lattice.distance[k][r0:r1], better.shape)[better]
+
+        # 창 가장자리에서 확산했으면 그 방향으로 한 줄 넓힘 (패딩 줄은 격자가 없으므로 제외)
+        r0 = max(r0 - 1, 1) if frontier[0].any() else r0
+        r1 = min(r1 + 1, lattice.shape[0] - 1) if frontier[-1].any() else r1
+        c0 = max(c0 - 1, 1) if frontier[:, 0].any() else c0
+        c1 = min(c1 + 1, lattice.shape[1] - 1) if frontier[:, -1].any() else c1
+
+    ignition_time = arrival[lattice.rows, lattice.cols]
+    reached = np.isfinite(ignition_time)
+    ignition_time[~reached] = np.nan
+    humidity = np.broadcast_to(np.asarray(weather.humidity, dtype=np.float64), len(grid))
+    burnout_time = np.where(reached, ignition_time + get_burnout_durations(
+        grid.fuel_score, humidity, hop_distance[lattice.rows, lattice.cols]), np.nan)
+    return SpreadResult(
+        grid=grid,
+        ignition_id=int(ignition_id),
+        weather=weather,
+        ignition_time=ignition_time,
+        burnout_time=burnout_time,
+    )
@@ -0,0 +1,145 @@
+"""
+위경도 → 가장 가까운 격자 셀 찾기 (크롤링한 산불 마커를 시뮬레이션 발화 지점 id로 연결).
+
+Take_a_point.py가 만드는 격자는 0.01° 간격의 규칙 격자이므로 KD-트리 대신 스냅샷의 조밀한 격자점 배열에서
+(행, 열)을 계산으로 바로 찾습니다. 가장 가까운 격자점에 격자가 없으면(바다, 경계 밖 등) 주변
+max_distance_cells 칸 안에서 실제로 있는 가장 가까운 격자를 찾습니다.
+
+    python -m fire_sim.snapping <스냅샷 파일> <마커 JSON> [--output 결과 JSON]
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from .model import get_fuel_score, get_slope_factor, get_soil_moisture_class
+from .snapshot import GridSnapshot
+
+DEFAULT_MAX_DISTANCE_CELLS = 3
+
+# 코드 컬럼 → (계수 이름, 계수 함수). Grid의 fuel_score/slope_factor/soil_class와 같은 값입니다.
+FACTOR_COLUMNS = {
+    "imsangdo_frtp_cd": ("fuel_score", get_fuel_score),
+    "soil_tpgrp_tpcd": ("slope_factor", get_slope_factor),
+    "soil_sltp_cd": ("soil_class", get_soil_moisture_class),
+}
+
+class CellIndex:
+    """
+    스냅샷(메모리 매핑) 위의 최근접 격자 셀 색인. 만들 때 계수 사전표만 계산하므로 생성 비용이 거의 없습니다.
+    """
+
+    def __init__(self, snapshot, max_distance_cells=DEFAULT_MAX_DISTANCE_CELLS):
+        self.snapshot = snapshot
+        self.max_distance_cells = max_distance_cells
+        self.ids = snapshot.columns["id"]
+        r = np.arange(-max_distance_cells, max_distance_cells + 1)
+        self.offsets = np.stack(np.meshgrid(r, r, indexing="ij"), axis=-1).reshape(-1, 2)
+        self.factors = {
+            name: (factor, np.array([func(value) for value in snapshot.dictionaries[name]]))
+            for name, (factor, func) in FACTOR_COLUMNS.items() if name in snapshot.dictionaries
+        }
+
+    def lookup(self, lat, lng):
+        """
+        위경도 배열에 가장 가까운 격자의 스냅샷 배열 위치. max_distance_cells 안에 격자가 없으면 -1.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lng = np.atleast_1d(np.asarray(lng, dtype=np.float64))
+        snap = self.snapshot
+        row = np.rint((lat - snap.start_lat) / snap.step).astype(np.int64)
+        col = np.rint((lng - snap.start_lng) / snap.step).astype(np.int64)
+        inside = (row >= 0) & (row < snap.n_rows) & (col >= 0) & (col < snap.n_cols)
+        position = np.where(inside, row * snap.n_cols + col, -1)
+        found = inside.copy()
+        found[inside] = self.ids[position[inside]] != 0
+
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            position[missing] = self._search(lat[missing], lng[missing], row[missing], col[missing])
+        return position
+
+    def _search(self, lat, lng, row, col):
+        """
+        주변 (2r+1)x(2r+1) 격자점 중 격자가 있는 가장 가까운 위치 (경도 방향은 위도에 따라 축소한 거리)
+        """
+        snap = self.snapshot
+        rows = row[:, None] + self.offsets[None, :, 0]
+        cols = col[:, None] + self.offsets[None, :, 1]
+        valid = (rows >= 0) & (rows < snap.n_rows) & (cols >= 0) & (cols < snap.n_cols)
+        candidates = np.where(valid, rows * snap.n_cols + cols, 0)
+        valid &= self.ids[candidates] != 0
+
+        d_lat = snap.start_lat + rows * snap.step - lat[:, None]
+        d_lng = (snap.start_lng + cols * snap.step - lng[:, None]) * np.cos(np.radians(lat))[:, None]
+        dist = np.where(valid, d_lat ** 2 + d_lng ** 2, np.inf)
+        best = np.argmin(dist, axis=1)
+        return np.where(valid.any(axis=1), candidates[np.arange(len(best)), best], -1)
+
+    def snap(self, lat, lng):
+        """
+        위경도 배열에 가장 가까운 격자 id 배열. 찾지 못하면 0.
+        """
+        position = self.lookup(lat, lng)
+        return np.where(position >= 0, self.ids[np.maximum(position, 0)], 0)
+
+    def attributes(self, position):
+        """
+        배열 위치의 격자 id, 좌표, 코드 값과 연소 계수 dict
+        """
+        values = {"grid_id": int(self.ids[position])}
+        grid_lat, grid_lng = self.snapshot.coordinates(position)
+        values["grid_lat"] = float(grid_lat)
+        values["grid_lng"] = float(grid_lng)
+        for name, dictionary in self.snapshot.dictionaries.items():
+            code = self.snapshot.columns[name][position]
+            values[name] = dictionary[code]
+            if name in self.factors:
+                factor, table = self.factors[name]
+                values[factor] = table[code].item()
+        return values
+
+def snap_markers(index, markers):
+    """
+    마커 목록({lat, lon, ...})에 가장 가까운 격자의 id와 속성을 더한 새 목록. 격자를 찾지 못하면 grid_id는 None.
+    """
+    if not markers:
+        return []
+    positions = index.lookup([m["lat"] for m in markers], [m["lon"] for m in markers])
+    snapped = []
+    for marker, position in zip(markers, positions.tolist()):
+        extra = index.attributes(position) if position >= 0 else {"grid_id": None}
+        snapped.append({**marker, **extra})
+    return snapped
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="fire_sim.snapping", description="산불 마커를 가장 가까운 격자에 연결")
+    parser.add_argument("snapshot", help="격자 스냅샷 파일 (python -m fire_sim.snapshot으로 생성)")
+    parser.add_argument("markers", help="마커 JSON 파일 (shared_data/fire_markers.json)")
+    parser.add_argument("--output", help="결과 JSON 파일 (지정하지 않으면 표준 출력)")
+    parser.add_argument("--max-distance-cells", type=int, default=DEFAULT_MAX_DISTANCE_CELLS,
+                        help="가장 가까운 격자점에 격자가 없을 때 찾아볼 최대 칸 수")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.markers, encoding="utf-8") as f:
+        markers = json.load(f)
+    start = time.time()
+    index = CellIndex(GridSnapshot.open(args.snapshot), args.max_distance_cells)
+    snapped = snap_markers(index, markers)
+    elapsed = (time.time() - start) * 1000
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(snapped, f, ensure_ascii=False, indent=2)
+        matched = sum(m["grid_id"] is not None for m in snapped)
+        print(f"🌟 마커 {len(snapped)}개 중 {matched}개 격자 연결 완료: {args.output} ({elapsed:.1f}ms)")
+    else:
+        json.dump(snapped, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
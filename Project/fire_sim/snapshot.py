@@ -0,0 +1,246 @@
+"""
+메모리 매핑용 격자 스냅샷 파일.
+
+MySQL 격자 테이블의 좌표와 매핑된 코드 컬럼을 컬럼 단위 이진 파일 하나로 내보냅니다.
+격자는 (행, 열) 격자점 순서의 조밀한 배열로 저장되므로 위경도 → 배열 위치는 계산만으로 구할 수 있고,
+파일을 np.memmap으로 열기 때문에 여러 프로세스가 OS 페이지 캐시를 공유하며 거의 즉시 열 수 있습니다.
+
+파일 구조:
+    MAGIC(8바이트) | 형식 버전(uint32) | 헤더 길이(uint32) | 헤더(JSON, UTF-8) | 정렬된 컬럼 블록들
+    헤더에는 격자 범위/간격, 행/열 수, 격자 지문, 컬럼별 dtype/오프셋, 코드 컬럼 사전이 들어 있습니다.
+
+내보내기:
+    python -m fire_sim.snapshot <스냅샷 파일> [--table korea_grid] [--step 0.01] [--columns 추가 코드 컬럼 ...]
+"""
+import argparse
+import json
+import struct
+import time
+
+import numpy as np
+
+from .grid import Grid, CODE_COLUMNS, DEFAULT_GRID_TABLE, connect_mysql, encode_codes, grid_fingerprint
+
+MAGIC = b"FSGRID\0\0"
+FORMAT_VERSION = 1
+BLOCK_ALIGN = 64
+DEFAULT_STEP = 0.01  # Take_a_point.py의 DEFAULT_STEP과 동일
+PREAMBLE = struct.Struct("<8sII")
+
+def lattice_decimals(step):
+    """
+    Take_a_point.generate_grid_chunks와 같은 좌표 반올림 자릿수
+    """
+    return max(0, -int(np.floor(np.log10(step)))) + 6
+
+def lattice_coordinates(start, step, index):
+    return np.round(start + index * step, lattice_decimals(step))
+
+def _align(offset):
+    return (offset + BLOCK_ALIGN - 1) // BLOCK_ALIGN * BLOCK_ALIGN
+
+class GridSnapshot:
+    """
+    스냅샷 파일을 읽기 전용 메모리 매핑으로 연 객체.
+
+    columns: 컬럼 이름 → 길이 n_rows * n_cols인 배열 (행 우선 격자점 순서, 격자가 없는 위치는 id 0)
+    dictionaries: 코드 컬럼 이름 → 사전 (인덱스 0은 None)
+    """
+
+    def __init__(self, path, header, columns):
+        self.path = path
+        self.header = header
+        self.columns = columns
+        self.dictionaries = header["dictionaries"]
+        self.start_lat, self.end_lat, self.start_lng, self.end_lng = header["bbox"]
+        self.step = header["step"]
+        self.n_rows = header["n_rows"]
+        self.n_cols = header["n_cols"]
+
+    @classmethod
+    def open(cls, path):
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, header_len = PREAMBLE.unpack(bytes(buffer[:PREAMBLE.size]))
+        if magic != MAGIC:
+            raise ValueError(f"격자 스냅샷 파일이 아닙니다: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 형식 버전입니다: {version} (지원: {FORMAT_VERSION})")
+        header = json.loads(bytes(buffer[PREAMBLE.size:PREAMBLE.size + header_len]).decode("utf-8"))
+        data_start = _align(PREAMBLE.size + header_len)
+        size = header["n_rows"] * header["n_cols"]
+        columns = {
+            name: np.frombuffer(buffer, dtype=np.dtype(spec["dtype"]), count=size,
+                                offset=data_start + spec["offset"])
+            for name, spec in header["columns"].items()
+        }
+        return cls(path, header, columns)
+
+    def __len__(self):
+        return self.header["count"]
+
+    def lattice_index(self, lat, lng):
+        """
+        위경도(스칼라 또는 배열)에 가장 가까운 격자점의 배열 위치. 범위를 벗어나면 -1.
+        """
+        row = np.rint((np.asarray(lat, dtype=np.float64) - self.start_lat) / self.step).astype(np.int64)
+        col = np.rint((np.asarray(lng, dtype=np.float64) - self.start_lng) / self.step).astype(np.int64)
+        inside = (row >= 0) & (row < self.n_rows) & (col >= 0) & (col < self.n_cols)
+        return np.where(inside, row * self.n_cols + col, -1)
+
+    def cell(self, row, col):
+        """
+        (행, 열) 격자점의 id와 코드 값 dict. 격자가 없으면 None.
+        """
+        index = row * self.n_cols + col
+        grid_id = int(self.columns["id"][index])
+        if grid_id == 0:
+            return None
+        values = {"id": grid_id, "lat": float(self.columns["lat"][index]), "lng": float(self.columns["lng"][index])}
+        for name, dictionary in self.dictionaries.items():
+            values[name] = dictionary[self.columns[name][index]]
+        return values
+
+    def coordinates(self, index):
+        """
+        배열 위치의 float64 좌표. 원본 좌표가 격자 계산 값과 같으면 계산으로, 아니면 저장된 원본 값을 사용합니다.
+        """
+        if "lat64" in self.columns:
+            return self.columns["lat64"][index], self.columns["lng64"][index]
+        rows, cols = np.divmod(index, self.n_cols)
+        return (lattice_coordinates(self.start_lat, self.step, rows),
+                lattice_coordinates(self.start_lng, self.step, cols))
+
+    def to_grid(self):
+        """
+        시뮬레이션용 Grid로 변환합니다. 격자점 순서(= id 순서)이므로 MySQL에서 읽은 Grid와 같습니다.
+        """
+        index = np.flatnonzero(self.columns["id"])
+        lat, lng = self.coordinates(index)
+        codes = {name: (np.asarray(self.columns[name][index]), self.dictionaries[name]) for name in CODE_COLUMNS}
+        return Grid.from_encoded(self.columns["id"][index], lat, lng, codes)
+
+def write_snapshot(path, ids, lat, lng, code_columns, step=DEFAULT_STEP, source=None):
+    """
+    격자 배열을 스냅샷 파일로 씁니다.
+
+    ids, lat, lng: 격자 id와 원본 좌표 (float64)
+    code_columns: 코드 컬럼 이름 → 값 목록
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    if len(ids) == 0:
+        raise ValueError("내보낼 격자가 없습니다.")
+    if ids.min() <= 0 or ids.max() > np.iinfo(np.int32).max:
+        raise ValueError("격자 id는 1 이상 int32 범위여야 합니다.")
+
+    start_lat, end_lat = float(lat.min()), float(lat.max())
+    start_lng, end_lng = float(lng.min()), float(lng.max())
+    n_rows = int(round((end_lat - start_lat) / step)) + 1
+    n_cols = int(round((end_lng - start_lng) / step)) + 1
+    rows = np.rint((lat - start_lat) / step).astype(np.int64)
+    cols = np.rint((lng - start_lng) / step).astype(np.int64)
+    if (np.abs(lat - (start_lat + rows * step)) > step / 10).any() or \
+            (np.abs(lng - (start_lng + cols * step)) > step / 10).any():
+        raise ValueError(f"격자 좌표가 간격 {step}의 격자점 위에 있지 않습니다. --step을 확인하세요.")
+    position = rows * n_cols + cols
+    if len(np.unique(position)) != len(position):
+        raise ValueError("같은 격자점에 여러 격자가 있습니다.")
+
+    # 스냅샷은 격자점 순서로 저장되므로 Grid 순서(id 순서)와 같아야 함
+    if (np.diff(ids) <= 0).any() or (np.diff(position) <= 0).any():
+        raise ValueError("격자 id 순서와 격자점(위도 → 경도) 순서가 다릅니다.")
+
+    size = n_rows * n_cols
+    arrays = {}
+    arrays["id"] = np.zeros(size, dtype=np.int32)
+    arrays["id"][position] = ids
+    arrays["lat"] = np.full(size, np.nan, dtype=np.float32)
+    arrays["lat"][position] = lat
+    arrays["lng"] = np.full(size, np.nan, dtype=np.float32)
+    arrays["lng"][position] = lng
+
+    exact = bool(np.array_equal(lattice_coordinates(start_lat, step, rows), lat) and
+                 np.array_equal(lattice_coordinates(start_lng, step, cols), lng))
+    if not exact:
+        # 격자 계산으로 원본 좌표를 복원할 수 없으면 (예: 반복 덧셈으로 만든 격자) 원본 좌표도 저장
+        arrays["lat64"] = np.full(size, np.nan)
+        arrays["lat64"][position] = lat
+        arrays["lng64"] = np.full(size, np.nan)
+        arrays["lng64"][position] = lng
+
+    dictionaries = {}
+    for name, values in code_columns.items():
+        codes, dictionary = encode_codes(values)
+        arrays[name] = np.zeros(size, dtype=codes.dtype)
+        arrays[name][position] = codes
+        dictionaries[name] = dictionary
+
+    columns = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        columns[name] = {"dtype": array.dtype.str, "offset": offset}
+        offset += array.nbytes
+
+    header = {
+        "bbox": [start_lat, end_lat, start_lng, end_lng],
+        "step": step,
+        "n_rows": n_rows,
+        "n_cols": n_cols,
+        "count": int(len(ids)),
+        "exact_coordinates": exact,
+        "fingerprint": grid_fingerprint(ids, lat, lng),
+        "source": source,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "columns": columns,
+        "dictionaries": dictionaries,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _align(PREAMBLE.size + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b"\0" * (data_start + columns[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    return header
+
+def export_snapshot(mysql_conn, path, table=DEFAULT_GRID_TABLE, step=DEFAULT_STEP, extra_columns=()):
+    """
+    MySQL 격자 테이블을 스냅샷 파일로 내보냅니다. 시뮬레이션 코드 컬럼 외에 extra_columns도 함께 저장합니다.
+    """
+    code_names = list(CODE_COLUMNS) + [col for col in extra_columns if col not in CODE_COLUMNS]
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT id, lat, lng, {', '.join(code_names)} FROM {table} ORDER BY id;")
+    rows = cursor.fetchall()
+    cursor.close()
+
+    ids = [row[0] for row in rows]
+    lat = [float(row[1]) for row in rows]
+    lng = [float(row[2]) for row in rows]
+    code_columns = {name: [row[3 + i] for row in rows] for i, name in enumerate(code_names)}
+    return write_snapshot(path, ids, lat, lng, code_columns, step, source=table)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="fire_sim.snapshot", description="격자 스냅샷 파일 내보내기")
+    parser.add_argument("output", help="스냅샷 파일 경로")
+    parser.add_argument("--table", default=DEFAULT_GRID_TABLE, help="MySQL 격자 테이블 이름")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP, help="격자 간격 (도 단위, Take_a_point.py --step)")
+    parser.add_argument("--columns", nargs="*", default=[], help="함께 저장할 추가 코드 컬럼")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.time()
+    mysql_conn = connect_mysql()
+    try:
+        header = export_snapshot(mysql_conn, args.output, args.table, args.step, args.columns)
+    finally:
+        mysql_conn.close()
+    print(f"🌟 격자 스냅샷 저장 완료: {args.output} ({header['count']}개 격자, "
+          f"{header['n_rows']}x{header['n_cols']} 격자점, {time.time() - start:.1f}초)")
+
+if __name__ == "__main__":
+    main()
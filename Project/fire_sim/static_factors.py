@@ -0,0 +1,172 @@
+"""
+날씨와 무관한 격자별 확산 계수(정적 계수) 구체화.
+
+populateFuelRatings.js는 fuel_score만 저장하고, 경사 계수와 토양 건조도 가중치는 시뮬레이션마다 이웃 간선마다
+코드 문자열로 다시 계산합니다. 여기서는 격자 전체의 정적 계수(연료 점수, 경사 계수, 토양 분류, 토양 건조도 가중치,
+비가연 여부)를 코드 사전 값마다 한 번씩 계산해 배열로 펼친 뒤, MySQL 테이블 `<격자 테이블>_static_factors`에
+저장합니다. 확산 계산에서는 건조도 요인 = 습도 계수 × soil_multiplier처럼 미리 계산한 값에 실시간 기상 계수만 곱하면 됩니다.
+
+시뮬레이션 테이블(기본 imported_fire_data_auto)의 정적 계수 테이블은 simulationService.js와 Grid.from_mysql이
+격자와 함께 읽습니다. 계수 행에는 계산에 쓴 코드 값도 저장해, 격자 코드가 바뀐 뒤 다시 만들지 않은 행은
+조인되지 않고 코드에서 계산한 값이 쓰이게 합니다. 격자를 다시 가져오면 이 명령을 다시 실행하세요.
+
+--table korea_grid로 korea_grid_static_factors 테이블을 만들어 두면, 매퍼(MySQL격자포인트/grid_writeback.py)가
+청크를 반영할 때마다 바뀐 격자의 계수도 함께 다시 계산합니다.
+
+    python -m fire_sim.static_factors [--table 격자 테이블 | --snapshot 스냅샷 --table 저장할 격자 테이블]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .grid import Grid, GRID_COLUMNS, CODE_COLUMNS, DEFAULT_GRID_TABLE, connect_mysql, load_grid
+from .model import SOIL_NON_BURNABLE
+
+STATIC_FACTOR_COLUMNS = ("fuel_score", "slope_factor", "soil_class", "soil_multiplier", "non_burnable")
+# Grid 배열로 읽어 들이는 계수 (non_burnable은 다른 계수에서 정해짐)
+GRID_FACTOR_COLUMNS = STATIC_FACTOR_COLUMNS[:4]
+INSERT_CHUNK_SIZE = 20_000
+
+def static_factor_table(source_table):
+    return f"{source_table}_static_factors"
+
+def compute_static_factors(grid):
+    """
+    격자별 정적 계수 배열 dict. non_burnable은 연료 점수가 0이거나 비가연성 토양인 격자입니다.
+    (JS에서 연료 점수 0인 이웃은 건너뛰고, 비가연성 토양은 건조도 요인이 0이 되어 확산하지 않습니다.)
+    """
+    return {
+        "fuel_score": grid.fuel_score.astype(np.uint8),
+        "slope_factor": grid.slope_factor,
+        "soil_class": grid.soil_class,
+        "soil_multiplier": grid.soil_multiplier,
+        "non_burnable": (grid.fuel_score == 0) | (grid.soil_class == SOIL_NON_BURNABLE),
+    }
+
+def _ensure_table(cursor, table):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            grid_id INT PRIMARY KEY,
+            fuel_score TINYINT UNSIGNED NOT NULL,
+            slope_factor DOUBLE NOT NULL,
+            soil_class TINYINT UNSIGNED NOT NULL,
+            soil_multiplier DOUBLE NOT NULL,
+            non_burnable TINYINT(1) NOT NULL,
+            imsangdo_frtp_cd VARCHAR(64) NULL,
+            soil_tpgrp_tpcd VARCHAR(64) NULL,
+            soil_sltp_cd VARCHAR(64) NULL
+        ) ENGINE=InnoDB;
+    """)
+
+def _factor_rows(grid, factors):
+    columns = [factors[name].tolist() for name in STATIC_FACTOR_COLUMNS]
+    codes = [[None if value is None else str(value) for value in grid.code_values(name)] for name in CODE_COLUMNS]
+    return list(zip(grid.ids.tolist(), *columns, *codes))
+
+def _insert_rows(cursor, table, rows, verb="INSERT"):
+    columns = ("grid_id",) + STATIC_FACTOR_COLUMNS + CODE_COLUMNS
+    placeholders = ", ".join(["%s"] * len(columns))
+    query = f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({placeholders});"
+    for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+        cursor.executemany(query, rows[i:i + INSERT_CHUNK_SIZE])
+
+def write_static_factor_table(mysql_conn, grid, factors, table):
+    """
+    정적 계수 테이블을 새로 만들고 격자 전체 값을 채웁니다. (이전 형식의 테이블도 현재 형식으로 바뀝니다.)
+    """
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {table};")
+        _ensure_table(cursor, table)
+        _insert_rows(cursor, table, _factor_rows(grid, factors))
+        mysql_conn.commit()
+    finally:
+        cursor.close()
+
+def static_factor_table_exists(mysql_conn, source_table="korea_grid"):
+    """
+    source_table의 정적 계수 테이블이 현재 형식(계산에 쓴 코드 컬럼 포함)으로 있는지 확인합니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s;
+    """, (static_factor_table(source_table), CODE_COLUMNS[-1]))
+    exists = cursor.fetchone()[0] > 0
+    cursor.close()
+    return exists
+
+def static_factor_join(source_table):
+    """
+    격자 테이블 g에 정적 계수 f를 붙이는 LEFT JOIN 절. 계산에 쓴 코드가 현재 격자 코드와 다른 행은 붙지 않습니다(NULL).
+    """
+    conditions = " AND ".join(f"f.{col} <=> g.{col}" for col in CODE_COLUMNS)
+    return f"LEFT JOIN {static_factor_table(source_table)} f ON f.grid_id = g.id AND {conditions}"
+
+def read_grid_with_static_factors(mysql_conn, source_table=DEFAULT_GRID_TABLE):
+    """
+    격자 테이블과 정적 계수 테이블을 함께 읽어 Grid를 만듭니다. 계수가 있는 격자는 테이블 값을,
+    없거나 코드가 바뀐 격자는 코드에서 계산한 값을 씁니다.
+    """
+    cursor = mysql_conn.cursor()
+    cursor.execute(f"SELECT {', '.join('g.' + col for col in GRID_COLUMNS)}, "
+                   f"{', '.join('f.' + col for col in GRID_FACTOR_COLUMNS)} "
+                   f"FROM {source_table} g {static_factor_join(source_table)};")
+    rows = cursor.fetchall()
+    cursor.close()
+
+    n = len(GRID_COLUMNS)
+    grid = Grid.from_rows([row[:n] for row in rows])
+    stored = np.array([row[n] is not None for row in rows], dtype=bool)
+    if stored.any():
+        for i, name in enumerate(GRID_FACTOR_COLUMNS, start=n):
+            computed = getattr(grid, name)
+            values = np.array([row[i] if row[i] is not None else 0 for row in rows], dtype=computed.dtype)
+            setattr(grid, name, np.where(stored, values, computed))
+    return grid
+
+def refresh_static_factors_for_ids(mysql_conn, id_table, source_table="korea_grid"):
+    """
+    id_table(id 컬럼을 가진 테이블, 예: 매핑 스테이징 테이블)에 있는 격자의 정적 계수만 다시 계산해 반영합니다.
+    매퍼가 청크를 반영할 때마다 호출하며, commit은 호출한 쪽에서 합니다.
+    """
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join('g.' + col for col in GRID_COLUMNS)} "
+                       f"FROM {source_table} g JOIN {id_table} s ON g.id = s.id;")
+        grid = Grid.from_rows(cursor.fetchall())
+        if len(grid):
+            _insert_rows(cursor, static_factor_table(source_table),
+                         _factor_rows(grid, compute_static_factors(grid)), verb="REPLACE")
+    finally:
+        cursor.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="fire_sim.static_factors", description="격자 정적 확산 계수 구체화")
+    parser.add_argument("--grid-json", help="격자 행 목록 JSON 파일")
+    parser.add_argument("--table", default=DEFAULT_GRID_TABLE, help="MySQL 격자 테이블 이름")
+    parser.add_argument("--snapshot", help="격자 스냅샷 파일 (python -m fire_sim.snapshot으로 생성)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.time()
+    grid = load_grid(args.grid_json, args.table, args.snapshot)
+    print(f"격자 {len(grid)}개 로드 ({time.time() - start:.1f}초)")
+
+    start = time.time()
+    factors = compute_static_factors(grid)
+    print(f"정적 계수 계산 완료 (비가연 격자 {int(factors['non_burnable'].sum())}개, {time.time() - start:.2f}초)")
+
+    table = static_factor_table(args.table)
+    start = time.time()
+    mysql_conn = connect_mysql()
+    try:
+        write_static_factor_table(mysql_conn, grid, factors, table)
+    finally:
+        mysql_conn.close()
+    print(f"🌟 정적 계수 테이블 저장 완료: {table} ({time.time() - start:.1f}초)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+확산 결과의 점진적 스트리밍 출력.
+
+이벤트 루프가 진행되어 시뮬레이션 시각이 10분 구간을 넘을 때마다 그 구간까지 발화한 지점과
+갱신된 경계를 한 묶음으로 내보냅니다. 소비자는 첫 구간을 바로 그릴 수 있고, 반복을 멈추면 시뮬레이션도 멈춥니다.
+결과 전체를 모아 두지 않으므로 큰 산불에서도 메모리 사용량이 격자 크기 이상으로 늘지 않습니다.
+
+NDJSON 한 줄 형식:
+    {"type": "batch", "time": 600, "cells": [{"id", "ignitionTime", "burnoutTime"}, ...],
+     "ignitedCount": 누적 발화 지점 수, "boundary": GeoJSON geometry 또는 null(이전 묶음과 같음)}
+    {"type": "done", "ignitedCount": ..., "maxIgnitionTime": ...}
+"""
+import json
+
+import numpy as np
+
+from .engine import iter_spread
+from .isochrones import DEFAULT_TIME_STEP, IncrementalConvexBoundary
+from .model import MAX_SIMULATION_TIME
+
+def _batch_event(grid, step_time, batch, ignited_count, boundary):
+    cells = [
+        {"id": int(grid.ids[index]), "ignitionTime": ignited_at, "burnoutTime": burnout_at}
+        for index, ignited_at, burnout_at in batch
+    ]
+    event = {"type": "batch", "time": step_time, "cells": cells, "ignitedCount": ignited_count, "boundary": None}
+    if boundary is not None and batch:
+        index = np.array([item[0] for item in batch])
+        event["boundary"] = boundary.add(np.column_stack([grid.lng[index], grid.lat[index]]))
+    return event
+
+def stream_spread(grid, ignition_id, weather=None, neighbors=None, time_step=DEFAULT_TIME_STEP,
+                  boundaries=True, max_time=MAX_SIMULATION_TIME):
+    """
+    시간 순서의 묶음 이벤트(dict)를 yield 하는 제너레이터. 구간은 0초부터 time_step 간격이며
+    마지막 발화 시각과 max_time 중 큰 값까지 이어집니다. (JS timeBoundaries와 같은 구간,
+    마지막 구간 뒤에 발화한 지점이 있으면 한 구간을 더 내보냄)
+    boundaries가 참이면 각 묶음에 볼록 껍질 경계를 점진적으로 갱신해 넣습니다.
+    """
+    boundary = IncrementalConvexBoundary() if boundaries else None
+    batch = []
+    step_time = 0
+    ignited_count = 0
+    last_time = 0.0
+
+    for index, ignited_at, burnout_at in iter_spread(grid, ignition_id, weather, neighbors, max_time):
+        # 꺼낸 지점의 발화 시각이 구간을 넘었다면, 그 구간까지의 발화 지점은 모두 확정됨
+        while ignited_at > step_time:
+            yield _batch_event(grid, step_time, batch, ignited_count, boundary)
+            batch = []
+            step_time += time_step
+        batch.append((index, ignited_at, burnout_at))
+        ignited_count += 1
+        last_time = ignited_at
+
+    # 마지막 구간 경계를 넘는 발화 지점이 남아 있으면 다음 구간 묶음으로 마저 내보냄
+    end_time = max(last_time, max_time)
+    while step_time <= end_time or batch:
+        yield _batch_event(grid, step_time, batch, ignited_count, boundary)
+        batch = []
+        step_time += time_step
+    yield {"type": "done", "ignitedCount": ignited_count, "maxIgnitionTime": last_time}
+
+def write_ndjson(events, file):
+    """
+    이벤트를 한 줄에 하나씩 JSON으로 쓰고 줄마다 flush 합니다.
+    """
+    for event in events:
+        file.write(json.dumps(event, ensure_ascii=False))
+        file.write("\n")
+        file.flush()
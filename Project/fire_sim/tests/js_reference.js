@@ -0,0 +1,251 @@
+// fixtures/js_spread_results.json을 만든 JS 기준 구현입니다.
+// backend/services/simulationService.js의 모델 함수와 이벤트 큐 루프를 그대로 옮기고, @turf/turf의
+// distance/bearing만 같은 공식으로 옮겨 적어 backend 의존성(turf, Firebase, MySQL) 없이 node로 실행합니다.
+// simulationService.js의 모델이나 루프를 바꾸면 이 파일도 같이 고치고 기준 결과를 다시 만드세요.
+//
+//     node js_reference.js fixtures/grid.json <발화 지점 ID> <습도> <풍속> <풍향>  > 결과 JSON (발화한 격자 목록)
+
+// 루프 안의 진행 로그는 출력하지 않음 (표준 출력에는 결과 JSON만)
+const console={log(){}};
+const turf={
+ distance(a,b){const R=6371008.8/1000;const d2r=d=>(d%360)*Math.PI/180;
+  const dLat=d2r(b[1]-a[1]),dLon=d2r(b[0]-a[0]);const l1=d2r(a[1]),l2=d2r(b[1]);
+  const x=Math.pow(Math.sin(dLat/2),2)+Math.pow(Math.sin(dLon/2),2)*Math.cos(l1)*Math.cos(l2);
+  return R*(2*Math.atan2(Math.sqrt(x),Math.sqrt(1-x)));},
+ bearing(a,b){const d2r=d=>(d%360)*Math.PI/180;const lon1=d2r(a[0]),lon2=d2r(b[0]),lat1=d2r(a[1]),lat2=d2r(b[1]);
+  const A=Math.sin(lon2-lon1)*Math.cos(lat2);const B=Math.cos(lat1)*Math.sin(lat2)-Math.sin(lat1)*Math.cos(lat2)*Math.cos(lon2-lon1);
+  return ((Math.atan2(A,B))%(2*Math.PI))*180/Math.PI;}
+};
+const FIREBREAK_DISTANCE_KM = 1.5; // 이 거리 이상은 '방지턱'으로 간주
+const STRONG_WIND_MS = 10;         // 이 풍속 이상은 방지턱을 넘을 수 있는 '강풍'
+const ONE_GRID_UNIT_KM = 1.2;      // 격자 한 칸의 기준 거리
+
+// --- 모델 계산 함수들 ---
+
+/**
+ * 임상도 코드를 기반으로 연료량 점수를 반환합니다.
+ * 이 점수는 확산 속도와 연소 시간의 기본값이 됩니다.
+ * @param {string} imsangdoCode - 임상도임종코드 (예: '1'은 침엽수림)
+ * @returns {number} 연료량 점수 (높을수록 가연성이 높음)
+ */
+const getFuelScore = (imsangdoCode) => imsangdoCode ? ({'1':5,'3':4,'2':3,'4':2}[imsangdoCode] ?? 0) : 0;
+
+
+/**
+ * 토양지형그룹코드를 기반으로 경사도 요인을 반환합니다.
+ * 오르막에서는 가중치를, 내리막에서는 페널티를 부여합니다.
+ * @param {string} code1 - 토양지형그룹코드
+ * @returns {number} 경사도에 따른 확산 계수
+ */
+const getSlopeFactor = (code1) => {
+    if(!code1) return 1.0;
+    return {'01':1.5,'02':1.5,'03':1.5,'08':1.5,'12':1.5,'04':0.8,'05':0.8,'06':0.8,'07':0.8,'11':0.8,'10':0.5}[code1] ?? 1.0;
+}
+
+/**
+ * 습도에 따른 건조도 기본 계수를 반환합니다. (페널티 포함)
+ * @param {number} humidity - 현재 습도 (%)
+ * @returns {number} 습도 계수
+ */
+const getHumidityFactor = (humidity) => {
+    if (humidity < 35) return 1.5;
+    if (humidity < 50) return 1.2;
+    if (humidity > 80) return 0.4;
+    if (humidity > 70) return 0.6;
+    return 1.0;
+}
+
+/**
+ * 토양배수등급코드에 따른 건조도 가중치를 반환합니다. 날씨와 무관하므로 격자마다 한 번만 계산합니다.
+ * @param {string} soilCode - 토양배수등급코드
+ * @returns {number} 습도 계수에 곱할 가중치
+ */
+const getSoilMultiplier = (soilCode) => {
+    if(!soilCode) return 1.0;
+
+    // 토양 배수 등급(건조도)에 따른 가중치 적용
+    if (['01','02','05','06','07','08','09','10','11','13','14','15','16','17','18','19','23','24'].includes(soilCode)) return 1.2;
+    if (['03','12','20'].includes(soilCode)) return 0.8;
+    // 물, 시가지 등 비가연성 지역에서는 확산 계수를 0으로 만듦
+    if (['82','91','92','93','94','95','97','99','27','28','29'].includes(soilCode)) return 0;
+    return 1.0;
+}
+
+/**
+ * 피해도(연소 시간)를 계산합니다.
+ * 기본 연소 시간은 연료량에 비례하지만, 습도나 비화(Spotting) 거리에 따라 페널티를 받습니다.
+ * @param {number} fuelScore - 연료량 점수
+ * @param {number} humidity - 현재 습도 (%)
+ * @param {number} [distance=0] - 이전 지점으로부터의 거리 (km)
+ * @returns {number} 최종 연소 지속 시간 (초)
+ */
+const getBurnoutDuration = (fuelScore, humidity, distance = 0) => {
+    let baseDuration = fuelScore * 1200; 
+
+    // 습도 페널티: 습도가 높을수록 연소 시간이 짧아짐
+    if (humidity > 80) {
+        baseDuration *= 0.5;
+    } else if (humidity > 70) {
+        baseDuration *= 0.7;
+    }
+
+    // 거리 페널티: 먼 거리를 건너뛴 불씨는 오래 타지 못함
+    const jumpUnits = distance / ONE_GRID_UNIT_KM;
+    if (jumpUnits >= 2) {
+        const distancePenaltyFactor = Math.max(1, jumpUnits - 1);
+        baseDuration /= distancePenaltyFactor;
+        console.log(`   -> ${jumpUnits.toFixed(1)}칸(${distance.toFixed(2)}km) 비화 발생! 연소 시간 페널티 적용.`);
+    }
+
+    return baseDuration;
+}
+
+/**
+ * 풍향/풍속과 산불 진행 방향의 관계를 계산하여 바람 요인을 반환합니다.
+ * 순풍일 때 가장 큰 가속도를 얻습니다.
+ * @param {number} windSpeed - 풍속 (m/s)
+ * @param {number} windDirection - 풍향 (도)
+ * @param {number} bearing - 산불 진행 방향 (도)
+ * @returns {number} 바람에 따른 확산 계수
+ */
+const getWindFactor = (windSpeed, windDirection, bearing) => {
+    const angleDiff = Math.abs((windDirection - bearing + 180) % 360 - 180);
+    let factor = 1.0;
+    if (angleDiff < 45) factor += (windSpeed / 4);
+    else if (angleDiff < 90) factor += (windSpeed / 8);
+    return Math.max(0.5, factor);
+}
+
+/**
+ * 우선순위 큐 클래스. 시뮬레이션에서 다음 이벤트를 효율적으로 관리합니다.
+ */
+class PriorityQueue {
+    constructor() { this.elements = []; }
+    enqueue(element, priority) { this.elements.push({ element, priority }); this.sort(); }
+    dequeue() { return this.elements.shift().element; }
+    sort() { this.elements.sort((a, b) => a.priority - b.priority); }
+    isEmpty() { return this.elements.length === 0; }
+}
+
+/**
+ * 특정 지점에서 가장 가까운 8개의 이웃 후보 지점을 찾습니다.
+ * @param {object} currentPoint - 현재 지점 객체
+ * @param {Array<object>} allPoints - 모든 지점 데이터 배열
+ * @returns {Array<number>} 이웃 지점의 ID 배열
+ */
+const findNeighbors = (currentPoint, allPoints) => {
+    const searchRadius = 0.03;
+    const [lon, lat] = currentPoint.coordinates;
+    const candidates = allPoints
+        .filter(p => p.id !== currentPoint.id && p.lat > lat - searchRadius && p.lat < lat + searchRadius && p.lng > lon - searchRadius && p.lng < lon + searchRadius)
+        .map(p => ({ point: p, dist: turf.distance(currentPoint.coordinates, p.coordinates) }))
+        .filter(item => item.dist > 0 && item.dist < 5.0)
+        .sort((a, b) => a.dist - b.dist);
+    return candidates.slice(0, 8).map(item => item.point.id);
+}
+
+// --- 실행: 격자 JSON과 발화 지점/기상을 인자로 받아 simulationService.js와 같은 루프 실행 ---
+const [,,file,idS,hS,wsS,wdS]=process.argv;
+const rows=JSON.parse(require('fs').readFileSync(file));
+// loadGridPoints (정적 계수 테이블이 없을 때처럼 코드에서 계산)
+const allPoints = rows.map(row => ({
+    ...row,
+    coordinates: [parseFloat(row.lng), parseFloat(row.lat)],
+    fuelScore: getFuelScore(row.imsangdo_frtp_cd),
+    slopeFactor: getSlopeFactor(row.soil_tpgrp_tpcd),
+    soilMultiplier: getSoilMultiplier(row.soil_sltp_cd),
+}));
+const pointMap = new Map(allPoints.map(p => [p.id, p]));
+const ignition_id=+idS; const ignitionPoint=pointMap.get(ignition_id);
+const humidity=+hS, windSpeed=+wsS, windDirection=+wdS;
+        const simResults = new Map();
+        allPoints.forEach(p => simResults.set(p.id, { ignitionTime: null, burnoutTime: null }));
+        const eventQueue = new PriorityQueue(); // 이벤트 큐 생성
+        const initialIgnitionResult = simResults.get(ignition_id);
+        initialIgnitionResult.ignitionTime = 0;
+        initialIgnitionResult.burnoutTime = getBurnoutDuration(ignitionPoint.fuelScore, humidity);
+        const humidityFactor = getHumidityFactor(humidity); // 건조도 요인 = 습도 계수 × 격자별 토양 가중치
+        eventQueue.enqueue(ignition_id, 0); // 최초 발화 이벤트를 큐에 추가
+        
+        // 4. 시뮬레이션 루프 실행 (이벤트 큐가 빌 때까지)
+        console.log(` -> 시뮬레이션 루프 시작...`);
+        while (!eventQueue.isEmpty()) {
+            const currentPointId = eventQueue.dequeue();
+            const currentPoint = pointMap.get(currentPointId);
+            const currentResult = simResults.get(currentPointId);
+            
+            console.log(`Processing point: ${currentPointId}, ignitionTime: ${currentResult.ignitionTime}`); // Added log
+
+            if (currentResult.ignitionTime > 7 * 3600) { // Changed from 12 * 3600 to 7 * 3600
+                console.log(`Point ${currentPointId} exceeded max simulation time (7 hours). Skipping.`); // Updated log message
+                continue;
+            }
+
+            const neighborIds = findNeighbors(currentPoint, allPoints);
+
+            for (const neighborId of neighborIds) {
+                const neighbor = pointMap.get(neighborId);
+                const neighborResult = simResults.get(neighborId);
+
+                if (neighborResult.ignitionTime != null) {
+                    // console.log(`Neighbor ${neighborId} already ignited. Skipping.`); // Optional: too verbose
+                    continue; 
+                }
+
+                // 4-1. 이웃 지점의 물리적 특성 계산
+                const fuelScore = neighbor.fuelScore;
+                if (fuelScore === 0) {
+                    console.log(`Neighbor ${neighborId} has no fuel (fuelScore: 0). Skipping.`); // Added log
+                    continue; 
+                }
+
+                const distance = turf.distance(currentPoint.coordinates, neighbor.coordinates);
+                
+                // 4-2. 방지턱 및 비화 규칙 적용
+                if (distance > FIREBREAK_DISTANCE_KM && windSpeed < STRONG_WIND_MS) {
+                    console.log(`Neighbor ${neighborId} skipped due to firebreak (distance: ${distance.toFixed(2)}km, windSpeed: ${windSpeed}m/s).`); // Added log
+                    continue; 
+                }
+
+                const bearing = turf.bearing(currentPoint.coordinates, neighbor.coordinates);
+                let slopeFactor = neighbor.slopeFactor;
+                let moistureFactor = humidityFactor * neighbor.soilMultiplier;
+                const windFactor = getWindFactor(windSpeed, windDirection, bearing);
+
+                // 비화 시 페널티 적용
+                if (distance > FIREBREAK_DISTANCE_KM) {
+                    console.log(`Applying spotting penalty for neighbor ${neighborId} (distance: ${distance.toFixed(2)}km).`); // Added log
+                    slopeFactor = Math.pow(slopeFactor, 0.5); 
+                    moistureFactor = Math.pow(moistureFactor, 0.5);
+                }
+
+                // 4-3. 최종 확산 속도(ROS) 및 시간 계산
+                const rosScore = fuelScore * slopeFactor * moistureFactor * windFactor;
+                console.log(`Neighbor ${neighborId} - Fuel: ${fuelScore}, Slope: ${slopeFactor.toFixed(2)}, Moisture: ${moistureFactor.toFixed(2)}, Wind: ${windFactor.toFixed(2)}, ROS: ${rosScore.toFixed(2)}`); // Added log
+
+                if (rosScore < 1) { // Changed from rosScore < 2 to rosScore < 1
+                    console.log(`Neighbor ${neighborId} has low ROS (${rosScore.toFixed(2)}). Skipping.`); // Added log
+                    continue;
+                }
+
+                const timeToTravel = (distance * 3600) / rosScore; // distance in km, ROS in km/hr -> time in seconds
+                const newIgnitionTime = currentResult.ignitionTime + timeToTravel;
+                
+                console.log(`Neighbor ${neighborId} - Distance: ${distance.toFixed(2)}km, TimeToTravel: ${timeToTravel.toFixed(2)}s, NewIgnitionTime: ${newIgnitionTime.toFixed(2)}s`); // Added log
+
+
+                // 4-4. 이웃 지점 발화 정보 업데이트 및 이벤트 큐에 추가
+                if (newIgnitionTime < (neighborResult.ignitionTime ?? Infinity)) {
+                    console.log(`Igniting neighbor ${neighborId} at ${newIgnitionTime.toFixed(2)}s.`); // Added log
+                    neighborResult.ignitionTime = newIgnitionTime;
+                    neighborResult.burnoutTime = newIgnitionTime + getBurnoutDuration(fuelScore, humidity, distance);
+                    eventQueue.enqueue(neighborId, newIgnitionTime);
+                } else {
+                    console.log(`Neighbor ${neighborId} not ignited. NewTime (${newIgnitionTime.toFixed(2)}) vs ExistingTime (${neighborResult.ignitionTime ?? 'Infinity'})`); // Added log
+                }
+            }
+        }
+        
+// 발화한 격자만 격자 순서대로 출력 (SpreadResult.to_records와 같은 형식)
+const out=allPoints.filter(p=>simResults.get(p.id).ignitionTime!==null).map(p=>({id:p.id,...simResults.get(p.id)}));
+process.stdout.write(JSON.stringify(out));
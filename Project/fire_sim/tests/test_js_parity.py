@@ -0,0 +1,38 @@
+"""
+fire_sim.run_spread 결과가 simulationService.js와 같은지 확인합니다.
+
+fixtures/grid.json: 24 x 24 격자(간격 0.01도). 빈 격자가 섞여 있고 한쪽 구역은 두 칸 간격이라 방지턱/비화 경로가 생깁니다.
+fixtures/js_spread_results.json: 발화 지점/기상별 JS 결과 (node js_reference.js로 생성)
+
+    python -m pytest fire_sim/tests
+"""
+import json
+import os
+
+import pytest
+
+from fire_sim import Grid, Weather, run_spread
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TOLERANCE_SEC = 1e-6
+
+def _load_json(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+JS_CASES = _load_json("js_spread_results.json")
+
+@pytest.fixture(scope="module")
+def grid():
+    return Grid.from_json(os.path.join(FIXTURE_DIR, "grid.json"))
+
+@pytest.mark.parametrize("case", JS_CASES, ids=lambda case: "{ignition_id}-{humidity}-{wind_speed}-{wind_direction}".format(**case))
+def test_run_spread_matches_js(grid, case):
+    weather = Weather(humidity=case["humidity"], wind_speed=case["wind_speed"], wind_direction=case["wind_direction"])
+    records = run_spread(grid, case["ignition_id"], weather).to_records()
+    expected = case["records"]
+
+    assert [r["id"] for r in records] == [r["id"] for r in expected]
+    for actual, js in zip(records, expected):
+        assert actual["ignitionTime"] == pytest.approx(js["ignitionTime"], abs=TOLERANCE_SEC), actual["id"]
+        assert actual["burnoutTime"] == pytest.approx(js["burnoutTime"], abs=TOLERANCE_SEC), actual["id"]
@@ -0,0 +1,103 @@
+"""
+fire_sim.run_raster_spread가 8방향 격자점 그래프 위의 가장 이른 도달 시각을 구하는지 확인합니다.
+
+기준값은 같은 RasterLattice.travel_times 위에서 heapq로 돌린 다익스트라입니다. (max_time보다 늦게 발화한 격자점은 확산시키지 않음)
+격자는 test_js_parity.py와 같은 fixtures/grid.json이고, 발화 지점/기상도 JS 비교 사례를 그대로 씁니다.
+
+    python -m pytest fire_sim/tests
+"""
+import heapq
+import json
+import os
+
+import numpy as np
+import pytest
+
+from fire_sim import CellWeather, Grid, RasterLattice, Weather, run_raster_spread
+from fire_sim.model import MAX_SIMULATION_TIME
+from fire_sim.raster_engine import SHIFTS, get_burnout_durations
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TOLERANCE_SEC = 1e-6
+
+with open(os.path.join(FIXTURE_DIR, "js_spread_results.json"), encoding="utf-8") as f:
+    CASES = [(case["ignition_id"], Weather(humidity=case["humidity"], wind_speed=case["wind_speed"],
+                                           wind_direction=case["wind_direction"])) for case in json.load(f)]
+
+@pytest.fixture(scope="module")
+def grid():
+    return Grid.from_json(os.path.join(FIXTURE_DIR, "grid.json"))
+
+@pytest.fixture(scope="module")
+def lattice(grid):
+    return RasterLattice(grid)
+
+def dijkstra_spread(grid, lattice, ignition_id, weather, max_time):
+    """
+    격자 순서의 (발화 시각, 연소 종료 시각) 기준값. 도달하지 못한 격자는 nan입니다.
+    """
+    travel = lattice.travel_times(weather)
+    start = grid.index_of(ignition_id)
+    source = (int(lattice.rows[start]), int(lattice.cols[start]))
+    arrival = {source: 0.0}
+    hop_distance = {source: 0.0}
+    done = set()
+    queue = [(0.0, source)]
+    while queue:
+        time, (row, col) = heapq.heappop(queue)
+        if (row, col) in done:
+            continue
+        done.add((row, col))
+        if time > max_time:
+            continue
+        for k, (dr, dc) in enumerate(SHIFTS):
+            candidate = time + travel[k][row, col]
+            target = (row + dr, col + dc)
+            if candidate < arrival.get(target, np.inf):
+                arrival[target] = candidate
+                hop_distance[target] = float(lattice.distance[k][row, 0])
+                heapq.heappush(queue, (candidate, target))
+
+    ignition_time = np.full(len(grid), np.nan)
+    distance = np.zeros(len(grid))
+    for i, cell in enumerate(zip(lattice.rows.tolist(), lattice.cols.tolist())):
+        if cell in arrival:
+            ignition_time[i] = arrival[cell]
+            distance[i] = hop_distance[cell]
+    humidity = np.broadcast_to(np.asarray(weather.humidity, dtype=np.float64), len(grid))
+    burnout_time = ignition_time + get_burnout_durations(grid.fuel_score, humidity, distance)
+    return ignition_time, burnout_time
+
+def assert_matches_dijkstra(grid, lattice, ignition_id, weather, max_time, time_step):
+    result = run_raster_spread(grid, ignition_id, weather, lattice=lattice, max_time=max_time, time_step=time_step)
+    ignition_time, burnout_time = dijkstra_spread(grid, lattice, ignition_id, weather, max_time)
+
+    np.testing.assert_array_equal(np.isnan(result.ignition_time), np.isnan(ignition_time))
+    np.testing.assert_allclose(result.ignition_time, ignition_time, rtol=0, atol=TOLERANCE_SEC, equal_nan=True)
+    np.testing.assert_allclose(result.burnout_time, burnout_time, rtol=0, atol=TOLERANCE_SEC, equal_nan=True)
+
+def case_id(case):
+    ignition_id, weather = case
+    return f"{ignition_id}-{weather.humidity}-{weather.wind_speed}-{weather.wind_direction}"
+
+@pytest.mark.parametrize("time_step", [60, 600, 3600])
+@pytest.mark.parametrize("case", CASES, ids=case_id)
+def test_raster_matches_dijkstra(grid, lattice, case, time_step):
+    ignition_id, weather = case
+    assert_matches_dijkstra(grid, lattice, ignition_id, weather, max_time=MAX_SIMULATION_TIME, time_step=time_step)
+
+@pytest.mark.parametrize("max_time", [1800, 3 * 3600])
+def test_raster_matches_dijkstra_with_max_time(grid, lattice, max_time):
+    ignition_id, weather = CASES[1]
+    assert_matches_dijkstra(grid, lattice, ignition_id, weather, max_time=max_time, time_step=600)
+
+def test_raster_matches_dijkstra_with_cell_weather(grid, lattice):
+    rng = np.random.default_rng(25)
+    n = len(grid)
+    weather = CellWeather(
+        humidity=rng.uniform(20, 90, n),
+        wind_speed=rng.uniform(0, 15, n),
+        wind_direction=rng.uniform(0, 360, n),
+    )
+    ignition_id, _ = CASES[0]
+    assert_matches_dijkstra(grid, lattice, ignition_id, weather, max_time=MAX_SIMULATION_TIME, time_step=600)
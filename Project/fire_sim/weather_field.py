@@ -0,0 +1,197 @@
+"""
+산악기상 관측소 값으로 만드는 격자별 기상장(습도, 풍속, 풍향).
+
+simulationService.js는 발화 지점에서 가장 가까운 관측소 하나의 값을 화재 전체에 씁니다. 여기서는 관측소 목록이
+정해지면 격자마다 가까운 관측소 k개와 역거리 가중치(1/d^power)를 한 번만 계산해 두고(격자 x k 희소 가중치 행렬),
+기상 값이 갱신될 때마다 습도와 바람 벡터(u, v) 각각을 희소 행렬-벡터 곱 한 번으로 격자 전체에 보간합니다.
+결과(CellWeather)는 다음 갱신 전까지 캐시되어 시뮬레이션마다 그대로 재사용됩니다.
+
+관측 값은 Firebase weatherdata 노드(updateFirebaseWeather.js)를 내려받은 JSON과 같은 형식입니다.
+    {"1890": {"hm2m": 45.2, "ws2m": 3.1, "wd2m": 270, ...}, ...}
+
+    python -m fire_sim.weather_field <관측 JSON> [--snapshot 스냅샷] [--ignition-id 격자 ID]
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from .engine import Weather, CellWeather
+from .grid import DEFAULT_GRID_TABLE, load_grid
+from .model import haversine_km
+
+DEFAULT_STATIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     "backend", "mountainStations.js")
+DEFAULT_NEAREST_COUNT = 4
+DEFAULT_POWER = 2.0
+# 관측소와 거의 같은 위치의 격자에서 가중치가 무한대가 되지 않도록 하는 최소 거리
+MIN_DISTANCE_KM = 0.1
+# 가까운 관측소 후보를 함께 고르는 타일 크기(도)와 한 번에 처리하는 격자 수
+TILE_DEG = 0.1
+CHUNK_SIZE = 100_000
+
+STATION_PATTERN = re.compile(r"obsid:\s*(\d+).*?latitude:\s*([-\d.]+),\s*longitude:\s*([-\d.]+)")
+
+def load_stations(path=DEFAULT_STATIONS_PATH):
+    """
+    mountainStations.js에서 관측소 (obsid 배열, 위도 배열, 경도 배열)을 읽습니다.
+    """
+    with open(path, encoding="utf-8") as f:
+        matches = STATION_PATTERN.findall(f.read())
+    if not matches:
+        raise ValueError(f"관측소 정보가 없습니다: {path}")
+    obsid, lat, lng = zip(*matches)
+    return np.array(obsid, dtype=np.int64), np.array(lat, dtype=np.float64), np.array(lng, dtype=np.float64)
+
+def load_observations(path):
+    """
+    Firebase weatherdata 형식의 관측 JSON 파일을 {obsid: {hm2m, ws2m, wd2m, ...}} dict로 읽습니다.
+    """
+    with open(path, encoding="utf-8") as f:
+        return {int(obsid): values for obsid, values in json.load(f).items() if values}
+
+def _observed(observations, obsid, key):
+    value = (observations.get(int(obsid)) or {}).get(key)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+class WeatherField:
+    """
+    관측소 → 격자 보간 가중치. 만들 때 한 번만 계산하고, refresh()마다 격자별 기상을 다시 보간합니다.
+
+    사용 예:
+        field = WeatherField(grid, *load_stations())
+        cell_weather = field.refresh(load_observations("weatherdata.json"))
+        result = run_spread(grid, ignition_id, cell_weather)
+    """
+
+    def __init__(self, grid, obsid, lat, lng, nearest_count=DEFAULT_NEAREST_COUNT, power=DEFAULT_POWER):
+        self.grid = grid
+        self.obsid = np.asarray(obsid, dtype=np.int64)
+        self.nearest_count = min(nearest_count, len(self.obsid))
+        self.station_index, self.weights = self._build_weights(np.asarray(lat), np.asarray(lng), power)
+        self.current = None
+        self._current_key = None
+
+    def _build_weights(self, lat, lng, power):
+        """
+        격자마다 가까운 관측소 k개의 (관측소 인덱스, 가중치) 배열. 둘 다 (격자 수, k) 모양입니다.
+
+        후보는 위도에 따라 경도를 축소한 평면 거리로 고릅니다. 격자를 TILE_DEG 타일로 묶고, 타일 중심에서 k번째로
+        가까운 관측소 거리 + 타일 지름 안의 관측소만 후보로 두므로(타일 안 어느 격자든 가까운 k개는 이 안에 있음)
+        격자마다 전체 관측소와의 거리를 계산하지 않습니다. 가중치는 haversine 거리로 계산합니다.
+        """
+        k = self.nearest_count
+        grid = self.grid
+        scale = np.cos(np.radians(lat.mean()))
+
+        tile_rows = np.floor(grid.lat / TILE_DEG).astype(np.int64)
+        tile_cols = np.floor(grid.lng / TILE_DEG).astype(np.int64)
+        tile_cols -= tile_cols.min()
+        n_tile_cols = int(tile_cols.max()) + 1 if len(grid) else 1
+        tiles, tile_of_cell = np.unique(tile_rows * n_tile_cols + tile_cols, return_inverse=True)
+        center_lat = (tiles[:, None] // n_tile_cols + 0.5) * TILE_DEG
+        center_lng = (tiles[:, None] % n_tile_cols + np.floor(grid.lng.min() / TILE_DEG) + 0.5) * TILE_DEG
+        center_dist = np.hypot(center_lat - lat[None, :], (center_lng - lng[None, :]) * scale)
+        tile_diameter = TILE_DEG * np.hypot(1.0, scale)
+        bound = np.partition(center_dist, k - 1, axis=1)[:, k - 1:k] + tile_diameter
+        # 후보가 가장 많은 타일에 맞춰 가까운 순으로 자른 후보 목록 (나머지 타일의 여분 후보는 더 먼 관측소일 뿐)
+        candidate_count = int((center_dist <= bound).sum(axis=1).max())
+        candidates = np.argsort(center_dist, axis=1)[:, :candidate_count]
+
+        index = np.empty((len(grid), k), dtype=np.int64)
+        weights = np.empty((len(grid), k), dtype=np.float64)
+        for start in range(0, len(grid), CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, len(grid))
+            c_lat = grid.lat[start:stop, None]
+            c_lng = grid.lng[start:stop, None]
+            cand = candidates[tile_of_cell[start:stop]]
+            d2 = (c_lat - lat[cand]) ** 2 + ((c_lng - lng[cand]) * scale) ** 2
+            nearest = np.take_along_axis(cand, np.argpartition(d2, k - 1, axis=1)[:, :k], axis=1)
+            dist = haversine_km(c_lng, c_lat, lng[nearest], lat[nearest])
+            index[start:stop] = nearest
+            weights[start:stop] = 1.0 / np.maximum(dist, MIN_DISTANCE_KM) ** power
+        return index, weights
+
+    def interpolate(self, values):
+        """
+        관측소 순서의 값 배열(없는 값은 NaN)을 격자별로 보간합니다. 값이 있는 관측소의 가중치만 다시 정규화하며,
+        가까운 관측소 k개 모두 값이 없는 격자는 NaN입니다.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        weights = self.weights * present[self.station_index]
+        total = weights.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (weights * np.nan_to_num(values)[self.station_index]).sum(axis=1) / total
+
+    def refresh(self, observations, default=None):
+        """
+        관측 값({obsid: {hm2m, ws2m, wd2m}})으로 격자별 기상 CellWeather를 보간해 캐시하고 반환합니다.
+        관측 값이 이전과 같으면 다시 계산하지 않습니다. 주변에 값이 있는 관측소가 없는 격자는 default(Weather) 값입니다.
+        """
+        default = default or Weather()
+        humidity = np.array([_observed(observations, o, "hm2m") for o in self.obsid])
+        speed = np.array([_observed(observations, o, "ws2m") for o in self.obsid])
+        direction = np.radians([_observed(observations, o, "wd2m") for o in self.obsid])
+        key = np.stack([humidity, speed, direction]).tobytes()
+        if self.current is not None and key == self._current_key:
+            return self.current
+
+        # 풍향은 각도를 그대로 평균하면 안 되므로 바람 벡터 (u, v)로 보간
+        u = self.interpolate(speed * np.sin(direction))
+        v = self.interpolate(speed * np.cos(direction))
+        cell_humidity = self.interpolate(humidity)
+        no_wind = np.isnan(u)
+        cell_speed = np.where(no_wind, default.wind_speed, np.hypot(u, v))
+        cell_direction = np.where(no_wind, default.wind_direction, np.mod(np.degrees(np.arctan2(u, v)), 360))
+
+        self.current = CellWeather(
+            humidity=np.where(np.isnan(cell_humidity), default.humidity, cell_humidity),
+            wind_speed=cell_speed,
+            wind_direction=cell_direction,
+        )
+        self._current_key = key
+        return self.current
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="fire_sim.weather_field", description="관측소 기상 값의 격자별 보간")
+    parser.add_argument("observations", help="Firebase weatherdata 형식의 관측 JSON 파일")
+    parser.add_argument("--grid-json", help="격자 행 목록 JSON 파일")
+    parser.add_argument("--table", default=DEFAULT_GRID_TABLE, help="MySQL 격자 테이블 이름")
+    parser.add_argument("--snapshot", help="격자 스냅샷 파일 (python -m fire_sim.snapshot으로 생성)")
+    parser.add_argument("--stations", default=DEFAULT_STATIONS_PATH, help="관측소 목록 (mountainStations.js)")
+    parser.add_argument("--nearest", type=int, default=DEFAULT_NEAREST_COUNT, help="격자마다 사용할 가까운 관측소 수")
+    parser.add_argument("--power", type=float, default=DEFAULT_POWER, help="역거리 가중치 지수")
+    parser.add_argument("--ignition-id", type=int, help="보간 결과를 출력할 격자 ID")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid = load_grid(args.grid_json, args.table, args.snapshot)
+
+    start = time.time()
+    field = WeatherField(grid, *load_stations(args.stations), args.nearest, args.power)
+    print(f"격자 {len(grid)}개, 관측소 {len(field.obsid)}개 보간 가중치 계산 ({time.time() - start:.2f}초)")
+
+    start = time.time()
+    cell_weather = field.refresh(load_observations(args.observations))
+    print(f"격자별 기상 보간 완료 ({(time.time() - start) * 1000:.1f}ms)")
+    for name in ("humidity", "wind_speed", "wind_direction"):
+        values = getattr(cell_weather, name)
+        print(f"  {name}: 최소 {values.min():.1f}, 평균 {values.mean():.1f}, 최대 {values.max():.1f}")
+
+    if args.ignition_id is not None:
+        index = grid.index_of(args.ignition_id)
+        if index is None:
+            print(f"발화 지점 ID {args.ignition_id}를 찾을 수 없습니다.")
+        else:
+            print(f"격자 {args.ignition_id}: {cell_weather.at(index)}")
+
+if __name__ == "__main__":
+    main()